@@ -0,0 +1,112 @@
+"""
+Benchmark bulk employee import and batch leave adjustment at hospital-network scale.
+
+    python -m benchmarks.bench_bulk_ops
+    python -m benchmarks.bench_bulk_ops --employees 100000 --batch 500
+
+Compares the store's single-transaction operations with the previous per-row
+approach (pd.concat of one row / full-frame .loc, then a full CSV rewrite per
+change). The per-row path is timed on --legacy-sample operations and
+extrapolated, since running it 500 times at 100k rows takes minutes.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from data_handler.hr_store import HRStore, validate_employees
+
+DEPARTMENTS = ["Cardiology", "ICU", "Emergency", "Pediatrics", "Oncology", "Neurology", "Orthopedics",
+               "Maternity", "Pathology", "Imaging", "Dermatology", "HR", "Finance", "Operations"]
+ROLES = ["Doctor", "Nurse", "Lab Technician", "Admin"]
+LOCATIONS = ["Mumbai", "Delhi", "Pune", "Chennai", "Hyderabad"]
+
+
+def synthetic_employees(count, start=1, seed=0):
+    rng = random.Random(seed)
+    ids = range(start, start + count)
+    return pd.DataFrame({
+        "Employee_ID": [f"E{i:06d}" for i in ids],
+        "Full_Name": [f"Employee {i}" for i in ids],
+        "Role": [rng.choice(ROLES) for _ in ids],
+        "Department": [rng.choice(DEPARTMENTS) for _ in ids],
+        "Shift": [rng.choice(["Morning", "Evening", "Night"]) for _ in ids],
+        "Leave_Balance": [rng.randint(0, 20) for _ in ids],
+        "Manager": [f"Dr. Manager {rng.randint(1, 200)}" for _ in ids],
+        "Employment_Type": [rng.choice(["Full-time"] * 9 + ["Part-time"]) for _ in ids],
+        "Email": [f"employee{i}@hospital.com" for i in ids],
+        "Location": [rng.choice(LOCATIONS) for _ in ids],
+    })
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500, help="new hires in the onboarding batch")
+    parser.add_argument("--legacy-sample", type=int, default=3, help="per-row operations actually timed")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-hr-")
+    csv_path = os.path.join(tmp, "HR_Data.csv")
+    staff = synthetic_employees(args.employees)
+    staff.to_csv(csv_path, index=False)
+    hires = synthetic_employees(args.batch, start=args.employees + 1, seed=1)
+    full_time = int((staff["Employment_Type"] == "Full-time").sum())
+    results = {"employees": args.employees, "batch": args.batch, "full_time": full_time}
+
+    # Initial load of the whole workforce into an empty store.
+    store = HRStore(os.path.join(tmp, "hr.db"))
+    validate_s, (rows, errors) = timed(validate_employees, pd.read_csv(csv_path))
+    assert not errors, errors
+    load_s, _ = timed(store.bulk_upsert, rows)
+    results["initial_import"] = {"validate_s": round(validate_s, 3), "write_s": round(load_s, 3)}
+
+    # Onboarding: one bulk import vs one concat + full rewrite per hire.
+    df = pd.read_csv(csv_path)
+    per_hire = []
+    for record in hires.head(args.legacy_sample).to_dict(orient="records"):
+        t0 = time.perf_counter()
+        df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
+        df.to_csv(csv_path, index=False)
+        per_hire.append(time.perf_counter() - t0)
+    validate_s, (rows, errors) = timed(validate_employees, hires)
+    write_s, (inserted, _) = timed(store.bulk_upsert, rows)
+    legacy = sum(per_hire) / len(per_hire) * args.batch
+    results["onboarding"] = {
+        "legacy_per_row_s": round(legacy, 2),
+        "bulk_s": round(validate_s + write_s, 3),
+        "inserted": inserted,
+        "speedup": round(legacy / (validate_s + write_s), 1),
+    }
+
+    # Monthly accrual for all full-time staff: one UPDATE vs .loc scan + rewrite per employee.
+    df = pd.read_csv(csv_path)
+    per_employee = []
+    for emp_id in df.loc[df["Employment_Type"] == "Full-time", "Employee_ID"].head(args.legacy_sample):
+        t0 = time.perf_counter()
+        df.loc[df["Employee_ID"] == emp_id, "Leave_Balance"] += 2
+        df.to_csv(csv_path, index=False)
+        per_employee.append(time.perf_counter() - t0)
+    accrual_s, (changed, _) = timed(store.adjust_leave, 2, {"Employment_Type": ["Full-time"]}, maximum=30)
+    legacy = sum(per_employee) / len(per_employee) * full_time
+    results["monthly_accrual"] = {
+        "legacy_per_row_s": round(legacy, 2),
+        "batch_s": round(accrual_s, 3),
+        "changed": changed,
+        "speedup": round(legacy / accrual_s, 1),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
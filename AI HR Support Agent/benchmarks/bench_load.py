@@ -0,0 +1,65 @@
+"""
+Benchmark HR data load time and DataFrame memory: CSV parse vs the typed Arrow snapshot.
+
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --employees 1000000
+
+Reports the best of --repeat loads for pd.read_csv (the previous load path),
+the store's SQL read that builds the snapshot, and the memory-mapped snapshot
+load, with the in-memory size of each resulting DataFrame.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_bulk_ops import synthetic_employees
+from data_handler.hr_store import HRStore, validate_employees
+
+
+def best(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def mb(df):
+    return round(df.memory_usage(deep=True).sum() / 2 ** 20, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-hr-load-")
+    csv_path = os.path.join(tmp, "HR_Data.csv")
+    synthetic_employees(args.employees).to_csv(csv_path, index=False)
+    store = HRStore(os.path.join(tmp, "hr.db"))
+    rows, _ = validate_employees(pd.read_csv(csv_path))
+    store.bulk_upsert(rows)
+
+    csv_s, csv_df = best(lambda: pd.read_csv(csv_path), args.repeat)
+    build_s, _ = best(store._write_snapshot, 1)
+    snapshot_s, snapshot_df = best(store.load, args.repeat)
+
+    print(json.dumps({
+        "employees": args.employees,
+        "csv": {"load_s": round(csv_s, 4), "memory_mb": mb(csv_df), "file_mb": round(os.path.getsize(csv_path) / 2 ** 20, 1)},
+        "snapshot_build_s": round(build_s, 4),
+        "snapshot": {"load_s": round(snapshot_s, 4), "memory_mb": mb(snapshot_df),
+                     "file_mb": round(os.path.getsize(store.snapshot_path) / 2 ** 20, 1)},
+        "load_speedup": round(csv_s / snapshot_s, 1),
+        "memory_ratio": round(mb(csv_df) / mb(snapshot_df), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark the local HR query engine on a labelled question set.
+
+    python -m benchmarks.bench_query_engine
+    python -m benchmarks.bench_query_engine --employees 100000 --repeat 5
+    python -m benchmarks.bench_query_engine --employees 100000 --aggregates
+
+For every question reports whether it was answered locally or would go to the
+LLM (structured-filter call or full chat completion), and how long the local
+path took. Summarises the LLM-avoidance rate, route accuracy against the
+labels, count accuracy (original dataset only) and latency percentiles.
+--employees replicates HR_Data.csv (with fresh Employee_IDs) to test scale;
+--aggregates answers from HRAggregates.
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_handler.aggregates import HRAggregates
+from data_handler.query_engine import answer_question
+
+HERE = os.path.dirname(__file__)
+FIXTURE = os.path.join(HERE, "fixtures", "hr_questions.json")
+CSV = os.path.join(HERE, "..", "HR_Data.csv")
+
+
+def scaled(df, employees):
+    if employees <= len(df):
+        return df
+    copies = -(-employees // len(df))
+    big = pd.concat([df] * copies, ignore_index=True).head(employees)
+    big["Employee_ID"] = [f"E{i + 1:06d}" for i in range(len(big))]
+    big.loc[: len(df) - 1, "Employee_ID"] = df["Employee_ID"].values   # original IDs still resolve
+    return big
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=CSV)
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--employees", type=int, default=0, help="replicate the dataset to this many rows")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per question (best is kept)")
+    parser.add_argument("--aggregates", action="store_true", help="answer from precomputed aggregates")
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.csv)
+    df = scaled(base, args.employees)
+    with open(args.fixture) as f:
+        questions = json.load(f)["questions"]
+    t0 = time.perf_counter()
+    aggregates = HRAggregates.from_frame(df) if args.aggregates else None
+    build_s = time.perf_counter() - t0
+
+    llm_calls = []
+
+    def llm_filter(question, frame):
+        llm_calls.append(question)   # offline: record the call, answer "narrative"
+        return None
+
+    rows, local_ms = [], []
+    for item in questions:
+        best, result = float("inf"), None
+        for _ in range(args.repeat):
+            llm_calls.clear()
+            t0 = time.perf_counter()
+            result = answer_question(item["question"], df, llm_filter=llm_filter, aggregates=aggregates)
+            best = min(best, time.perf_counter() - t0)
+        route = "local" if result is not None else "llm"
+        row = {"question": item["question"], "route": route, "expected_route": item["route"],
+               "filter_calls": len(llm_calls), "ms": round(best * 1000, 3)}
+        if route == "local":
+            local_ms.append(best * 1000)
+            match = re.match(r"\*\*(\d+)\*\*", result.answer)
+            row["count"] = int(match.group(1)) if match else None
+        rows.append(row)
+
+    labelled = [r for r, q in zip(rows, questions) if "expected_count" in q]
+    count_ok = [r.get("count") == q["expected_count"] for r, q in zip(rows, questions) if "expected_count" in q]
+    ms = np.array(local_ms) if local_ms else np.zeros(1)
+    summary = {
+        "employees": len(df),
+        "aggregates_build_s": round(build_s, 3) if aggregates is not None else None,
+        "questions": len(rows),
+        "answered_locally": sum(r["route"] == "local" for r in rows),
+        "llm_avoidance_rate": round(sum(r["route"] == "local" for r in rows) / len(rows), 3),
+        "route_accuracy": round(sum(r["route"] == r["expected_route"] for r in rows) / len(rows), 3),
+        "filter_calls": sum(r["filter_calls"] for r in rows),
+        "count_accuracy": round(sum(count_ok) / len(labelled), 3) if labelled and len(df) == len(base) else None,
+        "local_p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "local_p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "local_max_ms": round(float(ms.max()), 3),
+    }
+    for r in rows:
+        flag = "" if r["route"] == r["expected_route"] else "  <- expected " + r["expected_route"]
+        print(f"{r['route']:>5} {r['ms']:>9.2f} ms  {r['question']}{flag}")
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
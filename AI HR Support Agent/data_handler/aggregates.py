@@ -0,0 +1,261 @@
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from data_handler.hr_store import VERSION_ATTR
+
+# Roster columns with a {value: row positions} index map and per-value leave distributions.
+INDEX_COLUMNS = ["Department", "Role", "Shift", "Employment_Type", "Location", "Manager"]
+
+# Column pairs whose joint headcount is kept (the roster view is department x shift).
+CROSS_COLUMNS = [("Department", "Shift"), ("Department", "Role")]
+
+LEAVE_COLUMN = "Leave_Balance"
+ID_COLUMN = "Employee_ID"
+
+
+def _median(hist, count):
+    lower, upper = (count - 1) // 2, count // 2
+    seen, low = 0, None
+    for value in sorted(hist):
+        seen += hist[value]
+        if low is None and seen > lower:
+            low = value
+        if seen > upper:
+            return (low + value) / 2
+
+
+def leave_stats(hist):
+    """count, sum, min, median, mean and max of a {balance: employees} distribution; None if it is empty."""
+    count = sum(hist.values())
+    if not count:
+        return None
+    total = sum(value * n for value, n in hist.items())
+    return {"count": count, "sum": total, "min": min(hist), "median": _median(hist, count),
+            "mean": total / count, "max": max(hist)}
+
+
+def _moved(hist, old, new):
+    """Copy of hist with one employee moved from balance `old` to `new` (either may be None)."""
+    hist = Counter(hist)
+    if old is not None:
+        hist[old] -= 1
+        if hist[old] <= 0:
+            del hist[old]
+    if new is not None:
+        hist[new] += 1
+    return hist
+
+
+def _balance(value):
+    return None if value is None or value == "" or pd.isna(value) else int(value)
+
+
+class HRAggregates:
+    """
+    Materialized rollups of one version of the HR data: headcounts per roster value
+    and per department x shift, leave-balance distributions overall and per value,
+    and {value: row positions} index maps (staff per manager, per department, ...).
+
+    Built once per data version; a single-row edit derives the next version with
+    with_leave_change / with_new_employee, touching only that row's entries. Instances
+    are never modified, so sessions still reading the previous version are unaffected.
+    Row positions refer to the frame HRStore.load returns, which keeps rows in
+    insertion order, so an added employee is always the last row.
+
+    The query engine, context builder and LLM prompt take these as an optional
+    `aggregates` argument and read from them instead of rescanning the frame,
+    but only for the frame they describe() (otherwise they use the rows).
+    """
+
+    def __init__(self, version, size, positions, ids, leave, leave_by, cross):
+        self.version = version
+        self.size = size
+        self._positions = positions   # {column: {value: sorted row positions}}
+        self._ids = ids               # {Employee_ID: row position}
+        self._leave = leave           # Counter {balance: employees}
+        self._leave_by = leave_by     # {column: {value: Counter}}
+        self._cross = cross           # {(column, column): Counter {(value, value): employees}}
+
+    @classmethod
+    def from_frame(cls, df, version=None):
+        """Aggregates of df, of the data version df was loaded at (see HRStore.load) or else `version`."""
+        version = df.attrs.get(VERSION_ATTR, version)
+        columns = [c for c in INDEX_COLUMNS if c in df.columns]
+        positions = {
+            column: {str(value): rows for value, rows in df.groupby(column, observed=True).indices.items()}
+            for column in columns
+        }
+        ids = dict(zip(df[ID_COLUMN].astype(str), range(len(df)))) if ID_COLUMN in df.columns else {}
+
+        leave, leave_by = Counter(), {}
+        if LEAVE_COLUMN in df.columns:
+            balance = pd.to_numeric(df[LEAVE_COLUMN], errors="coerce")
+            leave = Counter({int(value): int(n) for value, n in balance.value_counts().items()})
+            for column in columns:
+                by_value = leave_by[column] = {}
+                for (value, amount), n in balance.groupby([df[column], balance], observed=True).size().items():
+                    by_value.setdefault(str(value), Counter())[int(amount)] = int(n)
+
+        cross = {}
+        for pair in CROSS_COLUMNS:
+            if all(c in df.columns for c in pair):
+                cross[pair] = Counter({
+                    (str(a), str(b)): int(n)
+                    for (a, b), n in df.groupby(list(pair), observed=True).size().items() if n
+                })
+        return cls(version, len(df), positions, ids, leave, leave_by, cross)
+
+    def describes(self, df):
+        """True if these are the aggregates of df: same data version and all of its rows (not a filtered subset)."""
+        return self.version == df.attrs.get(VERSION_ATTR) and self.size == len(df)
+
+    def _derive(self, version, **changes):
+        state = {"size": self.size, "positions": self._positions, "ids": self._ids, "leave": self._leave,
+                 "leave_by": self._leave_by, "cross": self._cross}
+        state.update(changes)
+        return HRAggregates(version, **state)
+
+    def with_leave_change(self, version, row, balance):
+        """Aggregates of `version`: `row` (the employee's record before the edit) now has leave `balance`."""
+        old, new = _balance(row.get(LEAVE_COLUMN)), _balance(balance)
+        leave_by = dict(self._leave_by)
+        for column, by_value in self._leave_by.items():
+            value = row.get(column)
+            if value is not None:
+                leave_by[column] = {**by_value, str(value): _moved(by_value.get(str(value), Counter()), old, new)}
+        return self._derive(version, leave=_moved(self._leave, old, new), leave_by=leave_by)
+
+    def with_new_employee(self, version, row):
+        """Aggregates of `version`: `row` was appended as the last employee."""
+        position, amount = self.size, _balance(row.get(LEAVE_COLUMN))
+        positions, leave_by = dict(self._positions), dict(self._leave_by)
+        for column, by_value in self._positions.items():
+            value = row.get(column)
+            if value is None:
+                continue
+            value = str(value)
+            positions[column] = {**by_value, value: np.append(by_value.get(value, np.empty(0, dtype=np.intp)),
+                                                              position)}
+            if column in self._leave_by:
+                hist = self._leave_by[column]
+                leave_by[column] = {**hist, value: _moved(hist.get(value, Counter()), None, amount)}
+        cross = dict(self._cross)
+        for pair, counts in self._cross.items():
+            values = [row.get(c) for c in pair]
+            if None not in values:
+                cross[pair] = counts + Counter({tuple(map(str, values)): 1})
+        ids = {**self._ids, str(row[ID_COLUMN]): position} if ID_COLUMN in row else self._ids
+        return self._derive(version, size=self.size + 1, positions=positions, ids=ids,
+                            leave=_moved(self._leave, None, amount), leave_by=leave_by, cross=cross)
+
+    def positions(self, filters):
+        """
+        (sorted row positions, remaining filters) for {column: [values]} filters on indexed
+        columns and Employee_ID. Positions is None when no filter could be looked up; filters
+        on other columns, comparisons and values not spelled as in the data are returned
+        for the caller to evaluate on the matching rows.
+        """
+        found, remaining = None, {}
+        for column, condition in filters.items():
+            index = self._ids if column == ID_COLUMN else self._positions.get(column)
+            values = None if index is None or isinstance(condition, tuple) else [str(v) for v in condition]
+            if values is None or any(v not in index for v in values):
+                remaining[column] = condition
+                continue
+            if column == ID_COLUMN:
+                rows = np.unique(np.array([index[v] for v in values], dtype=np.intp))
+            else:
+                rows = index[values[0]] if len(values) == 1 else np.unique(np.concatenate([index[v] for v in values]))
+            found = rows if found is None else np.intersect1d(found, rows, assume_unique=True)
+        return found, remaining
+
+    def count(self, filters=None):
+        """Employees matching filters, or None if some filter is not answerable from the index maps."""
+        found, remaining = self.positions(filters or {})
+        if remaining:
+            return None
+        return self.size if found is None else len(found)
+
+    def values(self, column):
+        """Distinct values of an indexed column; None if the column is not indexed."""
+        index = self._positions.get(column)
+        return None if index is None else [value for value, rows in index.items() if len(rows)]
+
+    def members(self, column, value):
+        """Row positions of the employees with `value` in `column` (e.g. everyone reporting to a manager)."""
+        return self._positions.get(column, {}).get(str(value), np.empty(0, dtype=np.intp))
+
+    def headcount(self, column):
+        """Employees per value of an indexed column, largest first; None if the column is not indexed."""
+        if column not in self._positions:
+            return None
+        counts = pd.Series({value: len(rows) for value, rows in self._positions[column].items() if len(rows)},
+                           dtype="int64", name="Headcount")
+        counts.index.name = column
+        return counts.sort_index().sort_values(ascending=False, kind="stable")
+
+    def crosstab(self, rows, columns):
+        """Headcount table with one row per `rows` value and one column per `columns` value; None if not kept."""
+        if (rows, columns) in self._cross:
+            counts = self._cross[(rows, columns)]
+        elif (columns, rows) in self._cross:
+            counts = Counter({(b, a): n for (a, b), n in self._cross[(columns, rows)].items()})
+        else:
+            return None
+        table = pd.Series(counts, dtype="int64").unstack(fill_value=0).sort_index().sort_index(axis=1)
+        table.index.name, table.columns.name = rows, columns
+        return table
+
+    def leave_distribution(self, column=None, value=None):
+        """{balance: employees} for everyone, or for the employees with `value` in `column`."""
+        if column is None:
+            return Counter(self._leave)
+        return Counter(self._leave_by.get(column, {}).get(str(value), {}))
+
+    def leave_stats(self, column=None):
+        """leave_stats of everyone, or {value: leave_stats} per value of `column` (sorted by value)."""
+        if column is None:
+            return leave_stats(self._leave)
+        if column not in self._leave_by:
+            return None
+        by_value = {value: leave_stats(hist) for value, hist in sorted(self._leave_by[column].items())}
+        return {value: stats for value, stats in by_value.items() if stats is not None}
+
+
+class AggregateCache:
+    """
+    HRAggregates for the most recent data versions. get() builds a version once;
+    advance() derives the next version from the previous one after a single-row
+    edit, so saving a leave balance or adding an employee does not rescan the data.
+    """
+
+    def __init__(self, max_versions=4):
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def _keep(self, aggregates):
+        self._versions[aggregates.version] = aggregates
+        for version in sorted(self._versions)[:-self.max_versions]:
+            del self._versions[version]
+        return aggregates
+
+    def get(self, version, build):
+        """Aggregates of `version`, calling build() (which returns a frame of that version) if missing."""
+        with self._lock:
+            aggregates = self._versions.get(version)
+            if aggregates is None:
+                aggregates = self._keep(HRAggregates.from_frame(build(), version))
+            return aggregates
+
+    def advance(self, version, new_version, derive):
+        """Store derive(aggregates of `version`) as `new_version`; False if `version` was never built."""
+        with self._lock:
+            previous = self._versions.get(version)
+            if previous is None or new_version in self._versions:
+                return False
+            self._keep(derive(previous))
+            return True
@@ -1,21 +1,178 @@
+import os
 import streamlit as st
 import pandas as pd
+from data_handler.aggregates import AggregateCache
+from data_handler.hr_store import HRStore, validate_employees
+from data_handler.search_index import PrefixIndex
+from llm.answer_cache import AnswerCache
 
-@st.cache_data
-def load_hr_data(csv_path):
-    """Load HR CSV file."""
+def hr_db_path(csv_path):
+    """SQLite database backing csv_path: HR_DB_PATH, or the CSV path with a .db suffix."""
+    return os.getenv("HR_DB_PATH") or os.path.splitext(csv_path)[0] + ".db"
+
+@st.cache_resource
+def get_hr_store(csv_path):
+    """Store shared by every session; hr_data_version imports the CSV into it on first use and when the CSV changes."""
+    return HRStore(hr_db_path(csv_path))
+
+def _sync_from_csv(csv_path, overwrite=False):
+    """HRStore.sync_from_csv, showing why a CSV cannot be imported instead of failing; the stored data is kept."""
+    try:
+        return get_hr_store(csv_path).sync_from_csv(csv_path, overwrite=overwrite)
+    except ValueError as e:
+        st.error(f"CSV not imported: {e}")
+        return False
+
+@st.cache_resource
+def get_answer_cache(csv_path):
+    """LLM answer cache stored with the HR data; entries are keyed on the data version, so saves invalidate them."""
+    return AnswerCache(hr_db_path(csv_path), max_entries=int(os.getenv("HR_ANSWER_CACHE_SIZE", "500")))
+
+def hr_data_version(csv_path):
+    """
+    Current data version, after re-importing the CSV if it was edited outside the app and
+    nothing is unexported; None if the data cannot be opened. Read it once per rerun and pass
+    it to load_hr_data, get_search_index and get_hr_aggregates so they all show that version.
+    """
+    if not csv_path:
+        return None
+    try:
+        _sync_from_csv(csv_path)
+        return get_hr_store(csv_path).version()
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+@st.cache_resource(max_entries=4)
+def _load_hr_frame(csv_path, version):
+    return get_hr_store(csv_path).load()
+
+def load_hr_data(csv_path, version):
+    """
+    Load HR records of `version` (see hr_data_version). The DataFrame is cached once per
+    (path, data version) and shared read-only by every session, so a save only invalidates
+    its own version and reruns do not copy the frame. Do not modify the returned frame in place.
+    """
+    if version is None:
+        return pd.DataFrame()
     try:
-        df = pd.read_csv(csv_path)
-        return df
+        return _load_hr_frame(csv_path, version)
     except Exception as e:
-        st.error(f"Error loading CSV: {e}")
+        st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
+@st.cache_resource(max_entries=4)
+def _build_search_index(csv_path, version):
+    df = _load_hr_frame(csv_path, version)
+    return PrefixIndex(df["Employee_ID"], df["Full_Name"])
+
+def get_search_index(csv_path, version):
+    """Prefix index over IDs and names of the frame load_hr_data returns for `version`."""
+    return _build_search_index(csv_path, version)
+
+@st.cache_resource
+def _aggregate_cache(csv_path):
+    return AggregateCache()
+
+def get_hr_aggregates(csv_path, version):
+    """HRAggregates of the frame load_hr_data returns for `version`."""
+    return _aggregate_cache(csv_path).get(version, lambda: _load_hr_frame(csv_path, version))
+
+def _advance_aggregates(csv_path, version, derive):
+    """After a single-row write made at `version`, derive the next version's aggregates instead of rebuilding them."""
+    new_version = get_hr_store(csv_path).version()
+    if new_version == version + 1:   # no other write in between
+        _aggregate_cache(csv_path).advance(version, new_version, lambda aggregates: derive(aggregates, new_version))
+
+def csv_conflict(csv_path):
+    """The CSV changed on disk while the app holds edits that were never exported to it."""
+    store = get_hr_store(csv_path)
+    return store.csv_changed(csv_path) and store.unexported_changes()
+
+def reload_hr_data(csv_path, overwrite=False):
+    """Re-import the CSV if it was edited outside the app; overwrite=True discards unexported app edits."""
+    if _sync_from_csv(csv_path, overwrite=overwrite):
+        st.success("Reloaded data from CSV.")
+    elif csv_conflict(csv_path):
+        st.warning("Not reloaded: the app has edits that were not exported to the CSV.")
+
+def add_employee(record, csv_path):
+    """Insert one employee row."""
+    try:
+        store = get_hr_store(csv_path)
+        version = store.version()
+        row = store.add_employee(record)
+        _advance_aggregates(csv_path, version, lambda aggregates, new: aggregates.with_new_employee(new, row))
+        st.success("Employee added.")
+        return True
+    except ValueError as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"Failed to save data: {e}")
+    return False
+
+def update_leave_balance(emp_id, balance, csv_path):
+    """Update one employee's leave balance in place."""
+    try:
+        store = get_hr_store(csv_path)
+        version = store.version()
+        before = store.get(emp_id)
+        if store.update_leave(emp_id, balance):
+            _advance_aggregates(csv_path, version,
+                                lambda aggregates, new: aggregates.with_leave_change(new, before, balance))
+            st.success("Leave balance updated.")
+            return True
+        st.error(f"Unknown employee {emp_id}.")
+    except Exception as e:
+        st.error(f"Failed to save data: {e}")
+    return False
+
+def read_employee_file(uploaded_file):
+    """DataFrame from an uploaded CSV or Excel file."""
+    if uploaded_file.name.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(uploaded_file, dtype={"Employee_ID": str})
+    return pd.read_csv(uploaded_file, dtype={"Employee_ID": str})
+
+def bulk_import_employees(upload_df, csv_path, update_existing=False):
+    """Validate an uploaded batch and write it in one transaction; returns (inserted, updated) or None."""
+    rows, errors = validate_employees(upload_df)
+    if errors:
+        st.error("Import rejected, fix these rows and upload again:\n\n" + "\n".join(f"- {e}" for e in errors))
+        return None
+    try:
+        inserted, updated = get_hr_store(csv_path).bulk_upsert(rows, update_existing=update_existing)
+        st.success(f"Imported {inserted} new employee(s), updated {updated}.")
+        return inserted, updated
+    except ValueError as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"Failed to save data: {e}")
+    return None
+
+def adjust_leave_balances(delta, filters, csv_path, maximum=None):
+    """Add `delta` leave days to every employee matching filters, in one update (see HRStore.adjust_leave)."""
+    try:
+        changed, clamped = get_hr_store(csv_path).adjust_leave(delta, filters, maximum=maximum)
+        limits = "the 0-day minimum" if maximum is None else f"the 0-day minimum or {maximum}-day maximum"
+        st.success(f"Adjusted leave balance for {changed} employee(s)"
+                   + (f"; {clamped} not fully adjusted because of {limits}." if clamped else "."))
+        return changed
+    except Exception as e:
+        st.error(f"Failed to save data: {e}")
+    return None
+
+def export_hr_data(csv_path):
+    """Write the current records back to the CSV file."""
+    try:
+        get_hr_store(csv_path).export_csv(csv_path)
+        st.success(f"Exported to {csv_path}.")
+    except Exception as e:
+        st.error(f"Failed to export data: {e}")
+
 def save_hr_data(df, csv_path):
-    """Save updated HR data to CSV."""
+    """Replace all HR records with df (one transaction)."""
     try:
-        df.to_csv(csv_path, index=False)
+        get_hr_store(csv_path).replace_all(df)
         st.success("Data saved successfully.")
-        st.cache_data.clear()
     except Exception as e:
         st.error(f"Failed to save data: {e}")
@@ -0,0 +1,416 @@
+import os
+import sqlite3
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+COLUMNS = [
+    "Employee_ID", "Full_Name", "Role", "Department", "Shift", "Leave_Balance",
+    "Manager", "Employment_Type", "Email", "Location",
+]
+INTEGER_COLUMNS = {"Leave_Balance"}
+# Few distinct values repeated across every row: stored as dictionary / pandas categorical columns.
+CATEGORY_COLUMNS = ["Role", "Department", "Shift", "Manager", "Employment_Type", "Location"]
+INDEXED_COLUMNS = ["Department", "Shift", "Role", "Manager"]
+REQUIRED_COLUMNS = ["Employee_ID", "Full_Name"]
+ALLOWED_VALUES = {
+    "Shift": {"Morning", "Evening", "Night"},
+    "Employment_Type": {"Full-time", "Part-time"},
+}
+MAX_ERRORS = 50
+# DataFrame.attrs key holding the data version a frame returned by HRStore.load was read at.
+VERSION_ATTR = "hr_version"
+
+
+def unknown_columns(columns):
+    """Columns that are not in COLUMNS (compared case-insensitively); the store would drop them."""
+    known = {c.lower() for c in COLUMNS}
+    return [str(c) for c in columns if str(c).strip().lower() not in known]
+
+
+def validate_employees(df):
+    """
+    Check an import batch against the employee schema with vectorized checks.
+    Returns (rows, errors): rows with the CSV's columns and types, and a list of
+    "row N: problem" messages (at most MAX_ERRORS); rows is None if any check failed.
+    """
+    columns = {str(c).strip().lower(): c for c in df.columns}
+    missing = [c for c in REQUIRED_COLUMNS if c.lower() not in columns]
+    if missing:
+        return None, [f"missing column(s): {', '.join(missing)}"]
+
+    rows = pd.DataFrame(index=df.index)
+    for column in COLUMNS:
+        source = columns.get(column.lower())
+        rows[column] = df[source] if source is not None else None
+
+    text_columns = [c for c in COLUMNS if c not in INTEGER_COLUMNS]
+    rows[text_columns] = rows[text_columns].apply(lambda s: s.astype("string").str.strip())
+    problems = []
+    for column in REQUIRED_COLUMNS:
+        problems.append((rows[column].isna() | (rows[column] == ""), f"{column} is empty"))
+    problems.append((rows["Employee_ID"].duplicated(keep=False) & rows["Employee_ID"].notna(),
+                     "Employee_ID is repeated in the file"))
+    for column in INTEGER_COLUMNS:
+        values = pd.to_numeric(rows[column], errors="coerce")
+        bad = rows[column].notna() & (values.isna() | (values < 0) | (values % 1 != 0))
+        problems.append((bad, f"{column} must be a whole number >= 0"))
+        rows[column] = values.where(~bad).astype("Int64")
+    for column, allowed in ALLOWED_VALUES.items():
+        bad = rows[column].notna() & ~rows[column].isin(allowed)
+        problems.append((bad, f"{column} must be one of {', '.join(sorted(allowed))}"))
+
+    errors = []
+    for mask, message in problems:
+        for position in (mask.fillna(False).to_numpy()).nonzero()[0][:MAX_ERRORS]:
+            errors.append((int(position) + 2, message))   # +2: header line, 1-based rows
+    errors = [f"row {row}: {message}" for row, message in sorted(errors)[:MAX_ERRORS]]
+    return (None if errors else rows.reset_index(drop=True)), errors
+
+
+class HRStore:
+    """
+    Employee records in a local SQLite database (WAL mode, so readers never block
+    the writer and several app processes can share one file).
+
+    Edits are single-row transactions instead of rewriting the whole CSV; every
+    write bumps `version`, which callers use to key caches. CSV stays the
+    import/export format.
+
+    Reads go through a typed Arrow IPC snapshot next to the database (dictionary
+    encoded low-cardinality columns), rewritten once per version and memory-mapped
+    on load.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ",\n".join(
+                f"{c} INTEGER" if c in INTEGER_COLUMNS else f"{c} TEXT" for c in COLUMNS[1:]
+            )
+            conn.execute(f"CREATE TABLE IF NOT EXISTS employees (\nEmployee_ID TEXT PRIMARY KEY,\n{columns}\n)")
+            for column in INDEXED_COLUMNS:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_employees_{column.lower()} ON employees({column})")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def _write(self, conn):
+        """Take the write lock up front so concurrent writers queue instead of failing mid-transaction."""
+        conn.execute("BEGIN IMMEDIATE")
+
+    @staticmethod
+    def _bump(conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated_at', ?)", (time.time(),))
+
+    @staticmethod
+    def normalize(record):
+        """
+        Map a record's keys onto COLUMNS case-insensitively (the forms use full_name, leave_balance, ...).
+        Blank cells become None; raises ValueError for a leave balance that is not a whole number.
+        """
+        lowered = {str(k).lower(): v for k, v in record.items()}
+        row = {}
+        for column in COLUMNS:
+            value = lowered.get(column.lower())
+            if value is not None and not isinstance(value, str) and pd.isna(value):
+                value = None
+            if column in INTEGER_COLUMNS and value is not None and value != "":
+                number = pd.to_numeric(value, errors="coerce")
+                if pd.isna(number) or number % 1 != 0:
+                    raise ValueError(f"{column} must be a whole number, got {value!r}")
+                value = int(number)
+            row[column] = None if value == "" and column in INTEGER_COLUMNS else value
+        if not row["Employee_ID"]:
+            raise ValueError("Employee_ID is required")
+        row["Employee_ID"] = str(row["Employee_ID"]).strip()
+        return row
+
+    def _meta(self, key, default=None):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def version(self):
+        return self._meta("version", 0)
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    @property
+    def snapshot_path(self):
+        return os.path.splitext(self.db_path)[0] + ".arrow"
+
+    def _read_snapshot(self, version):
+        """Memory-mapped snapshot table if it was written for `version`, else None."""
+        try:
+            reader = pa.ipc.open_file(pa.memory_map(self.snapshot_path))
+        except (OSError, pa.ArrowInvalid):
+            return None
+        metadata = reader.schema.metadata or {}
+        if metadata.get(b"hr_version") != str(version).encode():
+            return None
+        return reader.read_all()
+
+    def _write_snapshot(self):
+        """Typed table of the current rows, written atomically as the snapshot of their version."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")   # version and rows from the same read transaction
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            df = pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM employees ORDER BY rowid", conn)
+            conn.commit()
+        finally:
+            conn.close()
+        df["Leave_Balance"] = df["Leave_Balance"].astype("Int64")
+        for column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype("category")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"hr_version": str(version).encode()})
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, self.snapshot_path)
+        return table
+
+    def load(self):
+        """
+        All employees as a typed DataFrame with the CSV's columns: categorical
+        low-cardinality columns, Arrow-backed strings (zero-copy from the mapped
+        snapshot) and a nullable integer Leave_Balance. df.attrs[VERSION_ATTR] is the
+        data version of the rows.
+        """
+        table = self._read_snapshot(self.version())
+        if table is None:
+            table = self._write_snapshot()
+        df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+        df.attrs[VERSION_ATTR] = int(table.schema.metadata[b"hr_version"])
+        return df
+
+    def get(self, employee_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM employees WHERE Employee_ID = ?", (employee_id,)
+            ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def add_employee(self, record):
+        """Insert one employee; raises ValueError if the Employee_ID already exists."""
+        row = self.normalize(record)
+        conn = self._connect()
+        try:
+            self._write(conn)
+            conn.execute(
+                f"INSERT INTO employees ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [row[c] for c in COLUMNS],
+            )
+            self._bump(conn)
+            conn.commit()
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            raise ValueError(f"Employee ID {row['Employee_ID']} already exists.")
+        finally:
+            conn.close()
+        return row
+
+    def update_leave(self, employee_id, balance):
+        """Set one employee's leave balance; returns False if the employee does not exist."""
+        conn = self._connect()
+        try:
+            self._write(conn)
+            updated = conn.execute(
+                "UPDATE employees SET Leave_Balance = ? WHERE Employee_ID = ?", (int(balance), employee_id)
+            ).rowcount
+            if updated:
+                self._bump(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return bool(updated)
+
+    def bulk_upsert(self, rows, update_existing=False):
+        """
+        Write validated rows (see validate_employees) in one transaction.
+        Existing Employee_IDs are updated if `update_existing`, otherwise the batch is
+        rejected with ValueError. Returns (inserted, updated).
+        """
+        values = rows[COLUMNS].astype(object)
+        records = list(values.where(rows[COLUMNS].notna(), None).itertuples(index=False, name=None))
+        ids = [r[0] for r in records]
+        conn = self._connect()
+        try:
+            self._write(conn)
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_ids (id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM import_ids")
+            conn.executemany("INSERT INTO import_ids (id) VALUES (?)", [(i,) for i in ids])
+            existing = [r[0] for r in conn.execute(
+                "SELECT Employee_ID FROM employees WHERE Employee_ID IN (SELECT id FROM import_ids) LIMIT ?",
+                (MAX_ERRORS,),
+            )]
+            updated = conn.execute(
+                "SELECT COUNT(*) FROM employees WHERE Employee_ID IN (SELECT id FROM import_ids)"
+            ).fetchone()[0]
+            if updated and not update_existing:
+                raise ValueError(f"{updated} Employee ID(s) already exist: {', '.join(existing)}")
+            assignments = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+            conn.executemany(
+                f"INSERT INTO employees ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT(Employee_ID) DO UPDATE SET {assignments}",
+                records,
+            )
+            self._bump(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return len(records) - updated, updated
+
+    def adjust_leave(self, delta, filters=None, minimum=0, maximum=None):
+        """
+        Add `delta` days to the leave balance of every employee matching `filters`
+        ({column: [values]}, e.g. {"Employment_Type": ["Full-time"]}) in a single
+        UPDATE. A balance that would cross `minimum` or `maximum` stops at it; one
+        already outside the bounds is never pulled back to them (40 days + 2 with
+        a cap of 30 stays 40). Returns (employees changed, employees clamped).
+        """
+        where, params = [], []
+        for column, values in (filters or {}).items():
+            if column not in COLUMNS:
+                raise ValueError(f"Unknown column {column}")
+            values = list(values)
+            if values:
+                where.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        where = f" WHERE {' AND '.join(where)}" if where else ""
+        balance = "COALESCE(Leave_Balance, 0)"
+        value, bounds, clamped = f"{balance} + ?", [delta], []
+        if minimum is not None:
+            floor = f"MIN({balance}, ?)"
+            value, bounds = f"MAX({value}, {floor})", bounds + [minimum]
+            clamped.append((f"{balance} + ? < {floor}", [delta, minimum]))
+        if maximum is not None:
+            ceiling = f"MAX({balance}, ?)"
+            value, bounds = f"MIN({value}, {ceiling})", bounds + [maximum]
+            clamped.append((f"{balance} + ? > {ceiling}", [delta, maximum]))
+        conn = self._connect()
+        try:
+            self._write(conn)
+            clamped_count = 0
+            if clamped:
+                condition = " OR ".join(f"({c})" for c, _ in clamped)
+                clamped_count = conn.execute(
+                    f"SELECT COUNT(*) FROM employees{where}" + (" AND " if where else " WHERE ") + f"({condition})",
+                    params + [p for _, ps in clamped for p in ps],
+                ).fetchone()[0]
+            changed = conn.execute(f"UPDATE employees SET Leave_Balance = {value}{where}", bounds + params).rowcount
+            if changed:
+                self._bump(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return changed, clamped_count
+
+    def replace_all(self, df):
+        """
+        Replace every record with df's rows in one transaction. Raises ValueError listing
+        the rows that cannot be stored ("row N: problem", numbered as in the CSV).
+        """
+        rows, errors = [], []
+        for position, record in enumerate(df.to_dict(orient="records")):
+            try:
+                rows.append(self.normalize(record))
+            except ValueError as e:
+                errors.append(f"row {position + 2}: {e}")   # +2: header line, 1-based rows
+        if errors:
+            raise ValueError("; ".join(errors[:MAX_ERRORS]))
+        conn = self._connect()
+        try:
+            self._write(conn)
+            conn.execute("DELETE FROM employees")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO employees ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [[r[c] for c in COLUMNS] for r in rows],
+            )
+            self._bump(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    @staticmethod
+    def _csv_stamp(csv_path):
+        stat = os.stat(csv_path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _mark_csv(self, csv_path, version):
+        """
+        Remember the CSV's mtime and size and the data version it holds, so sync_from_csv
+        only re-imports after the file changes on disk and can tell whether writes made
+        since then would be lost.
+        """
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             [("csv_stamp", self._csv_stamp(csv_path)), ("csv_version", version)])
+
+    def import_csv(self, csv_path):
+        """Replace every record with the CSV's rows; raises ValueError if it has columns the store would drop."""
+        df = pd.read_csv(csv_path)
+        dropped = unknown_columns(df.columns)
+        if dropped:
+            raise ValueError(f"{csv_path} has column(s) the app does not store: {', '.join(dropped)}. "
+                             "Remove or rename them before importing.")
+        count = self.replace_all(df)
+        self._mark_csv(csv_path, self.version())
+        return count
+
+    def unexported_changes(self):
+        """True if records were written since the last CSV import or export."""
+        synced = self._meta("csv_version")
+        if synced is None:
+            return self.count() > 0
+        return int(synced) != self.version()
+
+    def csv_changed(self, csv_path):
+        """True if csv_path exists and changed on disk since the last import/export."""
+        return os.path.exists(csv_path) and self._meta("csv_stamp") != self._csv_stamp(csv_path)
+
+    def sync_from_csv(self, csv_path, overwrite=False):
+        """
+        Import csv_path if it changed since the last import/export; returns True if it did.
+        A changed CSV is not imported over writes that were never exported (they would be
+        lost) unless overwrite is True; see csv_changed and unexported_changes.
+        """
+        if not self.csv_changed(csv_path) or (self.unexported_changes() and not overwrite):
+            return False
+        self.import_csv(csv_path)
+        return True
+
+    def export_csv(self, csv_path=None):
+        """
+        Write all records as CSV to csv_path (atomically), or return the CSV text if no path
+        is given. Raises ValueError instead of overwriting a CSV with columns the store lacks.
+        """
+        version = self.version()
+        df = self.load()
+        if csv_path is None:
+            return df.to_csv(index=False)
+        dropped = unknown_columns(pd.read_csv(csv_path, nrows=0).columns) if os.path.exists(csv_path) else []
+        if dropped:
+            raise ValueError(f"Not exported: {csv_path} has column(s) the app does not store "
+                             f"({', '.join(dropped)}) and overwriting it would lose them.")
+        tmp = f"{csv_path}.tmp"
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, csv_path)
+        self._mark_csv(csv_path, version)
+        return csv_path
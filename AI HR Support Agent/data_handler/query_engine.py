@@ -0,0 +1,247 @@
+import json
+import re
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from llm.context_builder import COMPARISON_RE, apply_filters, parse_filters, resolve_column, select_columns
+
+OPS = ("list", "count", "group", "mean", "sum", "min", "max", "top", "bottom")
+METRIC_OPS = ("mean", "sum", "min", "max", "top", "bottom")   # need a numeric metric column
+
+# Questions that need a written answer (or data the table does not hold, like dates) rather than a lookup.
+NARRATIVE_RE = re.compile(
+    r"\b(polic(y|ies)|how (do|can|should|to|does)|why|explain|describe|procedure|process for|apply for|"
+    r"entitle\w*|eligib\w*|rules?|draft|write|email to|advice|recommend\w*|suggest\w*|best|fair|"
+    r"cover for|replace\w*|should i|can i|on leave|absent|sick|today|tomorrow|yesterday|(this|next|last) "
+    r"(week|month|year))\b"
+)
+COUNT_RE = re.compile(r"\b(how many|count|number of|headcount|total staff|total employees)\b")
+LIST_RE = re.compile(r"\b(show|list|who|which|find|give me|display|get|names? of|what is|what's|whose)\b")
+STAFF_RE = re.compile(r"\b(all|every|employees?|staff|people|workforce|everyone)\b")
+GROUP_RE = re.compile(r"\b(?:by|per|for each|each|across)\s+(department|dept|ward|role|shift|location|city|site|"
+                      r"manager|employment type|employment)\b")
+METRIC_RES = [
+    ("mean", re.compile(r"\b(average|avg|mean|typical)\b")),
+    ("sum", re.compile(r"\b(total|sum)\b")),
+    ("max", re.compile(r"\b(highest|most|max(imum)?|largest)\b")),
+    ("min", re.compile(r"\b(lowest|least|fewest|min(imum)?|smallest)\b")),
+]
+GROUP_COLUMNS = {
+    "department": "Department", "dept": "Department", "ward": "Department", "role": "Role", "shift": "Shift",
+    "location": "Location", "city": "Location", "site": "Location", "manager": "Manager",
+    "employment type": "Employment_Type", "employment": "Employment_Type",
+}
+TOP_N = 5
+
+
+@dataclass
+class QuerySpec:
+    op: str                                        # one of OPS
+    filters: dict = field(default_factory=dict)    # as returned by context_builder.parse_filters
+    columns: list = field(default_factory=list)    # columns to show for list/top/bottom
+    group_by: str = None
+    metric: str = None                             # numeric column for mean/sum/min/max/top/bottom
+    source: str = "pattern"                        # pattern | llm
+
+
+@dataclass
+class QueryResult:
+    answer: str                  # markdown
+    table: pd.DataFrame = None   # rows or grouped values behind the answer
+    spec: QuerySpec = None
+
+
+def _matching(n):
+    return "**1** employee matches" if n == 1 else f"**{n}** employees match"
+
+
+def _describe(filters):
+    parts = []
+    for column, condition in filters.items():
+        if isinstance(condition, tuple):
+            parts.append(f"{column} {condition[0]} {condition[1]:g}")
+        else:
+            parts.append(f"{column} {' / '.join(map(str, condition))}")
+    return ", ".join(parts)
+
+
+def parse_question(question, df, aggregates=None):
+    """
+    QuerySpec for questions that are plain filters or aggregates over df,
+    e.g. "ICU nurses with <10 leave balance", "how many night shift staff in Pune",
+    "average leave balance by department". None if the question needs a written answer
+    or nothing in it maps onto the data. `aggregates` is passed on to parse_filters.
+    """
+    text = re.sub(r"\s+", " ", question.lower()).strip()
+    if NARRATIVE_RE.search(text):
+        return None
+    filters = parse_filters(question, df, aggregates)
+    leave_col = resolve_column(df, "Leave_Balance")
+    mentions_leave = leave_col is not None and re.search(r"\b(leave|balance|vacation|pto)\b", text)
+
+    group = GROUP_RE.search(text)
+    group_by = resolve_column(df, GROUP_COLUMNS[group.group(1)]) if group else None
+    unbounded = COMPARISON_RE.sub(" ", text)   # "at least 14" is a filter, not a minimum
+    metric = next((op for op, pattern in METRIC_RES if pattern.search(unbounded)), None)
+
+    if metric and mentions_leave:
+        if re.search(r"\b(who|which|whose|employees?|staff)\b", text) and not group_by and metric in ("max", "min"):
+            op = "top" if metric == "max" else "bottom"
+            return QuerySpec(op, filters, select_columns(question, df, filters), metric=leave_col)
+        return QuerySpec(metric, filters, group_by=group_by, metric=leave_col)
+    if COUNT_RE.search(text):
+        return QuerySpec("group" if group_by else "count", filters, group_by=group_by)
+    if group_by and (filters or STAFF_RE.search(text)):
+        return QuerySpec("group", filters, group_by=group_by)
+    if filters or (LIST_RE.search(text) and STAFF_RE.search(text)):
+        return QuerySpec("list", filters, select_columns(question, df, filters))
+    return None
+
+
+def spec_from_json(data, df):
+    """
+    Validate a compact structured filter (e.g. produced by the LLM) into a QuerySpec:
+    {"op": "count", "filters": {"Department": ["ICU"], "Leave_Balance": ["<", 10]},
+     "group_by": null, "columns": [...]}. {"op": "narrative"} or anything invalid gives None.
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data.strip().strip("`").removeprefix("json"))
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(data, dict) or data.get("op") not in OPS:
+        return None
+
+    filters = {}
+    for name, condition in (data.get("filters") or {}).items():
+        column = resolve_column(df, name)
+        if column is None:
+            return None
+        if isinstance(condition, (list, tuple)) and len(condition) == 2 and condition[0] in ("<", "<=", ">", ">=", "=="):
+            try:
+                filters[column] = (condition[0], float(condition[1]))
+            except (TypeError, ValueError):
+                return None
+        else:
+            filters[column] = [str(v) for v in (condition if isinstance(condition, list) else [condition])]
+
+    group_by = resolve_column(df, data["group_by"]) if data.get("group_by") else None
+    if data["op"] == "group" and group_by is None:
+        return None
+    columns = [c for c in (resolve_column(df, name) for name in data.get("columns") or []) if c is not None]
+    metric = resolve_column(df, "Leave_Balance") if data["op"] in METRIC_OPS else None
+    if data["op"] in METRIC_OPS and metric is None:
+        return None   # no leave column to aggregate: let the chat model answer
+    if data["op"] in ("list", "top", "bottom") and not columns:
+        columns = list(df.columns)
+    return QuerySpec(data["op"], filters, columns, group_by, metric, source="llm")
+
+
+def _from_aggregates(spec, aggregates, scope):
+    """
+    QueryResult read from `aggregates`: counts on indexed filters, and
+    headcounts or leave statistics over the whole workforce. None if the spec needs rows.
+    """
+    if spec.op == "count":
+        count = aggregates.count(spec.filters)
+        return None if count is None else QueryResult(f"{_matching(count)}{scope}.", spec=spec)
+    if spec.filters:
+        return None
+
+    if spec.op == "group" and spec.metric is None:
+        counts = aggregates.headcount(spec.group_by)
+        if counts is None:
+            return None
+        return QueryResult(f"Headcount by {spec.group_by}, {aggregates.size} employees in total:",
+                           counts.reset_index(), spec)
+
+    if spec.op not in ("mean", "sum", "min", "max") or spec.metric != "Leave_Balance":
+        return None
+    label = {"mean": "Average", "sum": "Total", "min": "Lowest", "max": "Highest"}[spec.op]
+    if spec.group_by:
+        stats = aggregates.leave_stats(spec.group_by)
+        if stats is None:
+            return None
+        grouped = pd.Series({k: v[spec.op] for k, v in stats.items()}).round(2)
+        grouped.index.name = spec.group_by
+        table = grouped.rename(f"{label} {spec.metric}").reset_index()
+        return QueryResult(f"{label} {spec.metric} by {spec.group_by}:", table, spec)
+    stats = aggregates.leave_stats()
+    if stats is None:
+        return None
+    value = round(float(stats[spec.op]), 2)
+    return QueryResult(f"{label} {spec.metric}: **{value:g}** across {aggregates.size} employees.", spec=spec)
+
+
+def run_query(spec, df, aggregates=None):
+    """
+    Evaluate a QuerySpec with vectorized pandas operations, reading counts, headcounts
+    and leave statistics from `aggregates` when given. None if the spec needs a metric
+    column df does not have.
+    """
+    if spec.op in METRIC_OPS and spec.metric not in df.columns:
+        return None
+    scope = f" ({_describe(spec.filters)})" if spec.filters else ""
+    if aggregates is not None and aggregates.describes(df):
+        result = _from_aggregates(spec, aggregates, scope)
+        if result is not None:
+            return result
+    rows = apply_filters(df, spec.filters, aggregates) if spec.filters else df
+
+    if spec.op == "count":
+        return QueryResult(f"{_matching(len(rows))}{scope}.", spec=spec)
+
+    if spec.op == "list":
+        if rows.empty:
+            return QueryResult(f"No employees match{scope}.", rows[spec.columns], spec)
+        return QueryResult(f"{_matching(len(rows))}{scope}:", rows[spec.columns], spec)
+
+    if spec.op in ("top", "bottom"):
+        values = pd.to_numeric(rows[spec.metric], errors="coerce")
+        order = values.nlargest(TOP_N) if spec.op == "top" else values.nsmallest(TOP_N)
+        label = "Highest" if spec.op == "top" else "Lowest"
+        return QueryResult(f"{label} {spec.metric}{scope}:", rows.loc[order.index, spec.columns], spec)
+
+    if spec.op == "group" and spec.metric is None:
+        counts = rows.groupby(spec.group_by, observed=True).size().sort_values(ascending=False)
+        table = counts.rename("Headcount").reset_index()
+        return QueryResult(f"Headcount by {spec.group_by}{scope}, {len(rows)} employees in total:", table, spec)
+
+    values = pd.to_numeric(rows[spec.metric], errors="coerce")
+    if spec.op not in ("mean", "sum", "min", "max"):
+        return None
+    label = {"mean": "Average", "sum": "Total", "min": "Lowest", "max": "Highest"}[spec.op]
+    if spec.group_by:
+        grouped = getattr(values.groupby(rows[spec.group_by], observed=True), spec.op)().round(2)
+        table = grouped.rename(f"{label} {spec.metric}").reset_index()
+        return QueryResult(f"{label} {spec.metric} by {spec.group_by}{scope}:", table, spec)
+    if rows.empty:
+        return QueryResult(f"No employees match{scope}.", spec=spec)
+    value = round(float(getattr(values, spec.op)()), 2)
+    return QueryResult(f"{label} {spec.metric}{scope}: **{value:g}** across {len(rows)} employees.", spec=spec)
+
+
+def looks_like_data_question(question):
+    """Worth asking the LLM for a structured filter: a lookup or aggregate the patterns could not map."""
+    text = question.lower()
+    return not NARRATIVE_RE.search(text) and bool(
+        COUNT_RE.search(text) or LIST_RE.search(text) or any(p.search(text) for _, p in METRIC_RES)
+    )
+
+
+def answer_question(question, df, llm_filter=None, aggregates=None):
+    """
+    Answer a data question locally. Patterns are tried first; if they do not map the
+    question and it still looks like a lookup, `llm_filter(question, df)` (which returns
+    a compact JSON filter) is asked instead of the full chat completion. Returns a
+    QueryResult, or None when the question needs a narrative answer.
+    """
+    if df.empty:
+        return None
+    spec = parse_question(question, df, aggregates)
+    if spec is None and llm_filter is not None and looks_like_data_question(question):
+        spec = spec_from_json(llm_filter(question, df), df)
+    if spec is None:
+        return None
+    return run_query(spec, df, aggregates)
@@ -0,0 +1,49 @@
+import bisect
+import re
+
+
+class PrefixIndex:
+    """
+    Search-as-you-type index over employee IDs and names.
+
+    Keys are the lower-cased ID and every word-suffix of the name ("nurse priya nair",
+    "priya nair", "nair"), kept sorted, so a prefix lookup is a bisection plus a
+    scan of the matches: "E00", "priya n" and "nair" all hit without scanning rows.
+    Results are row positions in the DataFrame the index was built from.
+    """
+
+    def __init__(self, ids, names):
+        self.ids = [str(i) for i in ids]
+        self.names = ["" if n is None else str(n) for n in names]
+        entries = []
+        for position, (employee_id, name) in enumerate(zip(self.ids, self.names)):
+            entries.append((employee_id.lower(), position))
+            words = re.findall(r"[\w'-]+", name.lower())
+            entries.extend((" ".join(words[i:]), position) for i in range(len(words)))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._positions = [position for _, position in entries]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def positions(self, prefix, limit=None):
+        """Row positions whose ID or name (from any word) starts with `prefix`, in key order, deduplicated."""
+        prefix = " ".join(re.findall(r"[\w'-]+", prefix.lower()))
+        if not prefix:
+            return []
+        found, seen = [], set()
+        for i in range(bisect.bisect_left(self._keys, prefix), len(self._keys)):
+            if not self._keys[i].startswith(prefix):
+                break
+            position = self._positions[i]
+            if position not in seen:
+                seen.add(position)
+                found.append(position)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def search(self, prefix, limit=20):
+        """Up to `limit` (Employee_ID, name) pairs matching `prefix`."""
+        return [(self.ids[p], self.names[p]) for p in self.positions(prefix, limit)]
@@ -0,0 +1,113 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+
+def normalize_question(question):
+    """Lower-cased, whitespace-collapsed question without surrounding punctuation."""
+    text = re.sub(r"\s+", " ", question.lower()).strip()
+    return text.strip(" ?!.,;:")
+
+
+class AnswerCache:
+    """
+    Persistent LLM answer cache keyed on (normalized question, model, dataset version),
+    stored in SQLite next to the HR data and shared by every session and process.
+
+    Any save bumps the dataset version, so answers about old data can never be
+    returned; the first lookup under a new version also deletes them. At most
+    `max_entries` answers are kept, evicting the least recently used.
+    """
+
+    def __init__(self, db_path, max_entries=500):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version = None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answer_cache (
+                    key TEXT PRIMARY KEY,
+                    question TEXT,
+                    version INTEGER,
+                    answer TEXT,
+                    hits INTEGER DEFAULT 0,
+                    created_at REAL,
+                    last_used REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_last_used ON answer_cache(last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS answer_cache_stats (name TEXT PRIMARY KEY, value INTEGER)")
+            conn.executemany("INSERT OR IGNORE INTO answer_cache_stats (name, value) VALUES (?, 0)",
+                             [("hits",), ("misses",), ("evictions",), ("invalidated",)])
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def _key(question, model):
+        return hashlib.sha256(f"{model}\n{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _count(conn, name, amount=1):
+        conn.execute("UPDATE answer_cache_stats SET value = value + ? WHERE name = ?", (amount, name))
+
+    def _drop_stale(self, conn, version):
+        """Delete answers cached under other dataset versions (once per version per process)."""
+        if self._version == version:
+            return
+        removed = conn.execute("DELETE FROM answer_cache WHERE version != ?", (version,)).rowcount
+        if removed:
+            self._count(conn, "invalidated", removed)
+        self._version = version
+
+    def get(self, question, version, model=""):
+        with self._lock, self._connect() as conn:
+            self._drop_stale(conn, version)
+            key = self._key(question, model)
+            row = conn.execute(
+                "SELECT answer FROM answer_cache WHERE key = ? AND version = ?", (key, version)
+            ).fetchone()
+            if row is None:
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE answer_cache SET hits = hits + 1, last_used = ? WHERE key = ?", (time.time(), key))
+            self._count(conn, "hits")
+            return row[0]
+
+    def put(self, question, version, answer, model=""):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            self._drop_stale(conn, version)
+            conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, question, version, answer, hits, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (self._key(question, model), normalize_question(question), version, answer, now, now),
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM answer_cache WHERE key IN "
+                    "(SELECT key FROM answer_cache ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self._count(conn, "evictions", excess)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM answer_cache")
+            conn.execute("UPDATE answer_cache_stats SET value = 0")
+
+    def stats(self):
+        with self._connect() as conn:
+            stats = dict(conn.execute("SELECT name, value FROM answer_cache_stats"))
+            stats["entries"] = conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0]
+            stats["top_questions"] = [
+                {"question": q, "hits": h}
+                for q, h in conn.execute("SELECT question, hits FROM answer_cache ORDER BY hits DESC LIMIT 10")
+            ]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
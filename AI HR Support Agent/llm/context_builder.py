@@ -0,0 +1,274 @@
+import re
+import weakref
+
+import pandas as pd
+
+# Columns always sent when rows are sent, so the model can name who it is talking about.
+KEY_COLUMNS = ["Employee_ID", "Full_Name"]
+
+# Low-cardinality columns whose values can be picked out of a question ("ICU nurses on night shift").
+FILTER_COLUMNS = ["Department", "Role", "Shift", "Employment_Type", "Location"]
+
+# Columns holding people's names, matched against runs of words in the question.
+PERSON_COLUMNS = ["Full_Name", "Manager"]
+
+# Question words that mean a column is needed in the answer.
+COLUMN_KEYWORDS = {
+    "Leave_Balance": ["leave", "vacation", "holiday", "pto", "time off", "days off"],
+    "Shift": ["shift", "night", "morning", "evening", "roster", "rota"],
+    "Department": ["department", "dept", "ward", "unit"],
+    "Role": ["role", "position", "job", "title", "nurse", "doctor", "technician", "admin"],
+    "Manager": ["manager", "reports to", "report to", "supervisor", "lead"],
+    "Email": ["email", "e-mail", "contact", "mail"],
+    "Location": ["location", "city", "site", "branch", "based"],
+    "Employment_Type": ["full-time", "full time", "part-time", "part time", "employment", "contract"],
+}
+
+SUMMARY_COLUMNS = ["Department", "Role", "Shift", "Employment_Type", "Location"]
+
+COMPARISONS = [
+    (r"<=|at most|no more than|up to", "<="),
+    (r">=|at least|no less than", ">="),
+    (r"<|less than|fewer than|under|below", "<"),
+    (r">|more than|greater than|over|above", ">"),
+    (r"=|exactly|equal to", "=="),
+]
+COMPARISON_RE = re.compile(
+    r"(%s)\s*(\d+(?:\.\d+)?)" % "|".join(pattern for pattern, _ in COMPARISONS), re.IGNORECASE
+)
+_NAME_NOISE = r"^(?:dr|nurse|technician|admin|mr|mrs|ms)\b\.?\s*|[^\w\s]"
+_LOOKUPS = {}
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4
+
+
+def resolve_column(df, name):
+    """Actual column in df for `name`, ignoring case (the CSV uses Leave_Balance, the forms leave_balance)."""
+    wanted = name.lower()
+    for column in df.columns:
+        if str(column).lower() == wanted:
+            return column
+    return None
+
+
+def _mentions(text, phrase):
+    """Whole-word (or plural) mention of `phrase` in lower-cased `text`."""
+    return re.search(r"(?<![\w-])%ss?(?![\w-])" % re.escape(phrase.lower()), text) is not None
+
+
+def _normalize_name(values):
+    """Lower-cased names without titles or punctuation ("Dr. R. Verma" -> "r verma")."""
+    return values.str.lower().str.replace(_NAME_NOISE, "", regex=True).str.strip()
+
+
+def _lookup(df, column, normalize):
+    """
+    {normalized value: [values]} for one column of df, built once per DataFrame object
+    (dropped when df is garbage collected) so name and ID lookups do not rescan every row.
+    """
+    key = (id(df), column)
+    entry = _LOOKUPS.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    values = pd.Series(df[column].dropna().astype(str).unique())
+    index = {}
+    for value, normalized in zip(values, normalize(values)):
+        index.setdefault(normalized, []).append(value)
+    _LOOKUPS[key] = (weakref.ref(df, lambda _: _LOOKUPS.pop(key, None)), index)
+    return index
+
+
+def _word_spans(text, longest=4):
+    """Every run of 2..`longest` words in text (names have at least a first and last name)."""
+    words = re.findall(r"\w+", text.replace("'s ", " "))
+    return {" ".join(words[i:i + n]) for n in range(2, longest + 1) for i in range(len(words) - n + 1)}
+
+
+def _leave_condition(question):
+    lowered = question.lower()
+    if "leave" not in lowered and "balance" not in lowered:
+        return None
+    match = COMPARISON_RE.search(lowered)
+    if not match:
+        return None
+    word, number = match.group(1), float(match.group(2))
+    for pattern, op in COMPARISONS:
+        if re.fullmatch(pattern, word):
+            return op, number
+    return None
+
+
+def parse_filters(question, df, aggregates=None):
+    """
+    Filters a question implies for df: {column: [values]} for categorical columns,
+    Employee IDs and names, and {Leave_Balance column: (op, number)} for leave comparisons.
+    Categorical values are taken from `aggregates` when given.
+    """
+    text = question.lower()
+    filters = {}
+
+    id_col = resolve_column(df, "Employee_ID")
+    if id_col is not None:
+        tokens = {t.upper() for t in re.findall(r"[a-z]+\d+", text)}
+        if tokens:
+            index = _lookup(df, id_col, lambda ids: ids.str.upper())
+            ids = [i for t in sorted(tokens) for i in index.get(t, [])]
+            if ids:
+                filters[id_col] = ids
+
+    spans = _word_spans(text)
+    for name in PERSON_COLUMNS:
+        column = resolve_column(df, name)
+        if column is None or (name == "Full_Name" and id_col in filters):
+            continue
+        index = _lookup(df, column, _normalize_name)
+        names = [n for span in sorted(spans) for n in index.get(span, [])]
+        if names:
+            filters[column] = names
+
+    for name in FILTER_COLUMNS:
+        column = resolve_column(df, name)
+        if column is None:
+            continue
+        known = aggregates.values(column) if aggregates is not None and aggregates.describes(df) else None
+        if known is None:
+            known = df[column].dropna().astype(str).unique()
+        values = [v for v in known if v and _mentions(text, v)]
+        if values:
+            filters[column] = values
+
+    leave_col = resolve_column(df, "Leave_Balance")
+    condition = _leave_condition(question)
+    if leave_col is not None and condition:
+        filters[leave_col] = condition
+    return filters
+
+
+def apply_filters(df, filters, aggregates=None):
+    """Rows of df matching filters; roster and ID filters are looked up in `aggregates` when given."""
+    if aggregates is not None and aggregates.describes(df):
+        positions, filters = aggregates.positions(filters)
+        if positions is not None:
+            df = df.iloc[positions]
+        if not filters:
+            return df
+    mask = pd.Series(True, index=df.index)
+    for column, condition in filters.items():
+        if isinstance(condition, tuple):
+            op, number = condition
+            values = pd.to_numeric(df[column], errors="coerce")
+            mask &= {"<": values < number, "<=": values <= number, ">": values > number,
+                     ">=": values >= number, "==": values == number}[op]
+        else:
+            matched = df[column].isin(condition)
+            if set(map(str, condition)) - set(map(str, df.loc[matched, column].unique())):
+                # some values are not spelled as in the data (e.g. from the LLM): compare case-insensitively
+                wanted = {str(v).lower() for v in condition}
+                matched = df[column].astype(str).str.lower().isin(wanted)
+            mask &= matched
+    return df[mask]
+
+
+def select_columns(question, df, filters=None):
+    """Key columns, filtered columns and columns the question asks about; every column if none are asked for."""
+    text = question.lower()
+    asked = [name for name, words in COLUMN_KEYWORDS.items() if any(_mentions(text, w) for w in words)]
+    if not asked and not filters:
+        return list(df.columns)
+    columns = []
+    for name in KEY_COLUMNS + asked:
+        column = resolve_column(df, name)
+        if column is not None and column not in columns:
+            columns.append(column)
+    for column in filters or {}:
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def summarize(df, aggregates=None):
+    """Aggregate view of df: headcounts per category and leave balance statistics (from `aggregates` if given)."""
+    if aggregates is not None and not aggregates.describes(df):
+        aggregates = None
+    lines = [f"Headcount: {len(df)}"]
+    for name in SUMMARY_COLUMNS:
+        column = resolve_column(df, name)
+        if column is None:
+            continue
+        counts = aggregates.headcount(column) if aggregates is not None else None
+        if counts is None:
+            counts = df[column].value_counts()
+        counts = counts[counts > 0]
+        lines.append(f"By {column}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    leave_col = resolve_column(df, "Leave_Balance")
+    if leave_col is not None and len(df):
+        dept_col = resolve_column(df, "Department")
+        stats = aggregates.leave_stats() if aggregates is not None else None
+        if stats is not None:
+            by_dept = ({k: round(v["mean"], 1) for k, v in aggregates.leave_stats(dept_col).items()}
+                       if dept_col is not None else {})
+        else:
+            leave = pd.to_numeric(df[leave_col], errors="coerce")
+            stats = {"min": leave.min(), "median": leave.median(), "mean": leave.mean(), "max": leave.max()}
+            by_dept = leave.groupby(df[dept_col], observed=True).mean().round(1) if dept_col is not None else {}
+        lines.append(f"{leave_col}: min {stats['min']:g}, median {stats['median']:g}, "
+                     f"mean {stats['mean']:.1f}, max {stats['max']:g}")
+        if dept_col is not None:
+            lines.append(f"Mean {leave_col} by {dept_col}: " + ", ".join(f"{k} {v:g}" for k, v in by_dept.items()))
+    return "\n".join(lines)
+
+
+def _rows_within(rows, max_tokens):
+    """CSV header plus as many rows as fit in `max_tokens`; returns (text, rows included)."""
+    budget = max_tokens * 4
+    lines = rows.head(budget // 8 + 1).to_csv(index=False).splitlines()   # no row renders in under 8 chars
+    used = len(lines[0]) + 1
+    count = 0
+    for line in lines[1:]:
+        if used + len(line) + 1 > budget:
+            break
+        used += len(line) + 1
+        count += 1
+    return "\n".join(lines[:count + 1]), count
+
+
+def build_hr_context(question, df, max_tokens=3000, aggregates=None):
+    """
+    Dataset context for one HR question, within `max_tokens`.
+
+    The question is resolved against df locally first (department, role, shift,
+    employment type, location, employee ID/name, leave balance comparisons) and only
+    the matching rows and needed columns are sent, as CSV. If they do not fit, the
+    rows that fit are sent with aggregates over all matches; with no usable filter
+    on a large dataset, aggregates of the whole dataset are sent instead.
+    """
+    if df.empty:
+        return "No employee data loaded."
+
+    filters = parse_filters(question, df, aggregates)
+    matches = apply_filters(df, filters, aggregates) if filters else df
+    columns = select_columns(question, df, filters)
+    described = "; ".join(
+        f"{c} {v[0]} {v[1]:g}" if isinstance(v, tuple) else f"{c} in {', '.join(map(str, v))}"
+        for c, v in filters.items()
+    ) or "none"
+    header = f"Employees matching the question: {len(matches)} of {len(df)} (filters: {described})"
+
+    if filters and matches.empty:
+        return f"{header}\n\nNo employee matches these filters.\n\nWhole dataset summary:\n{summarize(df, aggregates)}"
+
+    table, shown = _rows_within(matches[columns], max_tokens - estimate_tokens(header) - 16)
+    if shown == len(matches):
+        return f"{header}\n\n{table}"
+
+    summary = summarize(matches, None if filters else aggregates)
+    if filters:
+        table, shown = _rows_within(
+            matches[columns], max_tokens - estimate_tokens(header) - estimate_tokens(summary) - 32
+        )
+    if not filters or shown == 0:
+        return f"{header}\n\nToo many rows to list; summary:\n{summary}"
+    return f"{header}\n\nFirst {shown} rows:\n{table}\n\nSummary of all {len(matches)} matches:\n{summary}"
@@ -1,22 +1,36 @@
-import openai
+import json
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
+from openai import OpenAI
+from llm.context_builder import FILTER_COLUMNS, build_hr_context, resolve_column
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai.api_key = OPENAI_API_KEY
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+FILTER_TIMEOUT_SECONDS = 10
+HR_CONTEXT_TOKENS = int(os.getenv("HR_CONTEXT_TOKENS", "3000"))
 
-def query_openai(prompt, df):
+@lru_cache(maxsize=None)
+def get_openai_client():
     """
-    Uses OpenAI LLM to interpret HR-related queries and use HR dataset as context.
+    One client per process, so every question reuses the same HTTP connection pool.
+    The SDK retries connection errors, 429s and 5xx up to OPENAI_MAX_RETRIES times with
+    exponential backoff; each attempt is bounded by OPENAI_TIMEOUT_SECONDS.
     """
-    hr_summary = df.to_dict(orient="records")
+    return OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT_SECONDS, max_retries=OPENAI_MAX_RETRIES)
 
-    full_prompt = f"""
+def build_prompt(prompt, df, aggregates=None):
+    """Chat prompt for one question; only the rows and columns relevant to it are sent (see context_builder)."""
+    hr_context = build_hr_context(prompt, df, max_tokens=HR_CONTEXT_TOKENS, aggregates=aggregates)
+
+    return f"""
     You are an AI HR assistant for a hospital.
-    You have access to this employee dataset (sample below):
-    {hr_summary}
+    You have access to the part of the employee dataset relevant to this question:
+    {hr_context}
 
     User Query:
     {prompt}
@@ -25,12 +39,62 @@ def query_openai(prompt, df):
     If the question relates to staff data, use dataset context.
     """
 
+def stream_openai(prompt, df, aggregates=None):
+    """
+    Uses OpenAI LLM to interpret HR-related queries and use HR dataset as context,
+    yielding the answer as it is generated (for st.write_stream).
+    API errors are raised (openai.OpenAIError) for the caller to show.
+    """
+    stream = get_openai_client().chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": build_prompt(prompt, df, aggregates)}],
+        temperature=0.4,
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def query_openai(prompt, df, aggregates=None):
+    """Complete answer to an HR query (non-streaming); raises openai.OpenAIError on failure."""
+    return "".join(stream_openai(prompt, df, aggregates)).strip()
+
+
+def query_structured_filter(prompt, df):
+    """
+    Asks the LLM only to translate a data question into a compact JSON filter
+    (see query_engine.spec_from_json); the filter itself is run locally with pandas.
+    Returns the JSON text, or None on error.
+    """
+    values = {}
+    for name in FILTER_COLUMNS:
+        column = resolve_column(df, name)
+        if column is not None:
+            values[column] = sorted(map(str, df[column].dropna().unique()))[:50]
+
+    filter_prompt = f"""
+    Translate the HR question into a JSON query over an employee table.
+    Columns: {", ".join(map(str, df.columns))}
+    Known values: {json.dumps(values)}
+
+    Reply with ONE JSON object only:
+    {{"op": "list|count|group|mean|sum|min|max|top|bottom|narrative",
+      "filters": {{"<column>": ["value", ...] or ["<|<=|>|>=|==", number]}},
+      "group_by": "<column>" or null, "columns": ["<column>", ...]}}
+    Use "narrative" if the question cannot be answered from the table alone.
+
+    Question: {prompt}
+    """
+
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": full_prompt}],
-            temperature=0.4
+        response = get_openai_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": filter_prompt}],
+            temperature=0,
+            max_tokens=150,
+            response_format={"type": "json_object"},
+            timeout=FILTER_TIMEOUT_SECONDS
         )
         return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"LLM Error: {e}"
+    except Exception:
+        return None
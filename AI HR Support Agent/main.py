@@ -2,9 +2,17 @@ import streamlit as st
 import pandas as pd
 from dotenv import load_dotenv
 import os
-from data_handler.data_handler import load_hr_data, save_hr_data
-from llm.llm_handler import query_openai
-from ui.ui_components import show_employee_data, add_employee_form, update_leave_form
+from data_handler.data_handler import (
+    csv_conflict, export_hr_data, get_answer_cache, get_hr_aggregates, get_search_index, hr_data_version,
+    load_hr_data, reload_hr_data
+)
+from data_handler.query_engine import answer_question
+from openai import OpenAIError
+from llm.llm_handler import OPENAI_MODEL, query_structured_filter, stream_openai
+from ui.ui_components import (
+    show_employee_data, add_employee_form, update_leave_form, bulk_import_form, leave_adjustment_form,
+    answer_cache_panel, workforce_overview
+)
 
 load_dotenv()
 
@@ -18,37 +26,78 @@ st.sidebar.header("Settings")
 csv_user_path = st.sidebar.text_input("CSV File Path", value=CSV_FILE_PATH)
 if st.sidebar.button("Reload Data"):
     CSV_FILE_PATH = csv_user_path
-    st.cache_data.clear()
+    reload_hr_data(CSV_FILE_PATH)
+if st.sidebar.button("Export to CSV"):
+    export_hr_data(CSV_FILE_PATH)
+if CSV_FILE_PATH and csv_conflict(CSV_FILE_PATH):
+    if st.sidebar.button("Import CSV (discard app edits)"):
+        reload_hr_data(CSV_FILE_PATH, overwrite=True)
+    else:
+        st.sidebar.warning("The CSV file changed on disk, but the app has edits that were not exported. "
+                           "Export to CSV to keep the app's data, or import the file to discard those edits.")
 
-df = load_hr_data(CSV_FILE_PATH)
+# Read the data version once, so the frame, search index, aggregates and cached answers of this run agree.
+version = hr_data_version(CSV_FILE_PATH)
+df = load_hr_data(CSV_FILE_PATH, version)
+answer_cache = None if df.empty else get_answer_cache(CSV_FILE_PATH)
+aggregates = None if df.empty else get_hr_aggregates(CSV_FILE_PATH, version)
+if answer_cache is not None:
+    answer_cache_panel(answer_cache)
 
 if df.empty:
     st.warning("No data found. Please check your CSV path and reload.")
 else:
     st.success(f"Loaded {len(df)} employee records from CSV.")
-    show_employee_data(df)
+    search_index = get_search_index(CSV_FILE_PATH, version)
+    workforce_overview(aggregates)
+    show_employee_data(df, search_index, aggregates)
 
 st.markdown("### Ask the AI HR Assistant")
 user_input = st.text_area("Type your HR question (e.g., 'Show ICU nurses with <10 leave balance'):")
 
 if st.button("Get Response"):
     if user_input.strip():
-        with st.spinner("Thinking..."):
-            response = query_openai(user_input, df)
-        st.markdown("**AI Response:**")
-        st.write(response)
+        # Filters and aggregates are answered locally; only narrative questions go to the chat model.
+        result = answer_question(user_input, df, llm_filter=query_structured_filter, aggregates=aggregates)
+        if result is not None:
+            st.markdown("**Answer:**")
+            st.markdown(result.answer)
+            if result.table is not None and not result.table.empty:
+                st.dataframe(result.table, use_container_width=True, hide_index=True)
+        else:
+            st.markdown("**AI Response:**")
+            cached = answer_cache.get(user_input, version, OPENAI_MODEL) if answer_cache is not None else None
+            if cached is not None:
+                st.markdown(cached)
+                st.caption("Answered from cache (same question, same HR data).")
+            else:
+                try:
+                    answer = st.write_stream(stream_openai(user_input, df, aggregates))
+                    if answer_cache is not None:
+                        answer_cache.put(user_input, version, answer, OPENAI_MODEL)
+                except OpenAIError as e:
+                    st.error(f"LLM Error: {e}")
     else:
         st.warning("Please enter a question.")
 
 st.markdown("---")
 st.subheader("Manage HR Data")
-tab1, tab2 = st.tabs(["Add Employee", "Update Leave Balance"])
+tab1, tab2, tab3, tab4 = st.tabs(["Add Employee", "Update Leave Balance", "Bulk Import", "Batch Leave Adjustment"])
 
 with tab1:
     add_employee_form(df, CSV_FILE_PATH)
 
 with tab2:
-    update_leave_form(df, CSV_FILE_PATH)
+    if df.empty:
+        st.info("Load employee data to update leave balances.")
+    else:
+        update_leave_form(search_index, CSV_FILE_PATH)
+
+with tab3:
+    bulk_import_form(CSV_FILE_PATH)
+
+with tab4:
+    leave_adjustment_form(df, CSV_FILE_PATH)
 
 st.markdown("---")
 st.caption("Built using Streamlit and OpenAI | 2025 Healthcare HR AI")
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from data_handler.aggregates import HRAggregates
+from data_handler.hr_store import HRStore
+from data_handler.query_engine import answer_question
+from llm.context_builder import apply_filters, summarize
+
+from test_hr_store import ROWS
+
+
+def test_aggregates_of_another_version_are_not_used(tmp_path):
+    store = HRStore(str(tmp_path / "HR_Data.db"))
+    store.replace_all(pd.DataFrame(ROWS))
+    before = store.load()
+    aggregates = HRAggregates.from_frame(before)
+    assert aggregates.describes(before)
+    assert not aggregates.describes(before[before["Department"] == "ICU"])
+
+    # A re-import with the same number of rows: the old index maps point at the wrong employees.
+    store.replace_all(pd.DataFrame([ROWS[2], ROWS[0], ROWS[1]]))
+    after = store.load()
+    assert not aggregates.describes(after)
+    assert apply_filters(after, {"Department": ["ICU"]}, aggregates)["Employee_ID"].tolist() == ["E001"]
+
+    store.update_leave("E002", 1)
+    latest = store.load()
+    assert "Leave_Balance: min 1," in summarize(latest, HRAggregates.from_frame(after))
+
+
+def view(aggregates):
+    """Everything the aggregates answer, in comparable form."""
+    columns = ["Department", "Role", "Shift", "Employment_Type", "Location", "Manager"]
+    return {
+        "size": aggregates.size,
+        "headcount": {c: aggregates.headcount(c).to_dict() for c in columns},
+        "members": {c: {v: aggregates.members(c, v).tolist() for v in aggregates.values(c)} for c in columns},
+        "ids": aggregates.positions({"Employee_ID": [r["Employee_ID"] for r in ROWS]})[0].tolist(),
+        "roster": aggregates.crosstab("Department", "Shift").to_dict(),
+        "leave": aggregates.leave_stats(),
+        "leave_by": {c: aggregates.leave_stats(c) for c in columns},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HRStore(str(tmp_path / "HR_Data.db"))
+    store.replace_all(pd.DataFrame(ROWS))
+    return store
+
+
+def test_leave_change_matches_a_rebuild(store):
+    aggregates = HRAggregates.from_frame(store.load())
+    before = store.get("E001")
+    store.update_leave("E001", 40)
+    derived = aggregates.with_leave_change(store.version(), before, 40)
+    rebuilt = HRAggregates.from_frame(store.load())
+    assert derived.version == rebuilt.version
+    assert view(derived) == view(rebuilt)
+    assert derived.leave_stats()["sum"] == 85 and aggregates.leave_stats()["sum"] == 57   # previous version intact
+
+
+def test_new_employee_matches_a_rebuild(store):
+    aggregates = HRAggregates.from_frame(store.load())
+    row = store.add_employee({"employee_id": "E004", "full_name": "Kiran Shah", "role": "Nurse",
+                              "department": "Radiology", "shift": "Night", "leave_balance": 9,
+                              "manager": "Dr. Iyer", "employment_type": "Full-time", "location": "Pune"})
+    derived = aggregates.with_new_employee(store.version(), row)
+    rebuilt = HRAggregates.from_frame(store.load())
+    assert view(derived) == view(rebuilt)
+    assert derived.members("Department", "Radiology").tolist() == [3]
+    assert aggregates.size == 3
+
+
+def test_aggregates_answer_like_the_frame(store):
+    df = store.load()
+    aggregates = HRAggregates.from_frame(df)
+    for question in ["How many staff in Pune?", "headcount by department", "average leave balance by shift",
+                     "lowest leave balance", "Show nurses in ICU"]:
+        with_aggregates, from_rows = answer_question(question, df, aggregates=aggregates), answer_question(question, df)
+        assert with_aggregates.answer == from_rows.answer, question
+        if from_rows.table is not None:
+            assert with_aggregates.table.to_dict("list") == from_rows.table.to_dict("list"), question
@@ -0,0 +1,40 @@
+import itertools
+import types
+
+import pytest
+
+from llm import answer_cache
+from llm.answer_cache import AnswerCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    clock = itertools.count(1)
+    monkeypatch.setattr(answer_cache, "time", types.SimpleNamespace(time=lambda: float(next(clock))))
+    return AnswerCache(str(tmp_path / "HR_Data.db"), max_entries=2)
+
+
+def test_same_question_same_version_is_a_hit(cache):
+    assert cache.get("Who is on night shift?", 1, "m") is None
+    cache.put("Who is on night shift?", 1, "Asha", "m")
+    assert cache.get("  who is on NIGHT shift ", 1, "m") == "Asha"
+    assert cache.get("Who is on night shift?", 1, "other-model") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+
+def test_new_data_version_invalidates_answers(cache):
+    cache.put("Who is on night shift?", 1, "Asha", "m")
+    assert cache.get("Who is on night shift?", 2, "m") is None
+    assert cache.stats()["invalidated"] == 1
+    assert cache.get("Who is on night shift?", 1, "m") is None   # deleted, not just hidden
+
+
+def test_least_recently_used_answer_is_evicted(cache):
+    cache.put("first", 1, "a")
+    cache.put("second", 1, "b")
+    assert cache.get("first", 1) == "a"      # second is now the least recently used
+    cache.put("third", 1, "c")
+    assert cache.get("second", 1) is None
+    assert (cache.get("first", 1), cache.get("third", 1)) == ("a", "c")
+    assert cache.stats()["evictions"] == 1
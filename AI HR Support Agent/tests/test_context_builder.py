@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from llm.context_builder import apply_filters, build_hr_context, estimate_tokens, parse_filters, select_columns
+
+from test_hr_store import ROWS
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(ROWS)
+
+
+@pytest.fixture
+def large():
+    departments, shifts = ["ICU", "Cardiology", "HR", "Radiology"], ["Morning", "Evening", "Night"]
+    return pd.DataFrame([
+        {"Employee_ID": f"E{i:04d}", "Full_Name": f"Person {i}", "Role": "Nurse" if i % 3 else "Doctor",
+         "Department": departments[i % 4], "Shift": shifts[i % 3], "Leave_Balance": i % 30,
+         "Manager": "Dr. Iyer", "Employment_Type": "Full-time", "Email": f"p{i}@hospital.com", "Location": "Pune"}
+        for i in range(2000)
+    ])
+
+
+def test_parse_filters_maps_categories_and_leave_comparison(df):
+    filters = parse_filters("ICU nurses on night shift with less than 15 leave days", df)
+    assert filters == {"Department": ["ICU"], "Role": ["Nurse"], "Shift": ["Night"], "Leave_Balance": ("<", 15.0)}
+    assert apply_filters(df, filters)["Employee_ID"].tolist() == ["E001"]
+
+
+def test_parse_filters_finds_ids_and_names(df):
+    assert parse_filters("What is e002's leave balance?", df) == {"Employee_ID": ["E002"]}
+    assert parse_filters("Who is Meera Das's manager?", df) == {"Full_Name": ["Meera Das"]}
+    roster = df.assign(Manager=["Dr. R. Verma", "Dr. Iyer", "Dr. Iyer"])
+    assert parse_filters("Who reports to Dr. R. Verma?", roster) == {"Manager": ["Dr. R. Verma"]}
+    assert parse_filters("What is the leave policy?", df) == {}
+
+
+def test_select_columns_keeps_keys_and_asked_columns(df):
+    assert select_columns("leave balance of ICU staff", df, {"Department": ["ICU"]}) == [
+        "Employee_ID", "Full_Name", "Leave_Balance", "Department"]
+    assert select_columns("tell me about everyone", df) == list(df.columns)
+
+
+def test_small_match_is_sent_as_rows(df):
+    context = build_hr_context("leave balance of ICU staff", df)
+    assert "1 of 3" in context
+    assert "E001,Asha Rao,12,ICU" in context and "E002" not in context
+
+
+@pytest.mark.parametrize("question, marker", [
+    ("leave balance of nurses", "Summary of all"),             # filtered: first rows plus a summary
+    ("tell me about the workforce", "Too many rows to list"),  # unfiltered: whole-dataset summary
+])
+def test_large_context_stays_within_budget(large, question, marker):
+    context = build_hr_context(question, large, max_tokens=400)
+    assert marker in context
+    assert estimate_tokens(context) <= 400
+
+
+def test_no_match_falls_back_to_dataset_summary(df):
+    context = build_hr_context("ICU staff with more than 100 leave days", df)
+    assert "No employee matches these filters" in context
+    assert "Headcount: 3" in context
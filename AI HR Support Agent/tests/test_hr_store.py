@@ -0,0 +1,120 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from data_handler.hr_store import HRStore
+
+ROWS = [
+    {"Employee_ID": "E001", "Full_Name": "Asha Rao", "Role": "Nurse", "Department": "ICU", "Shift": "Night",
+     "Leave_Balance": 12, "Manager": "Dr. Mehta", "Employment_Type": "Full-time", "Email": "asha@hospital.com",
+     "Location": "Pune"},
+    {"Employee_ID": "E002", "Full_Name": "Ravi Nair", "Role": "Doctor", "Department": "Cardiology",
+     "Shift": "Morning", "Leave_Balance": 40, "Manager": "Dr. Iyer", "Employment_Type": "Full-time",
+     "Email": "ravi@hospital.com", "Location": "Mumbai"},
+    {"Employee_ID": "E003", "Full_Name": "Meera Das", "Role": "Admin", "Department": "HR", "Shift": "Morning",
+     "Leave_Balance": 5, "Manager": "Dr. Iyer", "Employment_Type": "Part-time", "Email": "meera@hospital.com",
+     "Location": "Pune"},
+]
+
+
+def touch(path, rows):
+    """Rewrite the CSV with a new mtime, as an editor or a git checkout would."""
+    pd.DataFrame(rows).to_csv(path, index=False)
+    stamp = time.time() + 5
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def csv_store(tmp_path):
+    csv_path = str(tmp_path / "HR_Data.csv")
+    pd.DataFrame(ROWS).to_csv(csv_path, index=False)
+    store = HRStore(str(tmp_path / "HR_Data.db"))
+    assert store.sync_from_csv(csv_path)
+    return store, csv_path
+
+
+def test_sync_imports_changed_csv_when_nothing_is_unexported(csv_store):
+    store, csv_path = csv_store
+    assert not store.sync_from_csv(csv_path)
+    touch(csv_path, ROWS[:2])
+    assert store.sync_from_csv(csv_path)
+    assert store.count() == 2
+
+
+def test_sync_keeps_unexported_edits_when_csv_changes(csv_store):
+    store, csv_path = csv_store
+    store.update_leave("E001", 20)
+    touch(csv_path, ROWS)
+    assert store.unexported_changes() and store.csv_changed(csv_path)
+    assert not store.sync_from_csv(csv_path)
+    assert store.get("E001")["Leave_Balance"] == 20
+
+    assert store.sync_from_csv(csv_path, overwrite=True)
+    assert store.get("E001")["Leave_Balance"] == 12
+    assert not store.unexported_changes()
+
+
+def test_export_marks_edits_as_synced(csv_store):
+    store, csv_path = csv_store
+    store.update_leave("E001", 20)
+    store.export_csv(csv_path)
+    assert not store.unexported_changes() and not store.csv_changed(csv_path)
+    touch(csv_path, ROWS[:1])
+    assert store.sync_from_csv(csv_path)
+    assert store.count() == 1
+
+
+def balances(store):
+    return {e: store.get(e)["Leave_Balance"] for e in ("E001", "E002", "E003")}
+
+
+def test_adjust_leave_caps_only_rows_that_cross_the_maximum(csv_store):
+    store, _ = csv_store
+    # E001 stops at the cap; E002 is already above it and keeps 40 (both count as clamped).
+    assert store.adjust_leave(2, {"Employment_Type": ["Full-time"]}, maximum=13) == (2, 2)
+    assert balances(store) == {"E001": 13, "E002": 40, "E003": 5}
+
+
+def test_adjust_leave_deduction_keeps_balances_above_the_cap(csv_store):
+    store, _ = csv_store
+    assert store.adjust_leave(-6, maximum=30) == (3, 1)
+    assert balances(store) == {"E001": 6, "E002": 34, "E003": 0}
+
+
+def test_adjust_leave_without_cap(csv_store):
+    store, _ = csv_store
+    version = store.version()
+    assert store.adjust_leave(2, {"Department": ["ICU", "Cardiology"]}) == (2, 0)
+    assert balances(store) == {"E001": 14, "E002": 42, "E003": 5}
+    assert store.version() == version + 1
+
+
+def test_import_stores_blank_leave_balance_as_missing(tmp_path):
+    csv_path = tmp_path / "HR_Data.csv"
+    pd.DataFrame([ROWS[0], {**ROWS[1], "Leave_Balance": None}]).to_csv(csv_path, index=False)
+    store = HRStore(str(tmp_path / "HR_Data.db"))
+    assert store.import_csv(str(csv_path)) == 2
+    assert store.get("E002")["Leave_Balance"] is None
+    assert store.get("E001")["Leave_Balance"] == 12
+    assert store.load()["Leave_Balance"].isna().tolist() == [False, True]
+
+
+def test_import_rejects_fractional_leave_balance_and_keeps_the_data(csv_store):
+    store, csv_path = csv_store
+    touch(csv_path, [ROWS[0], {**ROWS[1], "Leave_Balance": 2.5}])
+    with pytest.raises(ValueError, match=r"row 3: Leave_Balance must be a whole number, got 2\.5"):
+        store.sync_from_csv(csv_path)
+    assert store.count() == 3
+
+
+def test_csv_with_unknown_columns_is_neither_imported_nor_overwritten(csv_store):
+    store, csv_path = csv_store
+    touch(csv_path, [{**row, "Badge_No": i} for i, row in enumerate(ROWS)])
+    with pytest.raises(ValueError, match="Badge_No"):
+        store.sync_from_csv(csv_path)
+    with pytest.raises(ValueError, match="Badge_No"):
+        store.export_csv(csv_path)
+    assert "Badge_No" in pd.read_csv(csv_path).columns
+    assert "Badge_No" not in store.export_csv()
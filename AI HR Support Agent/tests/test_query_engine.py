@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from data_handler.query_engine import QuerySpec, answer_question, run_query, spec_from_json
+
+from test_hr_store import ROWS
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(ROWS)
+
+
+@pytest.mark.parametrize("data", [{"op": "mean"}, {"op": "top", "columns": ["Full_Name"]}])
+def test_metric_questions_without_leave_column_go_to_the_llm(df, data):
+    roster = df.drop(columns="Leave_Balance")
+    assert spec_from_json(data, roster) is None
+    assert run_query(QuerySpec(data["op"], metric="Leave_Balance"), roster) is None
+    assert answer_question("average leave balance per ward?", roster, llm_filter=lambda q, d: data) is None
+
+
+@pytest.mark.parametrize("question, op, answer", [
+    ("How many night shift staff in Pune?", "count", "**1** employee matches (Shift Night, Location Pune)."),
+    ("headcount by shift", "group", "Headcount by Shift, 3 employees in total:"),
+    ("Average leave balance by department", "mean", "Average Leave_Balance by Department:"),
+    ("Which employees have the highest leave balance?", "top", "Highest Leave_Balance:"),
+    ("Show ICU nurses with <15 leave balance", "list",
+     "**1** employee matches (Department ICU, Role Nurse, Leave_Balance < 15):"),
+])
+def test_data_questions_are_answered_locally(df, question, op, answer):
+    result = answer_question(question, df, llm_filter=lambda q, d: pytest.fail("LLM asked"))
+    assert result.spec.op == op and result.spec.source == "pattern"
+    assert result.answer == answer
+
+
+def test_result_tables(df):
+    by_department = answer_question("Average leave balance by department", df).table
+    assert by_department.to_dict("list") == {"Department": ["Cardiology", "HR", "ICU"],
+                                             "Average Leave_Balance": [40.0, 5.0, 12.0]}
+    top = answer_question("Which employees have the highest leave balance?", df).table
+    assert top["Employee_ID"].tolist() == ["E002", "E001", "E003"]
+    assert answer_question("Total leave balance", df).answer == "Total Leave_Balance: **57** across 3 employees."
+
+
+def test_narrative_questions_skip_the_filter_llm(df):
+    asked = []
+    assert answer_question("What is the leave policy for nurses?", df, llm_filter=asked.append) is None
+    assert asked == []
+
+
+def test_unmapped_lookup_uses_the_llm_filter(df):
+    result = answer_question("list the folks on Ravi's team", df,
+                             llm_filter=lambda q, d: '```json\n{"op": "list", "filters": {"manager": "Dr. Iyer"}}\n```')
+    assert result.spec.source == "llm"
+    assert result.table["Employee_ID"].tolist() == ["E002", "E003"]
+    assert answer_question("list the folks on Ravi's team", df, llm_filter=lambda q, d: '{"op": "narrative"}') is None
@@ -1,10 +1,73 @@
+import math
 import streamlit as st
 import pandas as pd
-from data_handler.data_handler import save_hr_data
+from llm.context_builder import apply_filters
+from data_handler.data_handler import (
+    add_employee, adjust_leave_balances, bulk_import_employees, read_employee_file, update_leave_balance
+)
 
-def show_employee_data(df):
+PAGE_SIZES = [25, 50, 100, 250]
+GRID_FILTERS = ["Department", "Shift", "Role", "Employment_Type"]
+PICKER_RESULTS = 20
+
+def show_employee_data(df, search_index, aggregates=None):
+    """Filterable employee grid; rows are filtered and sliced here so only the visible page is sent to the browser."""
     with st.expander("View Employee Data"):
-        st.dataframe(df, use_container_width=True)
+        search = st.text_input("Search by ID or name", key="grid_search")
+        columns = st.columns(len(GRID_FILTERS))
+        filters = {}
+        for column, name in zip(columns, GRID_FILTERS):
+            if name in df.columns:
+                selected = column.multiselect(name.replace("_", " "), sorted(df[name].dropna().unique()),
+                                              key=f"grid_{name}")
+                if selected:
+                    filters[name] = selected
+
+        rows = apply_filters(df, filters, aggregates) if filters else df
+        if search.strip():
+            ids = [search_index.ids[p] for p in search_index.positions(search)]
+            rows = rows[rows["Employee_ID"].isin(ids)]
+
+        size_col, page_col, info_col = st.columns([1, 1, 2])
+        page_size = size_col.selectbox("Rows per page", PAGE_SIZES, key="grid_page_size")
+        pages = max(1, math.ceil(len(rows) / page_size))
+        page = page_col.number_input("Page", 1, pages, 1, key="grid_page")
+        start = (min(page, pages) - 1) * page_size
+        info_col.caption(f"Showing {min(start + 1, len(rows))}-{min(start + page_size, len(rows))} "
+                         f"of {len(rows)} matching employees ({len(df)} total)")
+        st.dataframe(rows.iloc[start:start + page_size], use_container_width=True, hide_index=True)
+
+def workforce_overview(aggregates):
+    """Headcount and leave views read from the materialized aggregates (no pass over the rows)."""
+    with st.expander("Workforce Overview"):
+        stats = aggregates.leave_stats()
+        headcount_col, leave_col, median_col = st.columns(3)
+        headcount_col.metric("Headcount", aggregates.size)
+        if stats is not None:
+            leave_col.metric("Average leave balance", f"{stats['mean']:.1f}")
+            median_col.metric("Median leave balance", f"{stats['median']:g}")
+        roster = aggregates.crosstab("Department", "Shift")
+        if roster is not None:
+            st.markdown("**Headcount by department and shift**")
+            st.dataframe(roster, use_container_width=True)
+        distribution = aggregates.leave_distribution()
+        if distribution:
+            st.markdown("**Leave balance distribution**")
+            st.bar_chart(pd.Series(distribution).sort_index().rename("Employees"))
+
+def employee_picker(search_index, key):
+    """Search-as-you-type employee selector backed by the prefix index; returns an Employee_ID or None."""
+    query = st.text_input("Search employee (ID or name)", key=f"{key}_search")
+    if not query.strip():
+        st.caption("Type an ID (e.g. E00) or part of a name to find an employee.")
+        return None
+    matches = search_index.search(query, limit=PICKER_RESULTS)
+    if not matches:
+        st.caption("No matching employees.")
+        return None
+    options = {f"{employee_id} - {name}": employee_id for employee_id, name in matches}
+    choice = st.selectbox("Select Employee", list(options), key=f"{key}_select")
+    return options[choice]
 
 def add_employee_form(df, csv_path):
     st.markdown("### Add New Employee")
@@ -28,15 +91,55 @@ def add_employee_form(df, csv_path):
             if new_employee["Employee_ID"] in df["Employee_ID"].values:
                 st.error("Employee ID already exists.")
             else:
-                df = pd.concat([df, pd.DataFrame([new_employee])], ignore_index=True)
-                save_hr_data(df, csv_path)
+                add_employee(new_employee, csv_path)
 
-def update_leave_form(df, csv_path):
+def update_leave_form(search_index, csv_path):
     st.markdown("### Update Leave Balance")
 
-    emp_id = st.selectbox("Select Employee ID", df["Employee_ID"])
+    emp_id = employee_picker(search_index, "update_leave")
     new_balance = st.number_input("New Leave Balance", 0, 30, 10)
 
-    if st.button("Update Leave"):
-        df.loc[df["Employee_ID"] == emp_id, "leave_balance"] = new_balance
-        save_hr_data(df, csv_path)
+    if st.button("Update Leave", disabled=emp_id is None):
+        update_leave_balance(emp_id, new_balance, csv_path)
+
+def bulk_import_form(csv_path):
+    st.markdown("### Bulk Import Employees")
+    st.caption("CSV or Excel with the same columns as the HR data; Employee_ID and Full_Name are required.")
+    uploaded = st.file_uploader("Employee file", type=["csv", "xlsx"])
+    update_existing = st.checkbox("Update employees that already exist")
+
+    if uploaded is not None and st.button("Import Employees"):
+        try:
+            upload_df = read_employee_file(uploaded)
+        except Exception as e:
+            st.error(f"Could not read file: {e}")
+            return
+        bulk_import_employees(upload_df, csv_path, update_existing)
+
+def leave_adjustment_form(df, csv_path):
+    st.markdown("### Batch Leave Adjustment")
+    st.caption("e.g. monthly accrual: +2 days for all full-time staff.")
+    with st.form("leave_adjustment_form"):
+        delta = st.number_input("Days to add (negative to deduct)", -30, 30, 2)
+        filters = {}
+        for column in ["Employment_Type", "Department", "Shift", "Role"]:
+            if column in df.columns:
+                filters[column] = st.multiselect(column.replace("_", " "), sorted(df[column].dropna().unique()))
+        cap = st.number_input("Maximum balance (0 = no cap)", 0, 365, 0,
+                              help="Balances already above it are left as they are.")
+        submitted = st.form_submit_button("Apply Adjustment")
+
+    if submitted:
+        adjust_leave_balances(delta, filters, csv_path, maximum=cap or None)
+
+def answer_cache_panel(answer_cache):
+    with st.sidebar.expander("Admin: Answer Cache"):
+        stats = answer_cache.stats()
+        st.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+        st.caption(f"{stats['hits']} hits, {stats['misses']} misses, {stats['entries']} cached answers, "
+                   f"{stats['evictions']} evicted, {stats['invalidated']} invalidated by data changes")
+        if stats["top_questions"]:
+            st.dataframe(stats["top_questions"], use_container_width=True, hide_index=True)
+        if st.button("Clear answer cache"):
+            answer_cache.clear()
+            st.success("Answer cache cleared.")
@@ -1,8 +1,12 @@
 import os
+import sys
 from typing import List, Dict
 from PyPDF2 import PdfReader
 from pinecone import Pinecone, ServerlessSpec
 from langchain_openai import OpenAIEmbeddings
+# The embedding client is shared with the production scheduler; it lives in <repo>/shared.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")))
+from shared.embedding_client import openai_embedding_client
 from langchain_pinecone import PineconeVectorStore
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from tqdm import tqdm
@@ -160,7 +164,7 @@ def get_text_chunks(text: str, max_chars: int = 1000) -> List[str]:
 def save_documents(documents: List[Dict[str, str]], index_name: str = PINECONE_INDEX, batch_size: int = 100, clear_index: bool = False):
     """Save documents to Pinecone vector store with batch processing and appending"""
     try:
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=OPENAI_API_KEY)
+        embedder = openai_embedding_client(OPENAI_API_KEY, "text-embedding-3-small")
         index = initialize_pinecone_index(index_name)
         if index is None:
             logger.warning("Skipping Pinecone upload due to index error")
@@ -178,9 +182,14 @@ def save_documents(documents: List[Dict[str, str]], index_name: str = PINECONE_I
             for chunk in chunks:
                 chunk_data.append((chunk, doc['source'], doc['type']))
 
+        # Batched, rate-limited and cached; unchanged chunks are not re-embedded
+        texts = [chunk for chunk, _, _ in chunk_data]
+        embeddings = []
+        for i in tqdm(range(0, len(texts), embedder.batch_size), desc="Embedding chunks"):
+            embeddings.extend(embedder.embed_documents(texts[i:i + embedder.batch_size]))
+
         vectors = []
-        for idx, (chunk, source, source_type) in enumerate(tqdm(chunk_data, desc="Embedding chunks")):
-            embedding = embeddings.embed_query(chunk)
+        for idx, ((chunk, source, source_type), embedding) in enumerate(zip(chunk_data, embeddings)):
             doc_id = f"{source_type}_chunk_{current_count + idx}"
             metadata = {
                 "chunk_index": current_count + idx + 1,
@@ -2,9 +2,56 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     GOOGLE_API_KEY: str
-    PINECONE_API_KEY: str
+    PINECONE_API_KEY: str = ""          # only needed when VECTOR_STORE="pinecone"
     PINECONE_INDEX_NAME: str = "scheduler-docs"
 
+    # Vector store backend: "pinecone" or "local" (NumPy index on disk, no network)
+    VECTOR_STORE: str = "pinecone"
+    LOCAL_VECTOR_STORE_DIR: str = "data/vectors"
+    LOCAL_VECTOR_SEARCH: str = "flat"   # "flat" (exact) or "ivf" (approximate, for large corpora)
+    LOCAL_VECTOR_NPROBE: int = 8        # IVF lists scanned per query; higher → better recall, slower
+
+    # Startup: clients are built lazily on first use unless warmed in the lifespan hook
+    WARM_CLIENTS_ON_STARTUP: bool = False
+    STARTUP_WARMUP_TIMEOUT_SECONDS: float = 10.0   # warm-up past this is left to finish in the background
+
+    # PDF ingestion pipeline
+    MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024   # larger uploads are rejected with 413
+    MAX_CONCURRENT_UPLOADS: int = 4             # uploads streamed to disk at once; others wait
+    INGEST_WORKERS: int = 2                     # background ingestion jobs running at once
+    JOBS_DB_PATH: str = "data/jobs.db"          # persistent job queue
+    JOB_UPLOAD_DIR: str = "data/uploads"        # uploaded PDFs waiting for their job
+    EMBED_BATCH_SIZE: int = 32      # texts per Gemini embed call (API max is 100)
+    EMBED_MAX_WORKERS: int = 4      # concurrent embed requests
+    EMBED_REQUESTS_PER_MINUTE: float = 1500      # token-bucket limits shared by every embed call
+    EMBED_TOKENS_PER_MINUTE: float = 1_000_000
+    EMBED_MAX_RETRIES: int = 5                   # exponential backoff on 429 / 5xx / timeouts
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"  # (model, text hash) → vector; "" disables
+    UPSERT_BATCH_SIZE: int = 100    # vectors per vector-store upsert page
+    INDEX_MANIFEST_PATH: str = "data/index_manifest.json"  # chunk hashes already indexed, per source
+
+    # Intent router: greetings answered locally, knowledge questions on the fast model
+    INTENT_ROUTER_ENABLED: bool = True
+    FAST_GENERATION_MODEL: str = "gemini-1.5-flash"
+
+    # Hybrid retrieval (BM25 + vector hits fused with reciprocal rank fusion)
+    KEYWORD_INDEX_PATH: str = "data/keyword_index.json"
+    RETRIEVAL_CANDIDATES: int = 20            # hits taken from each ranker before fusion
+    RETRIEVAL_TOP_K: int = 5
+    RETRIEVAL_CONTEXT_TOKENS: int = 1500      # prompt budget for retrieved chunks (~4 chars/token)
+    RETRIEVAL_DEDUPE_SIMILARITY: float = 0.85  # word-trigram Jaccard above which chunks count as duplicates
+
+    # Answer cache for /api/schedule (exact + semantic tiers)
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_TTL_SECONDS: float = 3600
+    QUERY_CACHE_SIMILARITY: float = 0.95   # cosine threshold for reusing a similar query's answer
+
+    # CP-SAT scheduling engine
+    SOLVER_TIME_LIMIT_SECONDS: float = 10.0
+    SOLVER_NUM_WORKERS: int = 8
+    RESOLVE_TIME_LIMIT_SECONDS: float = 5.0   # incremental re-plans after delta events
+    SCHEDULE_STORE_DIR: str = "data/schedules"  # last plan per plant ("" → memory only)
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+# Room for multipart boundaries and part headers on top of the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies on `paths` before anything parses them.
+
+    Starlette's multipart parser spools the whole upload to disk before the
+    endpoint runs, so a size check in the endpoint limits nothing. Here a
+    Content-Length above `max_bytes` gets a 413 without reading the body, and a
+    body sent without one (chunked) is cut off with a 413 once it passes the limit.
+    """
+
+    def __init__(self, app, max_bytes: int, paths):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None:
+            try:
+                too_large = int(length) > self.max_bytes
+            except ValueError:
+                await JSONResponse({"detail": "Invalid Content-Length"}, status_code=400)(scope, receive, send)
+                return
+            if too_large:
+                await JSONResponse({"detail": f"Request body exceeds {self.max_bytes} bytes"},
+                                   status_code=413)(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Request body exceeds {self.max_bytes} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,13 +1,43 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
+from .core.config import settings
+from .core.upload_limit import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware
 from .router import router
+from .services.jobs import get_job_queue
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 
+logger = logging.getLogger(__name__)
 
 
-app = FastAPI(title="Production Scheduling Agent - PDF Uploader")
+def _warm_clients():
+    """Build the Gemini model, vector store and CP-SAT module ahead of the first request"""
+    from .services.clients import get_generation_model
+    from .services.vector_store import get_vector_store
+    from ortools.sat.python import cp_model  # noqa: F401
+    get_generation_model()
+    get_vector_store().count()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resumes ingestion jobs left queued/running by a previous process
+    get_job_queue().start()
+    if settings.WARM_CLIENTS_ON_STARTUP:
+        try:
+            await asyncio.wait_for(run_in_threadpool(_warm_clients), settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+        except Exception:
+            logger.warning("Client warm-up did not complete; clients will be built on first use", exc_info=True)
+    yield
+    get_job_queue().shutdown()
+
+
+app = FastAPI(title="Production Scheduling Agent - PDF Uploader", lifespan=lifespan)
 templates = Jinja2Templates(directory="app/templates")
 
 app.add_middleware(
@@ -18,6 +48,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Oversized uploads are refused from their headers, before the multipart body is spooled;
+# save_upload still checks the file's actual size.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=settings.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    paths={"/api/upload-pdf"},
+)
+
 app.include_router(router, prefix="/api", tags=["PDF Upload"])
 
 @app.get("/", response_class=HTMLResponse)
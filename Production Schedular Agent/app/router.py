@@ -1,31 +1,133 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+import asyncio
+import json
+import logging
+import os
 import tempfile
-from .services.pinecone_store import store_pdf_to_pinecone
-from app.services.scheduler import schedule_production
-from app.schema.upload import UploadResponse , ScheduleRequest
+from app.core.config import settings
+from app.services.jobs import get_job_queue
+from app.services.scheduler import schedule_production_async, schedule_production_stream
+from app.services.schedule_store import get_schedule_store
+from app.services.metrics import get_metrics
+from app.schemas.upload import UploadResponse , ScheduleRequest, ScheduleResponse, PlantProblem, PlantEvent, JobStatus
 from pydantic import BaseModel
 from fastapi import Body
 
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+_upload_slots = asyncio.Semaphore(settings.MAX_CONCURRENT_UPLOADS)
+
+
+async def save_upload(file: UploadFile, suffix: str = ".pdf", directory: str = None) -> str:
+    """
+    Stream an upload to disk in fixed-size chunks, enforcing MAX_UPLOAD_BYTES on the file
+    itself (UploadSizeLimitMiddleware already refused bodies whose Content-Length is too large)
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"File exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
 
 @router.post("/upload-pdf", response_model=UploadResponse)
 async def upload_pdf(file: UploadFile = File(...)):
-    """Upload PDF → Embed with Gemini → Store in Pinecone"""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
+    """Upload PDF → queue a background job (embed with Gemini → store in the vector store); poll /api/jobs/{id}"""
+    async with _upload_slots:
+        path = None
+        try:
+            os.makedirs(settings.JOB_UPLOAD_DIR, exist_ok=True)
+            path = await save_upload(file, directory=settings.JOB_UPLOAD_DIR)
+            job = await run_in_threadpool(get_job_queue().submit, path, file.filename)
+            return UploadResponse(message="PDF queued for ingestion", details={"job_id": job["id"], "status": job["status"]})
+        except HTTPException:
+            raise
+        except Exception as e:
+            if path and os.path.exists(path):
+                os.unlink(path)
+            return UploadResponse(message="Error", details={"error": str(e)})
 
-        result = store_pdf_to_pinecone(tmp_path)
-        return UploadResponse(message="PDF stored successfully in Pinecone", details=result)
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Ingestion progress: pages parsed, chunks embedded, vectors upserted"""
+    job = await run_in_threadpool(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+async def _sse(events):
+    """Server-sent events from a blocking (event, data) generator, pulled on the worker pool"""
+    try:
+        async for event, data in iterate_in_threadpool(events):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
     except Exception as e:
-        return UploadResponse(message="Error", details={"error": str(e)})
-    
+        logger.exception("Streaming schedule failed")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
 
-@router.post("/schedule")
+@router.post("/schedule", response_model=ScheduleResponse)
 async def create_schedule(req:ScheduleRequest):
-  
-    result = schedule_production(req.query)
-    return result
\ No newline at end of file
+    """Plan for the query; with "stream": true, an SSE stream of status/plan/token events and a final done event"""
+    if req.stream:
+        return StreamingResponse(
+            _sse(schedule_production_stream(req.query)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    result = await schedule_production_async(req.query)
+    return result
+
+
+@router.post("/plants/{plant_id}/schedule")
+async def solve_plant_schedule(plant_id: str, problem: PlantProblem):
+    """Full CP-SAT solve for a plant; the result becomes the baseline for delta events"""
+    try:
+        return await run_in_threadpool(get_schedule_store().solve, plant_id, problem.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/plants/{plant_id}/schedule")
+async def get_plant_schedule(plant_id: str):
+    try:
+        solution = await run_in_threadpool(get_schedule_store().get, plant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if solution is None:
+        raise HTTPException(status_code=404, detail=f"No schedule stored for plant {plant_id}")
+    return solution
+
+
+@router.post("/plants/{plant_id}/events")
+async def apply_plant_event(plant_id: str, event: PlantEvent):
+    """Apply a rush order / machine outage / operator absence and re-plan incrementally"""
+    try:
+        return await run_in_threadpool(get_schedule_store().apply_event, plant_id, event.model_dump(exclude_none=True))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/metrics")
+async def metrics(format: str = "json"):
+    """Per-intent / per-route latency counters; ?format=prometheus for the text exposition format"""
+    if format == "prometheus":
+        return PlainTextResponse(get_metrics().prometheus())
+    return {"metrics": get_metrics().snapshot()}
@@ -1,4 +1,5 @@
 
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 class UploadResponse(BaseModel):
@@ -6,5 +7,96 @@ class UploadResponse(BaseModel):
     details: dict
 
 
+class JobStatus(BaseModel):
+    id: str
+    status: str   # queued | running | succeeded | failed
+    source: Optional[str] = None
+    pages_parsed: int = 0
+    chunks_embedded: int = 0
+    vectors_upserted: int = 0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
 class ScheduleRequest(BaseModel):
-    query: str
\ No newline at end of file
+    query: str
+    stream: bool = False   # True → text/event-stream of status/token/plan/done events
+
+
+class OperationAssignment(BaseModel):
+    order_id: str
+    operation_id: str
+    machine_id: str
+    start: int          # minutes from plan start
+    end: int
+    shift: Optional[str] = None
+
+
+class OrderPlan(BaseModel):
+    id: str
+    start: int
+    completion: int
+    due: Optional[int] = None
+    tardiness: int = 0
+    late: bool = False
+
+
+class MachineAssignment(BaseModel):
+    machine_id: str
+    capacity: int = 1
+    busy_minutes: int
+    utilization: float   # busy minutes / (capacity × makespan)
+    operations: List[OperationAssignment]
+
+
+class ShiftSlot(BaseModel):
+    shift: str
+    start: int
+    end: int
+    machines: List[str]  # machines with work in this slot
+    operations: int
+    busy_minutes: int
+
+
+class StructuredPlan(BaseModel):
+    """Solver result grouped for rendering: per order, per machine and per shift slot."""
+    status: str
+    makespan: Optional[int] = None
+    total_tardiness: Optional[int] = None
+    late_orders: List[str] = []
+    orders: List[OrderPlan] = []
+    machines: List[MachineAssignment] = []
+    shifts: List[ShiftSlot] = []
+
+
+class ScheduleResponse(BaseModel):
+    optimized_plan: str
+    explanation: str
+    plan: Optional[StructuredPlan] = None
+    schedule: Optional[dict] = None   # raw solver output
+    cache: Optional[str] = None       # "exact" | "semantic" when served from the answer cache
+    intent: Optional[str] = None      # greeting | scheduling | machines | processes | safety | ...
+    route: Optional[str] = None       # template | fast | full | cache
+
+
+class PlantProblem(BaseModel):
+    """Structured scheduling inputs; times are integer minutes from plan start."""
+    orders: List[dict]
+    machines: List[dict]
+    shifts: List[dict] = []
+    downtimes: List[dict] = []
+    horizon: Optional[int] = None
+
+
+class PlantEvent(BaseModel):
+    type: Literal["add_order", "machine_outage", "operator_absence"]
+    order: Optional[dict] = None          # add_order
+    machine: Optional[str] = None         # machine_outage
+    machines: Optional[List[str]] = None  # operator_absence (machines the operator runs)
+    start: Optional[int] = None
+    end: Optional[int] = None
+    slots: Optional[int] = None           # operator_absence: capacity slots lost (default 1)
+    now: int = 0                          # operations starting before this are frozen
+    reason: str = ""
@@ -0,0 +1,36 @@
+from functools import lru_cache
+
+from ..core.config import settings
+
+GENERATION_MODEL = "gemini-1.5-pro"
+
+
+@lru_cache(maxsize=None)
+def get_genai():
+    """google.generativeai, imported and configured once on first use"""
+    import google.generativeai as genai
+    genai.configure(api_key=settings.GOOGLE_API_KEY)
+    return genai
+
+
+@lru_cache(maxsize=None)
+def get_generation_model(model_name: str = GENERATION_MODEL):
+    """Shared GenerativeModel, built once per process and reused by every request"""
+    return get_genai().GenerativeModel(model_name)
+
+
+@lru_cache(maxsize=None)
+def get_pinecone_index():
+    """Shared Pinecone index handle (creates the index on first use if missing)"""
+    from pinecone import Pinecone, ServerlessSpec   # optional when VECTOR_STORE="local"
+
+    pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+    index_name = settings.PINECONE_INDEX_NAME
+    if index_name not in pc.list_indexes().names():
+        pc.create_index(
+            name=index_name,
+            dimension=768,   # Gemini embedding-001 dimension
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1")
+        )
+    return pc.Index(index_name)
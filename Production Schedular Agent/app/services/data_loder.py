@@ -1,11 +1,5 @@
-from pinecone import Pinecone
-from ..core.config import settings
+from .vector_store import get_vector_store
 
-pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-index = pc.Index(settings.PINECONE_INDEX_NAME)
-
-def query_pinecone(query: str, top_k: int = 5):
-    results = index.query(vector=query,  # vector will be added by embedding
-                          top_k=top_k,
-                          include_metadata=True)
-    return results
\ No newline at end of file
+def query_vector_store(query, top_k: int = 5):
+    """Nearest chunks to the query embedding from the configured vector store"""
+    return get_vector_store().query(query, top_k=top_k)
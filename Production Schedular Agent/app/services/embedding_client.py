@@ -0,0 +1,27 @@
+import os
+import sys
+from functools import lru_cache
+
+from ..core.config import settings
+
+# The client is shared with the agents in Agents_Library; it lives in <repo>/shared.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+from shared.embedding_client import EmbeddingClient, gemini_embedding_client  # noqa: E402
+
+EMBEDDING_MODEL = "models/embedding-001"
+
+
+@lru_cache(maxsize=None)
+def get_embedding_client() -> EmbeddingClient:
+    """Shared Gemini embedding-001 client for ingestion and queries"""
+    from .clients import get_genai
+
+    return gemini_embedding_client(
+        get_genai(),
+        EMBEDDING_MODEL,
+        batch_size=settings.EMBED_BATCH_SIZE,
+        requests_per_minute=settings.EMBED_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.EMBED_TOKENS_PER_MINUTE,
+        max_retries=settings.EMBED_MAX_RETRIES,
+        cache_path=settings.EMBEDDING_CACHE_PATH or None,
+    )
@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+
+
+@dataclass
+class StageStats:
+    """Counters for one pipeline stage (embed or upsert)."""
+    items: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+
+    def record(self, items: int, seconds: float):
+        self.items += items
+        self.batches += 1
+        self.busy_seconds += seconds
+
+    def as_dict(self, wall_seconds: float):
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "avg_batch_ms": round(1000 * self.busy_seconds / self.batches, 2) if self.batches else 0.0,
+            "items_per_sec": round(self.items / wall_seconds, 2) if wall_seconds else 0.0,
+        }
+
+
+@dataclass
+class IngestionStats:
+    """Per-stage throughput of one ingestion run."""
+    embed: StageStats = field(default_factory=StageStats)
+    upsert: StageStats = field(default_factory=StageStats)
+    wall_seconds: float = 0.0
+
+    def as_dict(self):
+        return {
+            "wall_seconds": round(self.wall_seconds, 4),
+            "embed": self.embed.as_dict(self.wall_seconds),
+            "upsert": self.upsert.as_dict(self.wall_seconds),
+        }
+
+
+def batched(iterable, size: int):
+    """Yield lists of up to `size` items from any iterable, lazily."""
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _embed(embed_batch, batch):
+    start = time.perf_counter()
+    values = embed_batch([text for _, text, _ in batch])
+    if len(values) != len(batch):
+        raise ValueError(f"Embedder returned {len(values)} vectors for {len(batch)} texts")
+    return batch, values, time.perf_counter() - start
+
+
+def run_ingestion(
+    records,
+    embed_batch,
+    upsert,
+    embed_batch_size: int = 32,
+    max_workers: int = 4,
+    upsert_batch_size: int = 100,
+    on_progress=None,
+):
+    """
+    Embed `records` in batches on a bounded thread pool and upsert the
+    resulting vectors in fixed-size pages as soon as they are ready.
+
+    records            iterable of (id, text, metadata); consumed lazily
+    embed_batch(texts) returns one vector per text, in order
+    upsert(vectors)    receives lists of {"id", "values", "metadata"} dicts
+    on_progress(stats) optional callback after every embed/upsert batch
+    """
+    stats = IngestionStats()
+    pending_vectors = []
+    in_flight = set()
+    max_in_flight = max(1, max_workers) * 2
+    start = time.perf_counter()
+
+    def flush(force=False):
+        while len(pending_vectors) >= upsert_batch_size or (force and pending_vectors):
+            page = pending_vectors[:upsert_batch_size]
+            del pending_vectors[:upsert_batch_size]
+            t0 = time.perf_counter()
+            upsert(page)
+            stats.upsert.record(len(page), time.perf_counter() - t0)
+            if on_progress:
+                on_progress(stats)
+
+    def collect(done):
+        for future in done:
+            batch, values, seconds = future.result()
+            stats.embed.record(len(batch), seconds)
+            for (vec_id, _, metadata), vector in zip(batch, values):
+                pending_vectors.append({"id": vec_id, "values": vector, "metadata": metadata})
+            if on_progress:
+                on_progress(stats)
+        flush()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        try:
+            for batch in batched(records, embed_batch_size):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(pool.submit(_embed, embed_batch, batch))
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+    flush(force=True)
+    stats.wall_seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,95 @@
+"""
+Local intent router for /api/schedule.
+
+A keyword scorer decides, in microseconds, which path a query needs:
+
+  greeting                     → canned reply, no embedding / retrieval / LLM
+  machines, processes, safety  → retrieval + fast model, plain-text answer
+  scheduling                   → retrieval + pro model + CP-SAT
+  unknown                      → the full LLM path, which classifies itself
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+KNOWLEDGE_INTENTS = ("machines", "processes", "safety")
+
+SMALL_TALK_MAX_WORDS = 6
+MIN_SCORE = 2.0     # below this the query is "unknown" and goes to the full path
+MIN_MARGIN = 1.0    # top score must beat the runner-up by this much
+
+SMALL_TALK = {
+    "greeting": re.compile(r"^(hi+|hello|hey+|hiya|yo|greetings|good (morning|afternoon|evening|day)|how are you|how's it going)\b"),
+    "thanks": re.compile(r"^(thanks|thank you|thx|ty|cheers|great|ok|okay|cool|perfect|nice)\b"),
+    "farewell": re.compile(r"^(bye|goodbye|see you|see ya|that's all|that is all)\b"),
+    "help": re.compile(r"^(help|what can you do|who are you|what are you)\b"),
+}
+
+REPLIES = {
+    "greeting": "👋 Hi, I am your Production Scheduling Assistant. What can I help you with today?\n"
+                "You can ask me about scheduling, machines, processes, or safety.",
+    "thanks": "You're welcome! Let me know if you need another schedule or have questions about machines, processes, or safety.",
+    "farewell": "Goodbye! Come back any time you need a production plan.",
+    "help": "I plan production: give me orders (quantities, due dates), machines and shifts and I will build an optimized "
+            "schedule. I can also answer questions about machines, processes and safety from your uploaded documents.",
+}
+
+# (pattern, weight) per intent; patterns are matched against the lower-cased query
+KEYWORDS = {
+    "scheduling": [
+        (r"\bschedul\w*", 3.0), (r"\bplan(s|ning)?\b", 2.0), (r"\b(re)?sequenc\w*", 2.0),
+        (r"\ballocat\w*|\bassign\w*", 1.5), (r"\borders?\b|\bpo-?\d+", 2.0), (r"\bdue\b|\bdeadline\w*", 2.0),
+        (r"\bby (mon|tue|wed|thu|fri|sat|sun)\w*|\bby (tomorrow|tonight|end of)", 2.0),
+        (r"\b\d+\s*(units|pcs|pieces|bags|totes|pouches)\b", 2.0), (r"\bmakespan|\bthroughput\b|\bcapacity plan", 2.0),
+        (r"\bprioriti[sz]\w*|\brush\b|\burgent\b", 1.0), (r"\bshifts?\b", 1.0),
+    ],
+    "machines": [
+        (r"\bmachines?\b", 2.0), (r"\b[a-z]{1,4}-\d{2,4}\b", 1.0), (r"\bmaintenance\b|\bbreakdown\w*|\bdowntime\b", 2.0),
+        (r"\butili[sz]ation\b|\bavailability\b|\boee\b", 2.0), (r"\bchangeover\w*|\bsetup time\b", 2.0),
+        (r"\bpress(es)?\b|\blaminat\w*|\bweld\w*|\bprinter\w*|\bsewing\b|\bcutter\w*", 1.0),
+    ],
+    "processes": [
+        (r"\bprocess(es|ing)?\b", 2.0), (r"\bworkflow\w*|\bprocedure\w*|\bsteps?\b|\brouting\b", 2.0),
+        (r"\bhow (do|to)\b", 1.0), (r"\bbest practice\w*|\bsop\b|\bquality\b|\binspection\b", 2.0),
+        (r"\bmaterial\w*|\bfabric\b|\bstitch\w*|\bprint(ing)?\b", 1.0),
+    ],
+    "safety": [
+        (r"\bsafe(ty|ly)?\b|\bhazard\w*|\binjur\w*|\baccident\w*", 3.0), (r"\bppe\b|\bgloves?\b|\bgoggles\b", 2.0),
+        (r"\block-?out\b|\btag-?out\b|\bemergency\b|\bguard(s|ing)?\b", 2.0), (r"\brisk\w*|\bfire\b", 1.5),
+    ],
+}
+_COMPILED = {intent: [(re.compile(p), w) for p, w in rules] for intent, rules in KEYWORDS.items()}
+
+
+@dataclass
+class Intent:
+    name: str                   # greeting | scheduling | machines | processes | safety | unknown
+    score: float = 0.0
+    scores: Dict[str, float] = field(default_factory=dict)
+    reply: Optional[str] = None  # canned answer for greetings / small talk
+
+    @property
+    def route(self):
+        if self.reply is not None:
+            return "template"
+        return "fast" if self.name in KNOWLEDGE_INTENTS else "full"
+
+
+def classify_intent(query: str) -> Intent:
+    text = re.sub(r"\s+", " ", query.lower()).strip()
+    scores = {
+        intent: sum(w * len(p.findall(text)) for p, w in rules)
+        for intent, rules in _COMPILED.items()
+    }
+    best = max(scores, key=scores.get)
+
+    words = re.findall(r"[\w'-]+", text)
+    if len(words) <= SMALL_TALK_MAX_WORDS and not any(scores.values()):
+        for kind, pattern in SMALL_TALK.items():
+            if pattern.match(text):
+                return Intent("greeting", 1.0, scores, REPLIES[kind])
+
+    runner_up = max((s for i, s in scores.items() if i != best), default=0.0)
+    if scores[best] < MIN_SCORE or scores[best] - runner_up < MIN_MARGIN:
+        return Intent("unknown", scores[best], scores)
+    return Intent(best, scores[best], scores)
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FIELDS = ("pages_parsed", "chunks_embedded", "vectors_upserted")
+
+
+class JobQueue:
+    """
+    Background ingestion jobs backed by a local SQLite table, so queued and
+    interrupted jobs are picked up again after a restart. `handler(file_path,
+    source, on_progress)` does the work; at most `max_workers` run at once.
+    Jobs for the same source run one at a time in submission order, since each
+    one replaces that source's vectors and manifest entry.
+    """
+
+    def __init__(self, db_path: str, handler, max_workers: int = 2):
+        self.db_path = db_path
+        self.handler = handler
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._sources = {}   # {source with a running job: job ids waiting behind it}
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    source TEXT,
+                    file_path TEXT,
+                    pages_parsed INTEGER DEFAULT 0,
+                    chunks_embedded INTEGER DEFAULT 0,
+                    vectors_upserted INTEGER DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def start(self):
+        """Start the worker pool and resume jobs left queued or running by a previous process"""
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+        with self._connect() as conn:
+            pending = conn.execute(
+                "SELECT id, file_path FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        for job_id, file_path in pending:
+            if file_path and os.path.exists(file_path):
+                logger.info("Resuming ingestion job %s", job_id)
+                self._update(job_id, status="queued")
+                self._pool.submit(self._run, job_id)
+            else:
+                self._update(job_id, status="failed", error="Uploaded file was lost before the job could run")
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def submit(self, file_path: str, source: str):
+        self.start()   # before the insert, or start() would also resume this job as a leftover
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, source, file_path, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, source, file_path, now, now),
+            )
+        self._pool.submit(self._run, job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("file_path")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _run(self, job_id: str, source_held: bool = False):
+        with self._connect() as conn:
+            row = conn.execute("SELECT source, file_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        source, file_path = row
+        if not source_held:
+            with self._lock:
+                if source in self._sources:
+                    self._sources[source].append(job_id)
+                    return
+                self._sources[source] = deque()
+        try:
+            self._process(job_id, source, file_path)
+        finally:
+            # Hand the source straight to its next job so a newer upload cannot overtake it;
+            # after shutdown the waiting jobs stay queued and resume on the next start().
+            with self._lock:
+                waiting = self._sources[source]
+                if waiting and self._pool is not None:
+                    self._pool.submit(self._run, waiting.popleft(), True)
+                else:
+                    del self._sources[source]
+
+    def _process(self, job_id: str, source: str, file_path: str):
+        self._update(job_id, status="running")
+
+        def on_progress(progress: dict):
+            self._update(job_id, **{k: progress[k] for k in PROGRESS_FIELDS if k in progress})
+
+        try:
+            result = self.handler(file_path, source, on_progress)
+            self._update(job_id, status="succeeded", result=json.dumps(result),
+                         **{k: result[k] for k in PROGRESS_FIELDS if k in result})
+        except Exception as e:
+            logger.exception("Ingestion job %s failed", job_id)
+            self._update(job_id, status="failed", error=str(e))
+        finally:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+
+
+@lru_cache(maxsize=None)
+def get_job_queue():
+    from .pinecone_store import store_pdf_to_pinecone
+    return JobQueue(settings.JOBS_DB_PATH, handler=store_pdf_to_pinecone, max_workers=settings.INGEST_WORKERS)
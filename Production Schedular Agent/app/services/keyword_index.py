@@ -0,0 +1,123 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from ..core.config import settings
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+SEPARATOR_RE = re.compile(r"[-_./]")
+
+
+def tokenize(text: str):
+    """Lower-case word tokens; identifiers like M-012 or PN-4471/B are kept whole and also split into parts"""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        parts = SEPARATOR_RE.split(token)
+        if len(parts) > 1:
+            tokens.extend(p for p in parts if p)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk text, kept as an in-memory inverted index
+    (term → {chunk id: term frequency}). Catches exact identifiers such as
+    machine IDs and part numbers that embeddings tend to blur.
+
+    Chunk metadata (including "text") is persisted as JSON at `path`; the
+    postings are rebuilt from it on load. Writes are kept in memory until flush().
+    """
+
+    def __init__(self, path: str = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs = {}
+        self._lengths = {}
+        self._postings = defaultdict(dict)
+        self._total_length = 0
+        self._dirty = False
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for chunk_id, metadata in json.load(f).get("chunks", {}).items():
+                    self._index(chunk_id, metadata)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _index(self, chunk_id: str, metadata: dict):
+        counts = Counter(tokenize(metadata.get("text", "")))
+        self._docs[chunk_id] = metadata
+        self._lengths[chunk_id] = sum(counts.values())
+        self._total_length += self._lengths[chunk_id]
+        for term, tf in counts.items():
+            self._postings[term][chunk_id] = tf
+
+    def _unindex(self, chunk_id: str):
+        metadata = self._docs.pop(chunk_id)
+        self._total_length -= self._lengths.pop(chunk_id)
+        for term in set(tokenize(metadata.get("text", ""))):
+            postings = self._postings[term]
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def add(self, chunks):
+        """Index (id, metadata) pairs; metadata["text"] is the searchable text"""
+        with self._lock:
+            for chunk_id, metadata in chunks:
+                if chunk_id in self._docs:
+                    self._unindex(chunk_id)
+                self._index(chunk_id, metadata)
+                self._dirty = True
+
+    def remove(self, ids):
+        with self._lock:
+            for chunk_id in ids:
+                if chunk_id in self._docs:
+                    self._unindex(chunk_id)
+                    self._dirty = True
+
+    def get(self, chunk_id: str):
+        return self._docs.get(chunk_id)
+
+    def search(self, query: str, top_k: int = 10):
+        """Best `top_k` (id, score) pairs for the query, highest score first"""
+        with self._lock:
+            n = len(self._docs)
+            if n == 0:
+                return []
+            avg_length = self._total_length / n or 1.0
+            scores = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def flush(self):
+        with self._lock:
+            if not (self._dirty and self.path):
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"chunks": self._docs}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+@lru_cache(maxsize=None)
+def get_keyword_index():
+    return BM25Index(settings.KEYWORD_INDEX_PATH)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+
+from ..core.config import settings
+
+
+def chunk_id(project_name: str, text: str) -> str:
+    """Stable vector ID derived from the chunk's normalised content"""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return f"{project_name}__{hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]}"
+
+
+class IndexManifest:
+    """
+    Local JSON record of which chunk IDs are already in the vector index, per
+    source document. Lets re-uploads skip unchanged chunks and delete the ones
+    a revised document no longer contains.
+
+    A running ingestion job claim()s every chunk it keeps before skipping or
+    upserting it, and retire() drops a source's old chunks under the same lock,
+    so a chunk one job relies on is never deleted by another job's re-upload.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sources = {}
+        self._claims = {}   # {source being ingested: IDs its job keeps, until retire() records them}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._sources = {src: set(ids) for src, ids in json.load(f).get("sources", {}).items()}
+
+    def indexed_ids(self):
+        with self._lock:
+            return set().union(*self._sources.values()) if self._sources else set()
+
+    def source_ids(self, source: str):
+        with self._lock:
+            return set(self._sources.get(source, ()))
+
+    def claim(self, source: str, vec_id: str) -> bool:
+        """Mark vec_id as kept by the running job for `source`; True if it is already indexed"""
+        with self._lock:
+            self._claims.setdefault(source, set()).add(vec_id)
+            return any(vec_id in ids for ids in self._sources.values())
+
+    def release(self, source: str):
+        """Drop the claims of a job for `source` that ended without retire()"""
+        with self._lock:
+            self._claims.pop(source, None)
+
+    def _stale(self, source: str, current_ids):
+        gone = self._sources.get(source, set()) - set(current_ids)
+        still_used = set().union(*(ids for src, ids in self._sources.items() if src != source),
+                                 *(ids for src, ids in self._claims.items() if src != source))
+        return gone - still_used
+
+    def stale_ids(self, source: str, current_ids):
+        """IDs previously stored for `source` that it no longer has and no other source or running job uses"""
+        with self._lock:
+            return self._stale(source, current_ids)
+
+    def retire(self, source: str, current_ids, delete):
+        """
+        Record `current_ids` as the chunks of `source`, first passing its stale IDs
+        (see stale_ids) to delete(ids). Both happen under the lock, so no job can
+        claim a stale ID between the check and the delete. Returns the stale IDs.
+        """
+        with self._lock:
+            stale = sorted(self._stale(source, current_ids))
+            if stale:
+                delete(stale)
+            self._sources[source] = set(current_ids)
+            self._claims.pop(source, None)
+            self._write()
+            return stale
+
+    def replace(self, source: str, ids):
+        with self._lock:
+            self._sources[source] = set(ids)
+            self._claims.pop(source, None)
+            self._write()
+
+    def clear(self):
+        with self._lock:
+            self._sources = {}
+            self._write()
+
+    def _write(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"sources": {src: sorted(ids) for src, ids in self._sources.items()}}, f)
+        os.replace(tmp, self.path)
+
+
+@lru_cache(maxsize=None)
+def get_index_manifest():
+    return IndexManifest(settings.INDEX_MANIFEST_PATH)
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+
+class LatencyMetrics:
+    """
+    In-process latency counters keyed by metric name and labels
+    (e.g. schedule_seconds{intent="greeting", route="template"}).
+    Counts and sums are exact; percentiles cover the most recent `window` samples.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"count": 0, "sum": 0.0, "max": 0.0, "samples": deque(maxlen=self.window)}
+            series["count"] += 1
+            series["sum"] += seconds
+            series["max"] = max(series["max"], seconds)
+            series["samples"].append(seconds)
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            items = [(name, dict(labels), dict(series, samples=list(series["samples"])))
+                     for (name, labels), series in sorted(self._series.items())]
+        out = []
+        for name, labels, series in items:
+            ms = np.array(series["samples"]) * 1000
+            out.append({
+                "name": name,
+                "labels": labels,
+                "count": series["count"],
+                "sum_seconds": round(series["sum"], 6),
+                "mean_ms": round(1000 * series["sum"] / series["count"], 3),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "max_ms": round(1000 * series["max"], 3),
+            })
+        return out
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (summary type) of every series"""
+        lines, typed = [], set()
+        for s in self.snapshot():
+            name = s["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            labels = ",".join(f'{k}="{v}"' for k, v in s["labels"].items())
+            sep = "," if labels else ""
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{name}{{{labels}{sep}quantile="{quantile}"}} {round(s[key] / 1000, 6)}')
+            lines.append(f"{name}_count{{{labels}}} {s['count']}")
+            lines.append(f"{name}_sum{{{labels}}} {s['sum_seconds']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+@lru_cache(maxsize=None)
+def get_metrics():
+    return LatencyMetrics()
@@ -0,0 +1,483 @@
+"""
+Flexible job-shop engine on OR-Tools CP-SAT.
+
+All times are integer minutes from the start of the planning horizon.
+Each order is a chain of operations; each operation runs on exactly one of
+its eligible machines. Machines have a capacity (parallel slots) and are
+only usable inside the shift windows that cover them.
+"""
+import bisect
+import heapq
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Above this many operations, presolve probing is switched off (see solve()).
+LARGE_MODEL_OPERATIONS = 1000
+
+
+@dataclass
+class Machine:
+    id: str
+    capacity: int = 1
+
+
+@dataclass
+class Shift:
+    name: str
+    start: int
+    end: int
+    machines: Optional[List[str]] = None   # None → shift covers every machine
+
+
+@dataclass
+class Downtime:
+    """Machine outage or operator absence: `slots` capacity units lost (None → machine fully down)."""
+    machine: str
+    start: int
+    end: int
+    slots: Optional[int] = None
+    reason: str = ""
+
+
+@dataclass
+class Operation:
+    id: str
+    duration: int
+    machines: List[str]
+
+
+@dataclass
+class Order:
+    id: str
+    operations: List[Operation]
+    due: Optional[int] = None
+    release: int = 0
+    priority: int = 1
+
+
+@dataclass
+class Problem:
+    orders: List[Order]
+    machines: List[Machine]
+    shifts: List[Shift] = field(default_factory=list)
+    downtimes: List[Downtime] = field(default_factory=list)
+    horizon: Optional[int] = None
+
+
+@dataclass
+class ScheduledOperation:
+    order_id: str
+    operation_id: str
+    machine_id: str
+    start: int
+    end: int
+    shift: Optional[str] = None
+
+
+@dataclass
+class Solution:
+    status: str
+    makespan: Optional[int] = None
+    total_tardiness: Optional[int] = None
+    late_orders: List[str] = field(default_factory=list)
+    operations: List[ScheduledOperation] = field(default_factory=list)
+    solve_seconds: float = 0.0
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+
+    @property
+    def feasible(self):
+        return self.status in ("OPTIMAL", "FEASIBLE", "HEURISTIC")
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def problem_from_dict(data: dict) -> Problem:
+    """Build a Problem from plain JSON (e.g. LLM-extracted). Raises ValueError on bad input."""
+    try:
+        machines = [Machine(id=str(m["id"]), capacity=int(m.get("capacity", 1))) for m in data["machines"]]
+        machine_ids = {m.id for m in machines}
+        orders = []
+        for o in data["orders"]:
+            ops = []
+            for k, op in enumerate(o["operations"]):
+                eligible = [str(m) for m in op.get("machines") or machine_ids]
+                ops.append(Operation(id=str(op.get("id", k)), duration=int(op["duration"]), machines=eligible))
+            due = o.get("due")
+            orders.append(Order(
+                id=str(o["id"]),
+                operations=ops,
+                due=int(due) if due is not None else None,
+                release=int(o.get("release", 0)),
+                priority=int(o.get("priority", 1)),
+            ))
+        shifts = [
+            Shift(name=str(s.get("name", i)), start=int(s["start"]), end=int(s["end"]),
+                  machines=[str(m) for m in s["machines"]] if s.get("machines") else None)
+            for i, s in enumerate(data.get("shifts") or [])
+        ]
+        downtimes = [
+            Downtime(machine=str(d["machine"]), start=int(d["start"]), end=int(d["end"]),
+                     slots=int(d["slots"]) if d.get("slots") is not None else None, reason=str(d.get("reason", "")))
+            for d in data.get("downtimes") or []
+        ]
+        horizon = data.get("horizon")
+        problem = Problem(orders=orders, machines=machines, shifts=shifts, downtimes=downtimes,
+                          horizon=int(horizon) if horizon is not None else None)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed scheduling problem: {e!r}") from e
+    validate_problem(problem)
+    return problem
+
+
+def validate_problem(problem: Problem):
+    machine_ids = {m.id for m in problem.machines}
+    if not problem.orders or not machine_ids:
+        raise ValueError("A scheduling problem needs at least one order and one machine")
+    for m in problem.machines:
+        if m.capacity < 1:
+            raise ValueError(f"Machine {m.id} has capacity {m.capacity}")
+    if len({o.id for o in problem.orders}) != len(problem.orders):
+        raise ValueError("Order IDs must be unique")
+    for order in problem.orders:
+        if not order.operations:
+            raise ValueError(f"Order {order.id} has no operations")
+        if len({op.id for op in order.operations}) != len(order.operations):
+            raise ValueError(f"Operation IDs in order {order.id} must be unique")
+        for op in order.operations:
+            if op.duration < 0:
+                raise ValueError(f"Operation {order.id}/{op.id} has negative duration")
+            unknown = set(op.machines) - machine_ids
+            if unknown or not op.machines:
+                raise ValueError(f"Operation {order.id}/{op.id} references unknown machines {sorted(unknown)}")
+    for s in problem.shifts:
+        if s.end <= s.start:
+            raise ValueError(f"Shift {s.name} ends before it starts")
+    for d in problem.downtimes:
+        if d.machine not in machine_ids:
+            raise ValueError(f"Downtime references unknown machine {d.machine}")
+        if d.end <= d.start:
+            raise ValueError(f"Downtime on {d.machine} ends before it starts")
+
+
+def _horizon(problem: Problem, now: int = 0) -> int:
+    if problem.horizon is not None:
+        return problem.horizon
+    if problem.shifts:
+        return max(s.end for s in problem.shifts)
+    release = max([o.release for o in problem.orders] + [now])
+    return release + sum(op.duration for o in problem.orders for op in o.operations)
+
+
+def _machine_windows(problem: Problem, horizon: int) -> Dict[str, List[Tuple[int, int, str]]]:
+    """Sorted (start, end, shift name) availability windows per machine, clipped to the horizon."""
+    windows = {}
+    for m in problem.machines:
+        if not problem.shifts:
+            windows[m.id] = [(0, horizon, None)]
+            continue
+        spans = sorted(
+            (max(0, s.start), min(horizon, s.end), s.name)
+            for s in problem.shifts
+            if (s.machines is None or m.id in s.machines) and s.start < horizon
+        )
+        windows[m.id] = [w for w in spans if w[1] > w[0]]
+    return windows
+
+
+def _blocked(windows: List[Tuple[int, int, str]], horizon: int) -> List[Tuple[int, int]]:
+    """Complement of the availability windows within [0, horizon]."""
+    gaps, cursor = [], 0
+    for start, end, _ in windows:
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < horizon:
+        gaps.append((cursor, horizon))
+    return gaps
+
+
+def _lost_capacity(windows, downtimes: List[Downtime], capacity: int, horizon: int) -> List[Tuple[int, int, int]]:
+    """
+    Non-overlapping (start, end, lost slots) segments for one machine: everything
+    outside its shift windows is fully lost; inside, downtimes remove their slots.
+    """
+    if not downtimes:
+        return [(start, end, capacity) for start, end in _blocked(windows, horizon)]
+    cuts = {0, horizon}
+    for start, end, _ in windows:
+        cuts.update((start, end))
+    for d in downtimes:
+        cuts.update((max(0, min(d.start, horizon)), max(0, min(d.end, horizon))))
+    points = sorted(cuts)
+    segments = []
+    for a, b in zip(points, points[1:]):
+        if not any(ws <= a and b <= we for ws, we, _ in windows):
+            lost = capacity
+        else:
+            lost = min(capacity, sum(d.slots or capacity for d in downtimes if d.start <= a and b <= d.end))
+        if not lost:
+            continue
+        if segments and segments[-1][1] == a and segments[-1][2] == lost:
+            segments[-1] = (segments[-1][0], b, lost)
+        else:
+            segments.append((a, b, lost))
+    return segments
+
+
+def _earliest_fit(windows: List[Tuple[int, int, str]], busy: List[Tuple[int, int]], ready: int, duration: int) -> Optional[int]:
+    """Earliest start ≥ ready inside an availability window that does not overlap `busy` (sorted)."""
+    t = ready
+    i = bisect.bisect_left(busy, (t,))
+    if i > 0 and busy[i - 1][1] > t:
+        t = busy[i - 1][1]
+    w = 0
+    while True:
+        while w < len(windows) and windows[w][1] < t + duration:
+            w += 1
+        if w == len(windows):
+            return None
+        start = max(t, windows[w][0])
+        if start + duration > windows[w][1]:
+            t = start
+            continue
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        if i < len(busy) and busy[i][0] < start + duration:
+            t = busy[i][1]
+            i += 1
+            continue
+        return start
+
+
+def _subtract(windows: List[Tuple[int, int, str]], cuts: List[Tuple[int, int]]) -> List[Tuple[int, int, str]]:
+    """Remove the [start, end) spans in `cuts` from the availability windows."""
+    result = []
+    for start, end, name in windows:
+        pieces = [(start, end)]
+        for cs, ce in cuts:
+            pieces = [p for ps, pe in pieces for p in ((ps, min(pe, cs)), (max(ps, ce), pe)) if p[1] > p[0]]
+        result.extend((ps, pe, name) for ps, pe in pieces)
+    return sorted(result)
+
+
+def greedy_schedule(problem: Problem, horizon: int, windows, pinned=None, now: int = 0) -> Optional[Dict[Tuple[str, str], Tuple[str, int]]]:
+    """
+    Minimum-slack list scheduling with gap insertion: repeatedly take the ready
+    operation whose order has the least slack (due − remaining work) and insert it
+    into the earliest gap of the eligible machine slot where it finishes first.
+
+    `pinned` maps (order_id, op_id) → (machine, start) for operations that keep
+    their previous placement; everything else is scheduled around them, no
+    earlier than `now`. Any
+    downtime is treated as a full machine stop here, so the result is always
+    feasible for the CP model. Returns None if something does not fit the horizon.
+    """
+    pinned = pinned or {}
+    durations = {(o.id, op.id): op.duration for o in problem.orders for op in o.operations}
+    cuts = {m.id: [] for m in problem.machines}
+    for d in problem.downtimes:
+        cuts[d.machine].append((d.start, d.end))
+    available = {m: _subtract(w, cuts[m]) if cuts[m] else w for m, w in windows.items()}
+
+    busy = {m.id: [[] for _ in range(m.capacity)] for m in problem.machines}
+    # Interval colouring in start order puts pinned operations into non-overlapping slots.
+    for key, (m, start) in sorted(pinned.items(), key=lambda item: item[1][1]):
+        slot = next((sl for sl in busy[m] if not sl or sl[-1][1] <= start), busy[m][0])
+        slot.append((start, start + durations[key]))
+
+    remaining = [
+        [sum(op.duration for op in o.operations[k:]) for k in range(len(o.operations))]
+        for o in problem.orders
+    ]
+    due = [o.due if o.due is not None else horizon for o in problem.orders]
+    heap = [(due[i] - remaining[i][0], o.release, i, 0) for i, o in enumerate(problem.orders)]
+    heapq.heapify(heap)
+    assignment = dict(pinned)
+    while heap:
+        _, ready, i, k = heapq.heappop(heap)
+        order = problem.orders[i]
+        op = order.operations[k]
+        key = (order.id, op.id)
+        if key in pinned:
+            end = max(ready, pinned[key][1] + op.duration)
+        else:
+            ready = max(ready, now)
+            best = None
+            for m in op.machines:
+                for slot in busy[m]:
+                    start = _earliest_fit(available[m], slot, ready, op.duration)
+                    if start is not None and (best is None or start + op.duration < best[0]):
+                        best = (start + op.duration, m, slot, start)
+            if best is None:
+                return None
+            end, m, slot, start = best
+            bisect.insort(slot, (start, end))
+            assignment[key] = (m, start)
+        if k + 1 < len(order.operations):
+            heapq.heappush(heap, (due[i] - remaining[i][k + 1], end, i, k + 1))
+    return assignment
+
+
+def solve(
+    problem: Problem,
+    time_limit: float = 10.0,
+    num_workers: int = 8,
+    tardiness_weight: int = 10,
+    previous: Optional[Dict[Tuple[str, str], Tuple[str, int]]] = None,
+    fixed=None,
+    now: int = 0,
+) -> Solution:
+    """
+    Minimise weighted tardiness (x tardiness_weight) plus makespan.
+
+    The model is warm-started from greedy_schedule, so large instances get a
+    feasible answer even when the time limit is too short to improve on it
+    (status "HEURISTIC" if CP-SAT did not report a solution in time).
+
+    For re-solves, `previous` is the last assignment ((order_id, op_id) →
+    (machine, start)) and `fixed` the keys that must keep it; those become
+    constant intervals, so only the affected operations are searched. Operations
+    that are not fixed start no earlier than `now` (the time of the re-plan).
+    """
+    from ortools.sat.python import cp_model   # heavy import, deferred to the first solve
+
+    validate_problem(problem)
+    horizon = _horizon(problem, now)
+    windows = _machine_windows(problem, horizon)
+    capacity = {m.id: m.capacity for m in problem.machines}
+    pinned = {key: previous[key] for key in (fixed or ()) if previous and key in previous}
+    hint = greedy_schedule(problem, horizon, windows, pinned, now)
+
+    model = cp_model.CpModel()
+    machine_intervals = {m: [] for m in capacity}
+    op_vars = {}   # (order_id, op_id) → (start, end, {machine: presence})
+    tardiness = []
+    order_ends = []
+
+    for order in problem.orders:
+        prev_end = None
+        for op in order.operations:
+            key = (order.id, op.id)
+            if key in pinned:
+                m, start = pinned[key]
+                end = start + op.duration
+                machine_intervals[m].append(model.NewFixedSizeIntervalVar(start, op.duration, f"i_{order.id}_{op.id}"))
+                if prev_end is not None and not isinstance(prev_end, int):
+                    model.Add(prev_end <= start)
+                prev_end = end
+                op_vars[key] = (start, end, {m: True})
+                continue
+            earliest = max(order.release, now)
+            start = model.NewIntVar(earliest, horizon, f"s_{order.id}_{op.id}")
+            end = model.NewIntVar(earliest, horizon, f"e_{order.id}_{op.id}")
+            model.Add(end == start + op.duration)
+            presences = {}
+            if len(op.machines) == 1:
+                m = op.machines[0]
+                presences[m] = True
+                machine_intervals[m].append(model.NewIntervalVar(start, op.duration, end, f"i_{order.id}_{op.id}"))
+            else:
+                for m in op.machines:
+                    lit = model.NewBoolVar(f"p_{order.id}_{op.id}_{m}")
+                    presences[m] = lit
+                    machine_intervals[m].append(
+                        model.NewOptionalIntervalVar(start, op.duration, end, lit, f"i_{order.id}_{op.id}_{m}")
+                    )
+                model.AddExactlyOne(presences.values())
+            if prev_end is not None:
+                model.Add(start >= prev_end)
+            prev_end = end
+            op_vars[key] = (start, end, presences)
+
+        order_ends.append(prev_end)
+        if order.due is not None:
+            late = model.NewIntVar(0, horizon, f"late_{order.id}")
+            model.Add(late >= prev_end - order.due)
+            tardiness.append((order.priority, late, order.id, order.due, (order.id, order.operations[-1].id)))
+
+    downtimes = {m: [] for m in capacity}
+    for d in problem.downtimes:
+        downtimes[d.machine].append(d)
+
+    for m, intervals in machine_intervals.items():
+        blocked = [
+            (model.NewFixedSizeIntervalVar(start, end - start, f"off_{m}_{start}"), lost)
+            for start, end, lost in _lost_capacity(windows[m], downtimes[m], capacity[m], horizon)
+        ]
+        if capacity[m] == 1:
+            model.AddNoOverlap(intervals + [iv for iv, _ in blocked])
+        else:
+            model.AddCumulative(
+                intervals + [iv for iv, _ in blocked],
+                [1] * len(intervals) + [lost for _, lost in blocked],
+                capacity[m],
+            )
+
+    makespan = model.NewIntVar(0, horizon, "makespan")
+    model.AddMaxEquality(makespan, order_ends)
+    model.Minimize(tardiness_weight * sum(p * late for p, late, *_ in tardiness) + makespan)
+
+    if hint:
+        # A complete hint (every decision and derived variable) lets CP-SAT accept it as-is.
+        durations = {(o.id, op.id): op.duration for o in problem.orders for op in o.operations}
+        ends = {key: begin + durations[key] for key, (_, begin) in hint.items()}
+        for key, (start, end, presences) in op_vars.items():
+            if key in pinned:
+                continue
+            machine, begin = hint[key]
+            model.AddHint(start, begin)
+            model.AddHint(end, ends[key])
+            for m, lit in presences.items():
+                if lit is not True:
+                    model.AddHint(lit, m == machine)
+        for _, late, _, due, last in tardiness:
+            model.AddHint(late, max(0, ends[last] - due))
+        model.AddHint(makespan, max(ends[(o.id, o.operations[-1].id)] for o in problem.orders))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_workers = num_workers
+    if len(op_vars) > LARGE_MODEL_OPERATIONS:
+        # Probing dominates presolve time on big models and rarely pays off here.
+        solver.parameters.cp_model_probing_level = 0
+    t0 = time.perf_counter()
+    status = solver.Solve(model)
+    elapsed = time.perf_counter() - t0
+
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        assignment = {}
+        for key, (start, _, presences) in op_vars.items():
+            machine = next(m for m, lit in presences.items() if lit is True or solver.BooleanValue(lit))
+            assignment[key] = (machine, start if isinstance(start, int) else solver.Value(start))
+        solution = _build_solution(problem, windows, assignment, solver.StatusName(status), elapsed, tardiness_weight)
+        solution.objective = solver.ObjectiveValue()
+        solution.best_bound = solver.BestObjectiveBound()
+        return solution
+    if hint and status == cp_model.UNKNOWN:
+        # Time limit hit before CP-SAT reported anything: fall back to the warm start.
+        return _build_solution(problem, windows, hint, "HEURISTIC", elapsed, tardiness_weight)
+    return Solution(status=solver.StatusName(status), solve_seconds=round(elapsed, 4))
+
+
+def _build_solution(problem: Problem, windows, assignment, status: str, elapsed: float, tardiness_weight: int) -> Solution:
+    solution = Solution(status=status, solve_seconds=round(elapsed, 4), makespan=0, total_tardiness=0)
+    for order in problem.orders:
+        for op in order.operations:
+            machine, start = assignment[(order.id, op.id)]
+            end = start + op.duration
+            shift = next((name for ws, we, name in windows[machine] if ws <= start and end <= we), None)
+            solution.operations.append(ScheduledOperation(order.id, op.id, machine, start, end, shift))
+        finish = solution.operations[-1].end
+        solution.makespan = max(solution.makespan, finish)
+        if order.due is not None and finish > order.due:
+            solution.total_tardiness += finish - order.due
+            solution.late_orders.append(order.id)
+    weighted = sum(
+        o.priority * max(0, assignment[(o.id, o.operations[-1].id)][1] + o.operations[-1].duration - o.due)
+        for o in problem.orders if o.due is not None
+    )
+    solution.objective = float(tardiness_weight * weighted + solution.makespan)
+    return solution
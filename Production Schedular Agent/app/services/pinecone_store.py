@@ -1,49 +1,108 @@
 import os
-import google.generativeai as genai
-from langchain_community.document_loaders import PyPDFLoader
-# from pinecone import Pinecone, ServerlessSpec
-from pinecone import Pinecone , ServerlessSpec
 from dotenv import load_dotenv
 from ..core.config import settings
+from .embedding_client import get_embedding_client
+from .ingestion import run_ingestion
+from .manifest import chunk_id, get_index_manifest
+from .query_cache import get_query_cache
+from .vector_store import get_vector_store
+from .keyword_index import get_keyword_index
 
 load_dotenv()
 
-# Configure Gemini
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+def gemini_embed(text: str):
+    """Generate embeddings from Gemini (coalesced with concurrent queries, rate-limited, cached)"""
+    return get_embedding_client().embed_query(text)
 
-# Init Pinecone
-pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-index_name = settings.PINECONE_INDEX_NAME
+def gemini_embed_batch(texts):
+    """Generate embeddings for a list of texts in batched Gemini calls, skipping cached ones"""
+    return get_embedding_client().embed_documents(texts)
 
-# Create index if not exists
-if index_name not in pc.list_indexes().names():
-    pc.create_index(
-        name=index_name,
-        dimension=786,   # Gemini embeddings dimension
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1")
-    )
+def iter_pdf_chunks(file_path: str):
+    """Yield (page number, chunk text) one page at a time so large PDFs are never fully in memory"""
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-index = pc.Index(index_name)
+    splitter = RecursiveCharacterTextSplitter()
+    for page in PyPDFLoader(file_path).lazy_load():
+        for chunk in splitter.split_text(page.page_content):
+            yield page.metadata.get("page"), chunk
 
-def gemini_embed(text: str):
-    """Generate embeddings from Gemini"""
-    resp = genai.embed_content(model="models/embedding-001", content=text)
-    return resp["embedding"]
-
-def store_pdf_to_pinecone(file_path: str):
-    """Load PDF → Embed chunks → Store in Pinecone"""
-    loader = PyPDFLoader(file_path)
-    docs = loader.load_and_split()
+def store_pdf_to_pinecone(file_path: str, source: str = None, on_progress=None):
+    """
+    Load PDF → Embed new/changed chunks in concurrent batches → Upsert to the vector store in pages.
+
+    Chunk IDs are content hashes, so documents never overwrite each other and a
+    re-upload of `source` only embeds chunks the manifest has not seen; chunks
+    dropped from a revised document are deleted from the index.
+    `on_progress` receives pages_parsed / chunks_embedded / vectors_upserted counts.
+    """
+    source = source or os.path.basename(file_path)
     project_name = "AI Production Scheduler"
-    vectors = []
-    for i, doc in enumerate(docs):
-        emb = gemini_embed(doc.page_content)
-        vectors.append({
-            "id": f"{project_name}__doc_{i}",
-            "values": emb,
-            "metadata": {"Text": doc.page_content,"Project Name":project_name}
-        })
-
-    index.upsert(vectors=vectors)
-    return {"status": "success", "docs_indexed": len(vectors)}
+    manifest = get_index_manifest()
+    chunks = set()   # IDs only; chunk text flows straight through to the embedder
+    pages = set()
+    store = get_vector_store()
+    keywords = get_keyword_index()
+
+    def records():
+        for page, text in iter_pdf_chunks(file_path):
+            pages.add(page)
+            vec_id = chunk_id(project_name, text)
+            if vec_id in chunks:
+                continue
+            chunks.add(vec_id)
+            metadata = {"text": text, "Project Name": project_name, "Source": source, "Page": page}
+            if not manifest.claim(source, vec_id):
+                yield vec_id, text, metadata
+            elif keywords.get(vec_id) is None:
+                # Embedded before the keyword index existed: index the text, skip the embed
+                keywords.add([(vec_id, metadata)])
+
+    def upsert(vectors):
+        store.upsert(vectors)
+        keywords.add((v["id"], v["metadata"]) for v in vectors)
+
+    def delete(stale):
+        for i in range(0, len(stale), settings.UPSERT_BATCH_SIZE):
+            store.delete(stale[i:i + settings.UPSERT_BATCH_SIZE])
+        keywords.remove(stale)
+        store.flush()
+        keywords.flush()
+
+    try:
+        stats = run_ingestion(
+            records(),
+            embed_batch=gemini_embed_batch,
+            upsert=upsert,
+            embed_batch_size=settings.EMBED_BATCH_SIZE,
+            max_workers=settings.EMBED_MAX_WORKERS,
+            upsert_batch_size=settings.UPSERT_BATCH_SIZE,
+            on_progress=on_progress and (lambda stats: on_progress({
+                "pages_parsed": len(pages),
+                "chunks_embedded": stats.embed.items,
+                "vectors_upserted": stats.upsert.items,
+            })),
+        )
+        store.flush()
+        keywords.flush()
+        # Stale chunks are deleted under the manifest lock, after checking that no other job claimed them
+        stale = manifest.retire(source, chunks, delete)
+    finally:
+        manifest.release(source)
+    if stats.upsert.items or stale:
+        # Cached answers were grounded on the old document set
+        get_query_cache().invalidate()
+
+    return {
+        "status": "success",
+        "source": source,
+        "docs_indexed": stats.upsert.items,
+        "chunks_total": len(chunks),
+        "chunks_skipped": len(chunks) - stats.upsert.items,
+        "chunks_deleted": len(stale),
+        "pages_parsed": len(pages),
+        "chunks_embedded": stats.embed.items,
+        "vectors_upserted": stats.upsert.items,
+        "throughput": stats.as_dict(),
+    }
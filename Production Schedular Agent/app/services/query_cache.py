@@ -0,0 +1,110 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from ..core.config import settings
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().strip("?!.").strip().lower()
+
+
+class QueryCache:
+    """
+    Two-tier answer cache for the scheduling RAG path.
+
+    Exact tier: LRU keyed on the normalised query text — hit before any API call.
+    Semantic tier: after the query is embedded, reuse the answer of a cached
+    query whose embedding has cosine similarity ≥ `threshold`.
+    Entries expire after `ttl` seconds; the least recently used entry is evicted
+    beyond `max_entries`. invalidate() drops everything (new documents ingested).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()   # key → (value, unit embedding or None, expires_at)
+        self._matrix = None             # (keys, stacked embeddings) for the semantic tier
+        self._lock = threading.Lock()
+        self.hits_exact = self.hits_semantic = self.misses_exact = self.misses = 0
+
+    def _expire(self, now: float):
+        expired = [k for k, (_, _, expires) in self._entries.items() if expires <= now]
+        for k in expired:
+            del self._entries[k]
+        if expired:
+            self._matrix = None
+
+    def get(self, query: str):
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[2] > time.time():
+                self._entries.move_to_end(key)
+                self.hits_exact += 1
+                return entry[0]
+            self.misses_exact += 1
+            return None
+
+    def get_similar(self, embedding):
+        with self._lock:
+            self._expire(time.time())
+            if self._matrix is None:
+                keys = [k for k, (_, emb, _) in self._entries.items() if emb is not None]
+                vectors = np.stack([self._entries[k][1] for k in keys]) if keys else np.empty((0, 0))
+                self._matrix = (keys, vectors)
+            keys, vectors = self._matrix
+            if not keys:
+                self.misses += 1
+                return None
+            query = np.asarray(embedding, dtype=np.float32)
+            scores = vectors @ (query / (np.linalg.norm(query) or 1.0))
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(keys[best])
+            self.hits_semantic += 1
+            return self._entries[keys[best]][0]
+
+    def put(self, query: str, value, embedding=None):
+        """Cache `value` (callers only cache successful answers); pass `embedding` to make it reusable for similar queries too"""
+        unit = None
+        if embedding is not None:
+            unit = np.asarray(embedding, dtype=np.float32)
+            unit = unit / (np.linalg.norm(unit) or 1.0)
+        with self._lock:
+            self._entries[normalize_query(query)] = (value, unit, time.time() + self.ttl)
+            self._entries.move_to_end(normalize_query(query))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits_exact": self.hits_exact,
+                "hits_semantic": self.hits_semantic,
+                "misses_exact": self.misses_exact,   # exact tier only; most go on to the semantic tier
+                "misses": self.misses,               # missed both tiers
+            }
+
+
+@lru_cache(maxsize=None)
+def get_query_cache():
+    return QueryCache(
+        max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+        ttl=settings.QUERY_CACHE_TTL_SECONDS,
+        threshold=settings.QUERY_CACHE_SIMILARITY,
+    )
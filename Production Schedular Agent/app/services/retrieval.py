@@ -0,0 +1,114 @@
+from collections import defaultdict
+from functools import lru_cache
+
+from ..core.config import settings
+from .keyword_index import get_keyword_index, tokenize
+from .vector_store import get_vector_store
+
+
+def chunk_text(metadata: dict) -> str:
+    # Chunks indexed before the key was normalised stored their text under "Text"
+    return metadata.get("text") or metadata.get("Text") or ""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for the context budget"""
+    return max(1, len(text) // 4)
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60):
+    """Fuse ranked ID lists: score(id) = Σ 1 / (k + rank). Returns {id: score}, best first."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] += 1.0 / (k + rank)
+    return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True))
+
+
+def _shingles(text: str):
+    tokens = tokenize(text)
+    return set(zip(tokens, tokens[1:], tokens[2:])) or set(tokens)
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class Retriever:
+    """
+    Hybrid retrieval for the scheduler prompt: BM25 keyword hits and vector
+    hits are fused with reciprocal rank fusion, near-identical chunks (e.g. the
+    same paragraph from two revisions of a document) are dropped, and chunks
+    are taken best-first until the token budget is spent.
+    """
+
+    def __init__(self, vector_store, keyword_index, candidates: int = 20, rrf_k: int = 60,
+                 dedupe_similarity: float = 0.85, token_budget: int = 1500):
+        self.vector_store = vector_store
+        self.keyword_index = keyword_index
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.dedupe_similarity = dedupe_similarity
+        self.token_budget = token_budget
+
+    def retrieve(self, query: str, vector=None, top_k: int = 5):
+        """
+        Up to `top_k` chunks as {"id", "text", "source", "page", "score",
+        "keyword_rank", "vector_rank"}. Without `vector` only BM25 is used.
+        """
+        keyword_ids = [chunk_id for chunk_id, _ in self.keyword_index.search(query, self.candidates)]
+        vector_ids, metadata = [], {}
+        if vector is not None:
+            for match in self.vector_store.query(vector, top_k=self.candidates)["matches"]:
+                vector_ids.append(match["id"])
+                metadata[match["id"]] = match["metadata"]
+        fused = reciprocal_rank_fusion([keyword_ids, vector_ids], k=self.rrf_k)
+
+        selected, kept, used = [], [], 0
+        for chunk_id, score in fused.items():
+            if len(selected) >= top_k:
+                break
+            meta = metadata.get(chunk_id) or self.keyword_index.get(chunk_id) or {}
+            text = chunk_text(meta)
+            if not text:
+                continue
+            shingles = _shingles(text)
+            if any(_jaccard(shingles, other) >= self.dedupe_similarity for other in kept):
+                continue
+            cost = estimate_tokens(text)
+            if used + cost > self.token_budget:
+                continue   # a shorter, lower-ranked chunk may still fit
+            used += cost
+            kept.append(shingles)
+            selected.append({
+                "id": chunk_id,
+                "text": text,
+                "source": meta.get("Source"),
+                "page": meta.get("Page"),
+                "score": round(score, 6),
+                "keyword_rank": keyword_ids.index(chunk_id) + 1 if chunk_id in keyword_ids else None,
+                "vector_rank": vector_ids.index(chunk_id) + 1 if chunk_id in vector_ids else None,
+            })
+        return selected
+
+
+def build_context(chunks) -> str:
+    """Prompt context with a source marker per chunk"""
+    parts = []
+    for chunk in chunks:
+        where = chunk.get("source") or "document"
+        if isinstance(chunk.get("page"), int):   # PDF loader pages are 0-based
+            where = f"{where}, page {chunk['page'] + 1}"
+        parts.append(f"[{where}]\n{chunk['text']}")
+    return "\n\n".join(parts)
+
+
+@lru_cache(maxsize=None)
+def get_retriever():
+    return Retriever(
+        get_vector_store(),
+        get_keyword_index(),
+        candidates=settings.RETRIEVAL_CANDIDATES,
+        dedupe_similarity=settings.RETRIEVAL_DEDUPE_SIMILARITY,
+        token_budget=settings.RETRIEVAL_CONTEXT_TOKENS,
+    )
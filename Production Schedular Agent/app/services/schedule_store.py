@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict
+from functools import lru_cache
+
+from ..core.config import settings
+from .optimizer import Downtime, problem_from_dict, solve
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("add_order", "machine_outage", "operator_absence")
+
+
+class ScheduleStore:
+    """
+    Keeps the last problem and CP-SAT solution for each plant and re-plans from
+    delta events. Operations an event does not touch keep their placement and
+    are passed to the solver as fixed intervals; only the affected ones (and
+    everything after them in the same order) are searched again.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self._plans = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _lock(self, plant_id: str):
+        with self._guard:
+            return self._locks.setdefault(plant_id, threading.Lock())
+
+    def _path(self, plant_id: str):
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", plant_id):
+            raise ValueError(f"Invalid plant id: {plant_id!r}")
+        return os.path.join(self.directory, f"{plant_id}.json") if self.directory else None
+
+    def _load(self, plant_id: str):
+        if plant_id in self._plans:
+            return self._plans[plant_id]
+        path = self._path(plant_id)
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self._plans[plant_id] = (problem_from_dict(data["problem"]), data["solution"])
+            return self._plans[plant_id]
+        return None
+
+    def _save(self, plant_id: str, problem, solution: dict):
+        self._plans[plant_id] = (problem, solution)
+        path = self._path(plant_id)
+        if path:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"problem": asdict(problem), "solution": solution}, f)
+            os.replace(tmp, path)
+
+    def get(self, plant_id: str):
+        with self._lock(plant_id):
+            plan = self._load(plant_id)
+        return plan[1] if plan else None
+
+    def solve(self, plant_id: str, data: dict):
+        """Full solve of a new problem for the plant; replaces any stored plan."""
+        problem = problem_from_dict(data)
+        with self._lock(plant_id):
+            solution = solve(problem, time_limit=settings.SOLVER_TIME_LIMIT_SECONDS,
+                             num_workers=settings.SOLVER_NUM_WORKERS).as_dict()
+            solution["replan"] = {"mode": "full", "affected_operations": None, "fixed_operations": 0}
+            if solution["status"] in ("OPTIMAL", "FEASIBLE", "HEURISTIC"):
+                self._save(plant_id, problem, solution)
+        return solution
+
+    def apply_event(self, plant_id: str, event: dict):
+        """
+        Apply one delta event to the stored plan and re-solve incrementally.
+
+        Operations that started before the event's `now` never move, and nothing is
+        placed before `now`. If the incremental model is infeasible, every operation
+        that has not started is re-planned (mode "unstarted") around the started ones.
+        """
+        with self._lock(plant_id):
+            plan = self._load(plant_id)
+            if plan is None:
+                raise KeyError(f"No schedule stored for plant {plant_id}")
+            problem, last = plan
+            problem = problem_from_dict(asdict(problem))   # work on a copy
+            previous = {(op["order_id"], op["operation_id"]): (op["machine_id"], op["start"]) for op in last["operations"]}
+
+            now = int(event.get("now") or 0)
+            affected = _apply(problem, event, previous, now)
+            fixed = _fixed_operations(problem, previous, affected, now)
+
+            t0 = time.perf_counter()
+            solution = solve(problem, time_limit=settings.RESOLVE_TIME_LIMIT_SECONDS,
+                             num_workers=settings.SOLVER_NUM_WORKERS, previous=previous, fixed=fixed, now=now)
+            mode = "incremental"
+            if not solution.feasible:
+                # Widen the search to every operation that has not started; started ones stay frozen.
+                fixed = {key for key in fixed if previous[key][1] < now}
+                logger.info("Incremental re-solve for %s was %s; re-planning all %d unstarted operations",
+                            plant_id, solution.status, sum(len(o.operations) for o in problem.orders) - len(fixed))
+                solution = solve(problem, time_limit=settings.SOLVER_TIME_LIMIT_SECONDS,
+                                 num_workers=settings.SOLVER_NUM_WORKERS, previous=previous, fixed=fixed, now=now)
+                mode = "unstarted"
+            result = solution.as_dict()
+            result["replan"] = {
+                "mode": mode,
+                "event": event["type"],
+                "affected_operations": len(affected),
+                "fixed_operations": len(fixed),
+                "seconds": round(time.perf_counter() - t0, 4),
+            }
+            if solution.feasible:
+                self._save(plant_id, problem, result)
+        return result
+
+
+def _apply(problem, event: dict, previous: dict, now: int = 0):
+    """
+    Mutate `problem` with the event and return the previously placed operations it directly touches.
+
+    Operations that started before `now` cannot be interrupted, so a downtime overlapping
+    one on its machine begins when that operation ends (and is dropped if it ends later).
+    """
+    kind = event.get("type")
+    if kind not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type {kind!r}; expected one of {EVENT_TYPES}")
+
+    if kind == "add_order":
+        if not event.get("order"):
+            raise ValueError("add_order needs an 'order'")
+        machines = [asdict(m) for m in problem.machines]
+        order = problem_from_dict({"machines": machines, "orders": [event["order"]]}).orders[0]
+        if any(o.id == order.id for o in problem.orders):
+            raise ValueError(f"Order {order.id} already exists")
+        problem.orders.append(order)
+        # Free up the machines the new order can use between its release and due date.
+        eligible = {m for op in order.operations for m in op.machines}
+        window_end = order.due if order.due is not None else float("inf")
+        return {key for key, (m, start) in previous.items() if m in eligible and order.release <= start < window_end}
+
+    if event.get("start") is None or event.get("end") is None:
+        raise ValueError(f"{kind} needs 'start' and 'end'")
+    start, end = int(event["start"]), int(event["end"])
+    if kind == "machine_outage":
+        machines, slots = [event.get("machine")] if event.get("machine") else event.get("machines") or [], None
+    else:
+        machines, slots = event.get("machines") or [event.get("machine")], int(event.get("slots") or 1)
+    durations = {(o.id, op.id): op.duration for o in problem.orders for op in o.operations}
+    for m in machines:
+        begins = max(
+            [start] + [s + durations[key] for key, (pm, s) in previous.items()
+                       if pm == str(m) and s < now and s < end and s + durations[key] > start]
+        )
+        if begins < end:
+            problem.downtimes.append(Downtime(machine=str(m), start=begins, end=end, slots=slots,
+                                              reason=event.get("reason") or kind))
+    return {
+        key for key, (m, s) in previous.items()
+        if m in machines and s < end and s + durations[key] > start
+    }
+
+
+def _fixed_operations(problem, previous: dict, affected: set, now: int):
+    """Unaffected operations keep their slot; once an order is affected, its later operations move too."""
+    fixed = set()
+    for order in problem.orders:
+        moving = False
+        for op in order.operations:
+            key = (order.id, op.id)
+            if key not in previous:
+                moving = True
+                continue
+            started = previous[key][1] < now
+            moving = moving or (key in affected and not started)
+            if started or not moving:
+                fixed.add(key)
+    return fixed
+
+
+@lru_cache(maxsize=None)
+def get_schedule_store():
+    return ScheduleStore(settings.SCHEDULE_STORE_DIR)
@@ -1,25 +1,25 @@
-import google.generativeai as genai
-import ortools
-from langchain.prompts import PromptTemplate
-from ..core.config import settings
-from app.services.data_loder import query_pinecone
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.services.clients import get_generation_model
+from app.services.retrieval import build_context, get_retriever
 from app.services.pinecone_store import gemini_embed
-from ortools.sat.python import cp_model
+from app.services.optimizer import problem_from_dict, solve
+from app.services.query_cache import get_query_cache
+from app.services.intent import KNOWLEDGE_INTENTS, Intent, classify_intent
+from app.services.metrics import get_metrics
+from app.schemas.upload import MachineAssignment, OperationAssignment, OrderPlan, ShiftSlot, StructuredPlan
 
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+logger = logging.getLogger(__name__)
 
-
-def schedule_production(user_query: str):
-    # Step 1: Get relevant docs from Pinecone
-    vector = gemini_embed(user_query)
-    results = query_pinecone(vector, top_k=5)
-
-    context = ""
-    if results and "matches" in results and results["matches"]:
-        context = ",".join([m["metadata"].get("text", "") for m in results["matches"]])
-
-    # Step 2: Build prompt
-    template = """
+# Templates are compiled on first use (langchain is slow to import); formatted per request.
+# The model only classifies the query and extracts structured inputs here — the
+# schedule itself is computed by the CP-SAT engine in optimizer.py.
+SCHEDULER_PROMPT = """
         You are an intelligent Production Scheduling Agent for a bag company.
 
         Context (from company documents):
@@ -28,40 +28,405 @@ def schedule_production(user_query: str):
         User Query:
         {query}
 
-        Tasks:
+        Reply with ONE JSON object and nothing else:
+        {{
+          "intent": "greeting" | "scheduling" | "machines" | "processes" | "safety" | "general",
+          "answer": "<markdown answer, empty for scheduling>",
+          "problem": <null, or for scheduling the structured inputs below>
+        }}
+
+        Rules for "answer":
         0. If the query is a 'genral question' (like "hi", "hello", "hey", "how are you"), respond politely with:
         "👋 Hi, I am your Production Scheduling Assistant. What can I help you with today?
         You can ask me about scheduling, machines, processes, or safety."
 
-        1. If the query is about production scheduling', create a structured draft schedule:
-        - Orders → Machine allocation → Operator shifts
-        - Respect capacity, machine constraints, due dates.
-        - Suggest optimizations if possible.
+        1. If the query is about 'machines', explain machine availability, utilization, or maintenance tips and working.
+
+        2. If the query is about 'processes', explain relevant manufacturing steps, workflows, or best practices.
+
+        3. If the query is about 'safety', explain workplace and operator safety guidelines relevant to the process.
+
+        4. If information is missing in context, answer based on your knowledge as an expert production planner for machine safety guideline .
+
+        Rules for "problem" (production scheduling queries only):
+        - All times are integer MINUTES from the start of the plan (day 1 06:00 = 0).
+        - Take orders, machines, shifts, capacities and due dates from the query and the context;
+          fill gaps with realistic values for a bag factory.
+        {{
+          "machines": [{{"id": "CUT-1", "capacity": 1}}],
+          "shifts":   [{{"name": "Morning", "start": 0, "end": 480, "machines": ["CUT-1"]}}],
+          "orders":   [{{"id": "PO-101", "due": 960, "release": 0, "priority": 1,
+                         "operations": [{{"id": "cutting", "duration": 90, "machines": ["CUT-1"]}}]}}]
+        }}
+        "machines" on a shift is optional (omit = all machines). Operations of an order run in the listed order.
+        """
+
+EXPLAIN_PROMPT = """
+        You are an intelligent Production Scheduling Agent for a bag company.
+        A constraint solver produced the schedule below for this request. Do not change it.
+
+        User Query:
+        {query}
+
+        Solver result:
+        {summary}
+
+        Explain the plan to a production planner in a few short markdown bullet points:
+        machine allocation, operator shifts, late orders and why, and practical optimizations.
+        """
 
-        2. If the query is about 'machines', explain machine availability, utilization, or maintenance tips and working.
+# Machines / processes / safety questions: plain-text answer from the fast model.
+ANSWER_PROMPT = """
+        You are an intelligent Production Scheduling Agent for a bag company.
+        The user is asking about {topic}.
 
-        3. If the query is about 'processes', explain relevant manufacturing steps, workflows, or best practices.
+        Context (from company documents):
+        {context}
 
-        4. If the query is about 'safety', explain workplace and operator safety guidelines relevant to the process.
+        User Query:
+        {query}
 
-        5. If information is missing in context, answer based on your knowledge as an expert production planner for machine safety guideline .
+        Answer in concise markdown. Prefer facts from the context; if it does not cover the
+        question, answer from your knowledge as an expert production planner and say so.
         """
-    prompt = PromptTemplate.from_template(template)
 
-    # Step 3: Call Gemini
-    model = genai.GenerativeModel("gemini-1.5-pro")
-    response = model.generate_content(
-        prompt.format(context=context or "No relevant documents found.", query=user_query)
+
+@lru_cache(maxsize=None)
+def _prompt(template: str):
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate.from_template(template)
+
+
+def _parse_json(text: str):
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def _schedule_table(solution):
+    rows = sorted(solution.operations, key=lambda op: (op.start, op.machine_id))
+    lines = [
+        "| Order | Operation | Machine | Shift | Start (min) | End (min) |",
+        "|---|---|---|---|---|---|",
+    ]
+    lines += [
+        f"| {op.order_id} | {op.operation_id} | {op.machine_id} | {op.shift or '-'} | {op.start} | {op.end} |"
+        for op in rows
+    ]
+    late = ", ".join(solution.late_orders) or "none"
+    lines.append(f"\n**Makespan:** {solution.makespan} min · **Late orders:** {late} · **Solver:** {solution.status}")
+    return "\n".join(lines)
+
+
+class _JsonStringField:
+    """Incrementally decodes one string field (e.g. "answer") of a JSON object that is still being generated"""
+
+    def __init__(self, name: str):
+        self._marker = re.compile(r'"%s"\s*:\s*"' % re.escape(name))
+        self._buffer = ""
+        self._start = None
+        self._emitted = 0
+
+    def feed(self, text: str):
+        self._buffer += text
+
+    def delta(self) -> str:
+        """Characters of the field decoded since the last call"""
+        if self._start is None:
+            match = self._marker.search(self._buffer)
+            if not match:
+                return ""
+            self._start = match.end()
+        raw, i = self._buffer[self._start:], 0
+        while i < len(raw):
+            if raw[i] == "\\":
+                i += 2
+            elif raw[i] == '"':
+                raw = raw[:i]
+                break
+            else:
+                i += 1
+        raw = re.sub(r"\\(u[0-9a-fA-F]{0,3})?$", "", raw)   # incomplete escape at the end
+        try:
+            decoded = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            return ""
+        if decoded and "\ud800" <= decoded[-1] <= "\udbff":   # wait for the low surrogate
+            decoded = decoded[:-1]
+        delta, self._emitted = decoded[self._emitted:], max(self._emitted, len(decoded))
+        return delta
+
+
+def _generate(prompt: str, stream: bool, model_name: str = None, **kwargs):
+    """Yield Gemini output text; chunk by chunk when streaming, in one piece otherwise"""
+    model = get_generation_model(model_name) if model_name else get_generation_model()
+    response = model.generate_content(prompt, stream=stream, **kwargs)
+    if not stream:
+        yield response.text
+        return
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:   # chunk without text parts (e.g. the final safety/finish chunk)
+            continue
+        if text:
+            yield text
+
+
+def _structured_plan(problem, solution) -> dict:
+    """Group the solver's operations by order, machine and shift slot"""
+    ops = sorted(solution.operations, key=lambda op: (op.start, op.machine_id))
+    by_order, by_machine = {}, {}
+    for op in ops:
+        by_order.setdefault(op.order_id, []).append(op)
+        by_machine.setdefault(op.machine_id, []).append(op)
+    span = solution.makespan or 0
+
+    orders = []
+    for order in problem.orders:
+        placed = by_order.get(order.id, [])
+        if not placed:
+            continue
+        completion = max(op.end for op in placed)
+        tardiness = max(0, completion - order.due) if order.due is not None else 0
+        orders.append(OrderPlan(id=order.id, start=min(op.start for op in placed), completion=completion,
+                                due=order.due, tardiness=tardiness, late=tardiness > 0))
+
+    machines = []
+    for machine in problem.machines:
+        placed = by_machine.get(machine.id, [])
+        busy = sum(op.end - op.start for op in placed)
+        machines.append(MachineAssignment(
+            machine_id=machine.id,
+            capacity=machine.capacity,
+            busy_minutes=busy,
+            utilization=round(busy / (machine.capacity * span), 4) if span else 0.0,
+            operations=[OperationAssignment(**vars(op)) for op in placed],
+        ))
+
+    shifts = []
+    for shift in sorted(problem.shifts, key=lambda s: (s.start, s.name)):
+        covered = set(shift.machines) if shift.machines else {m.id for m in problem.machines}
+        inside = [op for op in ops if op.machine_id in covered and shift.start <= op.start and op.end <= shift.end]
+        shifts.append(ShiftSlot(
+            shift=shift.name, start=shift.start, end=shift.end,
+            machines=sorted({op.machine_id for op in inside}),
+            operations=len(inside),
+            busy_minutes=sum(op.end - op.start for op in inside),
+        ))
+
+    return StructuredPlan(
+        status=solution.status,
+        makespan=solution.makespan,
+        total_tardiness=solution.total_tardiness,
+        late_orders=solution.late_orders,
+        orders=orders,
+        machines=machines,
+        shifts=shifts,
+    ).model_dump()
+
+
+def _optimize(user_query: str, problem_data: dict, stream: bool = False):
+    """Solve the extracted problem with CP-SAT and have the LLM explain the result (generator; returns the result)"""
+    try:
+        problem = problem_from_dict(problem_data)
+    except ValueError as e:
+        logger.warning("Could not build scheduling problem from LLM output: %s", e)
+        return {
+            "optimized_plan": "I could not extract a complete set of orders, machines and shifts from your request. "
+                              "Please list the orders (quantities, due dates) and the machines/shifts available.",
+            "explanation": str(e),
+            "schedule": None,
+        }
+
+    yield "status", {"stage": "solving"}
+    solution = solve(
+        problem,
+        time_limit=settings.SOLVER_TIME_LIMIT_SECONDS,
+        num_workers=settings.SOLVER_NUM_WORKERS,
     )
-    draft_plan = response.text
+    if not solution.feasible:
+        return {
+            "optimized_plan": f"No feasible schedule found (solver status: {solution.status}). "
+                              "Check that the shifts leave enough machine time for every order.",
+            "explanation": "Optimized with OR-Tools CP-SAT using machine, shift and capacity constraints.",
+            "schedule": solution.as_dict(),
+        }
+
+    plan = _structured_plan(problem, solution)
+    yield "plan", plan
+    table = _schedule_table(solution)
+    yield "token", {"text": f"{table}\n\n"}
+
+    yield "status", {"stage": "explaining"}
+    summary = {k: v for k, v in solution.as_dict().items() if k != "operations"}
+    explanation = []
+    for text in _generate(_prompt(EXPLAIN_PROMPT).format(query=user_query, summary=f"{json.dumps(summary)}\n\n{table}"), stream):
+        explanation.append(text)
+        yield "token", {"text": text}
+    return {
+        "optimized_plan": f"{table}\n\n{''.join(explanation)}",
+        "explanation": "Optimized with OR-Tools CP-SAT using machine, shift and capacity constraints.",
+        "schedule": solution.as_dict(),
+        "plan": plan,
+    }
 
-    # Step 4: (Optional) Optimize with OR-Tools if scheduling is needed
-    optimized_plan = draft_plan
-    model_cp = cp_model.CpModel()
-    # TODO: parse structured plan → apply constraints with OR-Tools → build optimized_plan
 
+def _answer(user_query: str, topic: str, context: str, stream: bool):
+    """Knowledge question (machines / processes / safety): fast model, no JSON, no solver"""
+    yield "status", {"stage": "generating"}
+    answer = []
+    for text in _generate(
+        _prompt(ANSWER_PROMPT).format(topic=topic, context=context or "No relevant documents found.", query=user_query),
+        stream,
+        model_name=settings.FAST_GENERATION_MODEL,
+    ):
+        answer.append(text)
+        yield "token", {"text": text}
     return {
-        # "draft_plan": draft_plan,
-        "optimized_plan": optimized_plan,
-        "explanation": "If scheduling, optimized with machine and shift constraints. If machine/process/safety, answered with best knowledge."
-    }
\ No newline at end of file
+        "optimized_plan": "".join(answer),
+        "explanation": "If machine/process/safety, answered with best knowledge.",
+        "schedule": None,
+        "intent": topic,
+    }
+
+
+def _plan(user_query: str, context: str, stream: bool):
+    """Pro model classifies and extracts the problem; scheduling requests go on to CP-SAT"""
+    # Non-scheduling answers are streamed out of the JSON as it is generated.
+    yield "status", {"stage": "generating"}
+    answer = _JsonStringField("answer")
+    intent = None
+    raw = []
+    for text in _generate(
+        _prompt(SCHEDULER_PROMPT).format(context=context or "No relevant documents found.", query=user_query),
+        stream,
+        generation_config={"response_mime_type": "application/json"},
+    ):
+        raw.append(text)
+        answer.feed(text)
+        if intent is None:
+            match = re.search(r'"intent"\s*:\s*"(\w+)"', "".join(raw))
+            intent = match and match.group(1)
+        if intent and intent != "scheduling":
+            delta = answer.delta()
+            if delta:
+                yield "token", {"text": delta}
+    raw = "".join(raw)
+
+    parsed = _parse_json(raw)
+    if not isinstance(parsed, dict):
+        return {
+            "optimized_plan": raw,
+            "explanation": "Answered with best knowledge.",
+            "schedule": None,
+        }
+    # Optimize with OR-Tools if scheduling is needed
+    if parsed.get("intent") == "scheduling" and parsed.get("problem"):
+        result = yield from _optimize(user_query, parsed["problem"], stream)
+    else:
+        result = {
+            "optimized_plan": parsed.get("answer") or raw,
+            "explanation": "If machine/process/safety, answered with best knowledge.",
+            "schedule": None,
+        }
+    return {**result, "intent": parsed.get("intent")}
+
+
+def _pipeline(user_query: str, stream: bool, intent: Intent):
+    if intent.reply is not None:
+        # Greetings and small talk: no embedding, retrieval or LLM call
+        return {"optimized_plan": intent.reply, "explanation": "Answered locally.", "schedule": None}
+
+    cache = get_query_cache()
+    cached, hit = cache.get(user_query), "exact"
+    if cached is None:
+        # Step 1: Get relevant docs (BM25 + vector hybrid)
+        yield "status", {"stage": "retrieving"}
+        vector = gemini_embed(user_query)
+        cached, hit = cache.get_similar(vector), "semantic"
+    if cached is not None:
+        if cached.get("plan"):
+            yield "plan", cached["plan"]
+        return {**cached, "cache": hit}
+    chunks = get_retriever().retrieve(user_query, vector=vector, top_k=settings.RETRIEVAL_TOP_K)
+    context = build_context(chunks)
+
+    # Step 2: knowledge questions go to the fast model; scheduling (and anything the
+    # local router is unsure about) to the pro model and, if needed, the solver.
+    if intent.name in KNOWLEDGE_INTENTS:
+        result = yield from _answer(user_query, intent.name, context, stream)
+    else:
+        result = yield from _plan(user_query, context, stream)
+
+    # Schedules depend on the exact quantities and dates in the query, so they are
+    # only reused for the same query text, never for merely similar ones.
+    if _cacheable(result):
+        cache.put(user_query, result, embedding=None if result["schedule"] else vector)
+    return result
+
+
+def _cacheable(result: dict) -> bool:
+    """
+    Only successful answers are cached: a feasible schedule, or a knowledge answer the
+    model returned as valid JSON. Extraction failures, infeasible or timed-out solves and
+    unparsable replies are retried on the next request instead of being served from cache.
+    """
+    if result.get("schedule") is not None:
+        return result["schedule"]["status"] in ("OPTIMAL", "FEASIBLE", "HEURISTIC")
+    return bool(result.get("intent")) and result["intent"] != "scheduling"
+
+
+def schedule_production_stream(user_query: str, stream: bool = True):
+    """
+    Run the pipeline as a sequence of (event, data) pairs:
+
+      status {"stage"}  retrieving → generating → solving → explaining
+      plan   StructuredPlan dict, as soon as the solver has a schedule
+      token  {"text"}   optimized_plan text as it is generated
+      done   the full result, identical to schedule_production()
+
+    Latency per intent and route is recorded in the shared metrics.
+    """
+    start = time.perf_counter()
+    intent = classify_intent(user_query) if settings.INTENT_ROUTER_ENABLED else Intent("unknown")
+    first_token = None
+    streamed = []
+    pipeline = _pipeline(user_query, stream, intent)
+    while True:
+        try:
+            event, data = next(pipeline)
+        except StopIteration as stop:
+            result = stop.value
+            break
+        if event == "token":
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            streamed.append(data["text"])
+        yield event, data
+    # Whatever the plan text has beyond what was streamed (cache hits, fallbacks)
+    streamed = "".join(streamed)
+    if result["optimized_plan"].startswith(streamed) and len(result["optimized_plan"]) > len(streamed):
+        yield "token", {"text": result["optimized_plan"][len(streamed):]}
+
+    result = {**result, "intent": result.get("intent") or intent.name, "route": "cache" if result.get("cache") else intent.route}
+    labels = {"intent": result["intent"], "route": result["route"]}
+    metrics = get_metrics()
+    metrics.observe("schedule_seconds", time.perf_counter() - start, **labels)
+    metrics.observe("schedule_first_token_seconds", first_token if first_token is not None else time.perf_counter() - start, **labels)
+    yield "done", result
+
+
+def schedule_production(user_query: str):
+    for event, data in schedule_production_stream(user_query, stream=False):
+        if event == "done":
+            return data
+
+
+async def schedule_production_async(user_query: str):
+    """Run the blocking embed → retrieve → Gemini pipeline on the worker pool so the event loop stays free"""
+    return await run_in_threadpool(schedule_production, user_query)
@@ -0,0 +1,211 @@
+import json
+import math
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from ..core.config import settings
+
+
+class VectorStore:
+    """
+    Minimal interface the scheduler needs from a vector index.
+    query() returns {"matches": [{"id", "score", "metadata"}, ...]} best first.
+    """
+
+    def upsert(self, vectors):
+        raise NotImplementedError
+
+    def query(self, vector, top_k: int = 5):
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist buffered writes (no-op for remote stores)"""
+
+
+class PineconeVectorStore(VectorStore):
+    def __init__(self):
+        from .clients import get_pinecone_index
+        self._index = get_pinecone_index
+
+    def upsert(self, vectors):
+        self._index().upsert(vectors=vectors)
+
+    def query(self, vector, top_k: int = 5):
+        results = self._index().query(vector=vector, top_k=top_k, include_metadata=True)
+        return {"matches": [
+            {"id": m["id"], "score": m["score"], "metadata": m.get("metadata") or {}}
+            for m in (results.get("matches") or [])
+        ]}
+
+    def delete(self, ids):
+        self._index().delete(ids=list(ids))
+
+    def count(self) -> int:
+        return self._index().describe_index_stats().get("total_vector_count", 0)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process cosine index: a float32 matrix of unit vectors, persisted as
+    vectors.npy (memory-mapped on load) plus ids/metadata in meta.json.
+
+    search="flat" scores every vector; search="ivf" clusters vectors with
+    k-means into ~sqrt(N) lists and only scores the `nprobe` closest lists
+    (falls back to flat below `ivf_min_vectors`). Writes are kept in memory
+    until flush().
+    """
+
+    def __init__(self, directory: str = None, search: str = "flat", nprobe: int = 8, ivf_min_vectors: int = 5000):
+        if search not in ("flat", "ivf"):
+            raise ValueError(f"Unknown local vector search {search!r}; expected 'flat' or 'ivf'")
+        self.directory = directory
+        self.search = search
+        self.nprobe = nprobe
+        self.ivf_min_vectors = ivf_min_vectors
+        self._lock = threading.RLock()
+        self._ids, self._metadata = [], []
+        self._pos = {}
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._pending = []
+        self._ivf = None
+        self._dirty = False
+        if directory and os.path.exists(os.path.join(directory, "meta.json")):
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+            self._ids, self._metadata = meta["ids"], meta["metadata"]
+            self._pos = {vec_id: i for i, vec_id in enumerate(self._ids)}
+            self._vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+
+    @staticmethod
+    def _unit(values):
+        matrix = np.asarray(values, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def _matrix(self):
+        """All rows as one array; appended rows are buffered and stacked lazily."""
+        if self._pending:
+            self._vectors = np.vstack([self._vectors, *self._pending])
+            self._pending = []
+        return self._vectors
+
+    def upsert(self, vectors):
+        if not vectors:
+            return
+        with self._lock:
+            incoming = self._unit([v["values"] for v in vectors])
+            if not self._ids:
+                self._vectors = np.empty((0, incoming.shape[1]), dtype=np.float32)
+            if self._vectors.shape[1] != incoming.shape[1]:
+                raise ValueError(f"Vector dimension {incoming.shape[1]} does not match index dimension {self._vectors.shape[1]}")
+            new_rows = []
+            for v, row in zip(vectors, incoming):
+                pos = self._pos.get(v["id"])
+                if pos is None:
+                    self._pos[v["id"]] = len(self._ids)
+                    self._ids.append(v["id"])
+                    self._metadata.append(v.get("metadata") or {})
+                    new_rows.append(row)
+                else:
+                    matrix = self._matrix()
+                    if not matrix.flags.writeable:   # memory-mapped from disk
+                        self._vectors = matrix = np.array(matrix)
+                    matrix[pos] = row
+                    self._metadata[pos] = v.get("metadata") or {}
+            if new_rows:
+                self._pending.append(np.stack(new_rows))
+            self._ivf = None
+            self._dirty = True
+
+    def delete(self, ids):
+        with self._lock:
+            drop = {self._pos[i] for i in ids if i in self._pos}
+            if not drop:
+                return
+            keep = [i for i in range(len(self._ids)) if i not in drop]
+            self._vectors = self._matrix()[keep]
+            self._ids = [self._ids[i] for i in keep]
+            self._metadata = [self._metadata[i] for i in keep]
+            self._pos = {vec_id: i for i, vec_id in enumerate(self._ids)}
+            self._ivf = None
+            self._dirty = True
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def flush(self):
+        with self._lock:
+            if not (self._dirty and self.directory):
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = os.path.join(self.directory, "vectors.tmp.npy")
+            np.save(tmp, self._matrix())
+            with open(os.path.join(self.directory, "meta.tmp.json"), "w") as f:
+                json.dump({"ids": self._ids, "metadata": self._metadata}, f)
+            os.replace(tmp, os.path.join(self.directory, "vectors.npy"))
+            os.replace(os.path.join(self.directory, "meta.tmp.json"), os.path.join(self.directory, "meta.json"))
+            self._dirty = False
+
+    def _build_ivf(self, iterations: int = 10):
+        vectors = self._matrix()
+        n = len(vectors)
+        nlist = max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(0)
+        centroids = vectors[rng.choice(n, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, vectors)
+            filled = np.bincount(assign, minlength=nlist) > 0
+            centroids[filled] = self._unit(sums[filled])
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+        self._ivf = (centroids, [order[bounds[c]:bounds[c + 1]] for c in range(nlist)])
+
+    def query(self, vector, top_k: int = 5):
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return {"matches": []}
+            q = self._unit(vector)
+            if self.search == "ivf" and n >= self.ivf_min_vectors:
+                if self._ivf is None:
+                    self._build_ivf()
+                centroids, lists = self._ivf
+                probe = np.argsort(centroids @ q)[-self.nprobe:]
+                candidates = np.concatenate([lists[c] for c in probe])
+                scores = self._matrix()[candidates] @ q
+            else:
+                candidates = np.arange(n)
+                scores = self._matrix() @ q
+            k = min(top_k, len(candidates))
+            best = np.argpartition(scores, -k)[-k:]
+            best = best[np.argsort(scores[best])[::-1]]
+            return {"matches": [
+                {"id": self._ids[candidates[i]], "score": float(scores[i]), "metadata": self._metadata[candidates[i]]}
+                for i in best
+            ]}
+
+
+@lru_cache(maxsize=None)
+def get_vector_store() -> VectorStore:
+    """Backend selected by Settings.VECTOR_STORE ('pinecone' or 'local')"""
+    if settings.VECTOR_STORE == "local":
+        return LocalVectorStore(
+            settings.LOCAL_VECTOR_STORE_DIR,
+            search=settings.LOCAL_VECTOR_SEARCH,
+            nprobe=settings.LOCAL_VECTOR_NPROBE,
+        )
+    if settings.VECTOR_STORE == "pinecone":
+        return PineconeVectorStore()
+    raise ValueError(f"Unknown VECTOR_STORE {settings.VECTOR_STORE!r}; expected 'pinecone' or 'local'")
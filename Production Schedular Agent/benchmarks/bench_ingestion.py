@@ -0,0 +1,60 @@
+"""
+Benchmark the PDF ingestion pipeline against a local fake embedder.
+
+    python -m benchmarks.bench_ingestion --chunks 2000 --latency-ms 80
+
+Compares the old one-call-per-chunk path (batch size 1, one worker, one
+upsert) with the batched, concurrent pipeline and prints per-stage throughput.
+"""
+import argparse
+import json
+
+from app.services.ingestion import run_ingestion
+from benchmarks.fakes import FakeEmbedder, FakeIndex
+
+
+def synthetic_records(n: int):
+    for i in range(n):
+        text = f"Section {i}: machine M-{i % 40:03d} cutting line, changeover {i % 7} min, torque spec {i % 13} Nm."
+        yield f"bench__doc_{i}", text, {"Text": text}
+
+
+def run(label, chunks, batch_size, workers, upsert_batch_size, args):
+    embedder = FakeEmbedder(dimension=args.dimension, latency_ms=args.latency_ms, per_item_ms=args.per_item_ms)
+    index = FakeIndex(latency_ms=args.upsert_latency_ms)
+    stats = run_ingestion(
+        synthetic_records(chunks),
+        embed_batch=embedder.embed_batch,
+        upsert=index.upsert,
+        embed_batch_size=batch_size,
+        max_workers=workers,
+        upsert_batch_size=upsert_batch_size,
+    )
+    assert len(index.vectors) == chunks
+    result = {"label": label, "embed_calls": embedder.calls, "upsert_calls": index.calls, **stats.as_dict()}
+    print(json.dumps(result, indent=2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fixed latency per embed call")
+    parser.add_argument("--per-item-ms", type=float, default=0.5, help="extra latency per text in a batch")
+    parser.add_argument("--upsert-latency-ms", type=float, default=20.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--upsert-batch-size", type=int, default=100)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_baseline:
+        baseline = run("sequential", args.chunks, 1, 1, args.chunks, args)
+    pipelined = run("pipelined", args.chunks, args.batch_size, args.workers, args.upsert_batch_size, args)
+    if not args.skip_baseline:
+        print(f"speedup: {baseline['wall_seconds'] / pipelined['wall_seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
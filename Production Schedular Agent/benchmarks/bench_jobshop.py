@@ -0,0 +1,101 @@
+"""
+Synthetic job-shop benchmark for the CP-SAT scheduling engine.
+
+    python -m benchmarks.bench_jobshop                      # default suite
+    python -m benchmarks.bench_jobshop --sizes 300x10 --time-limit 30 --output results.jsonl
+
+Each size is JOBSxOPS (operations per job). Instances are generated from a
+fixed seed so solve time and makespan are comparable between runs; append
+results to a JSONL file with --output to track them over time.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+from app.services.optimizer import Machine, Operation, Order, Problem, Shift, solve
+
+DEFAULT_SIZES = ["10x5", "50x8", "200x10", "500x10"]
+
+
+def synthetic_problem(jobs: int, ops_per_job: int, machines: int = 10, flexibility: int = 2,
+                      shifts_per_day: int = 2, seed: int = 0) -> Problem:
+    """Flexible job shop: each operation may run on `flexibility` machines of its stage."""
+    rng = random.Random(seed)
+    machine_ids = [f"M{m:02d}" for m in range(machines)]
+    pool = [Machine(id=m, capacity=2 if i % 5 == 0 else 1) for i, m in enumerate(machine_ids)]
+
+    orders, total = [], 0
+    for j in range(jobs):
+        ops = []
+        for k in range(ops_per_job):
+            duration = rng.randint(10, 90)
+            total += duration
+            ops.append(Operation(id=f"op{k}", duration=duration, machines=rng.sample(machine_ids, flexibility)))
+        orders.append(Order(id=f"J{j:04d}", operations=ops, release=rng.randint(0, 240), priority=rng.randint(1, 3)))
+
+    # Enough two-shift days (8h shifts with a 1h changeover) to fit the load comfortably.
+    days = max(1, int(2.5 * total / (machines * shifts_per_day * 480)) + 1)
+    shifts = [
+        Shift(name=f"D{d}S{s}", start=d * 1440 + s * 540, end=d * 1440 + s * 540 + 480)
+        for d in range(days) for s in range(shifts_per_day)
+    ]
+    horizon = shifts[-1].end
+    # Due dates spread over the first ~60% of the horizon so tardiness is possible but avoidable.
+    for order in orders:
+        work = sum(op.duration for op in order.operations)
+        order.due = min(horizon, order.release + 3 * work + rng.randint(0, int(0.6 * horizon)))
+    return Problem(orders=orders, machines=pool, shifts=shifts, horizon=horizon)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--machines", type=int, default=10)
+    parser.add_argument("--flexibility", type=int, default=2)
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="append one JSON line per instance to this file")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    print(f"{'instance':>10} {'ops':>6} {'status':>9} {'solve_s':>8} {'makespan':>9} {'tardiness':>10} {'gap%':>6}")
+    for size in args.sizes:
+        jobs, ops = (int(x) for x in size.lower().split("x"))
+        problem = synthetic_problem(jobs, ops, args.machines, args.flexibility, seed=args.seed)
+        t0 = time.perf_counter()
+        solution = solve(problem, time_limit=args.time_limit, num_workers=args.workers)
+        wall = time.perf_counter() - t0
+
+        gap = None
+        if solution.objective:
+            gap = round(100 * (solution.objective - solution.best_bound) / solution.objective, 2)
+        print(f"{size:>10} {jobs * ops:>6} {solution.status:>9} {solution.solve_seconds:>8.2f} "
+              f"{str(solution.makespan):>9} {str(solution.total_tardiness):>10} {str(gap):>6}")
+
+        if args.output:
+            record = {
+                "instance": size, "operations": jobs * ops, "machines": args.machines, "seed": args.seed,
+                "time_limit": args.time_limit, "workers": args.workers, "status": solution.status,
+                "solve_seconds": solution.solve_seconds, "wall_seconds": round(wall, 4),
+                "makespan": solution.makespan, "total_tardiness": solution.total_tardiness,
+                "objective": solution.objective, "best_bound": solution.best_bound, "gap_pct": gap,
+                "commit": commit, "python": platform.python_version(), "timestamp": time.time(),
+            }
+            with open(args.output, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Replanning latency: full solve vs. incremental re-solve after delta events.
+
+    python -m benchmarks.bench_replan --size 500x10 --time-limit 10 --resolve-time-limit 3
+
+Solves a synthetic plant once, then applies a machine outage, a rush order
+and an operator absence through ScheduleStore and reports how long each
+re-plan took and how many operations had to move.
+"""
+import argparse
+import os
+import time
+from dataclasses import asdict
+
+# Settings require a Gemini key at import time; the benchmark itself runs offline.
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.core.config import settings
+from app.services.schedule_store import ScheduleStore
+from benchmarks.bench_jobshop import synthetic_problem
+
+
+def _moved(before, after):
+    placed = {(op["order_id"], op["operation_id"]): (op["machine_id"], op["start"]) for op in before["operations"]}
+    return sum(1 for op in after["operations"]
+               if placed.get((op["order_id"], op["operation_id"])) not in (None, (op["machine_id"], op["start"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="300x10")
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--resolve-time-limit", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    settings.SOLVER_TIME_LIMIT_SECONDS = args.time_limit
+    settings.RESOLVE_TIME_LIMIT_SECONDS = args.resolve_time_limit
+    settings.SOLVER_NUM_WORKERS = args.workers
+
+    jobs, ops = (int(x) for x in args.size.lower().split("x"))
+    problem = asdict(synthetic_problem(jobs, ops))
+    store = ScheduleStore()
+
+    t0 = time.perf_counter()
+    plan = store.solve("bench", problem)
+    print(f"full solve      {time.perf_counter() - t0:7.2f}s  status={plan['status']} makespan={plan['makespan']}")
+
+    first_shift = problem["shifts"][0]
+    events = [
+        {"type": "machine_outage", "machine": "M03", "start": first_shift["start"] + 120, "end": first_shift["end"] + 600},
+        {"type": "add_order", "order": {
+            "id": "RUSH-1", "release": 60, "due": 1440, "priority": 3,
+            "operations": [{"id": "cut", "duration": 45, "machines": ["M01", "M02"]},
+                           {"id": "sew", "duration": 90, "machines": ["M04", "M05"]}]}},
+        {"type": "operator_absence", "machines": ["M00"], "slots": 1, "start": 0, "end": 2880},
+    ]
+    for event in events:
+        before = plan
+        t0 = time.perf_counter()
+        plan = store.apply_event("bench", event)
+        replan = plan["replan"]
+        print(f"{event['type']:<16}{time.perf_counter() - t0:7.2f}s  mode={replan['mode']} "
+              f"affected={replan['affected_operations']} fixed={replan['fixed_operations']} "
+              f"moved={_moved(before, plan)} makespan={plan['makespan']} tardiness={plan['total_tardiness']}")
+
+
+if __name__ == "__main__":
+    main()
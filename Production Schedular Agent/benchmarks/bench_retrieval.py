@@ -0,0 +1,101 @@
+"""
+Benchmark scheduler retrieval on the fixture corpus: BM25 only, vector only
+and the fused hybrid, with and without near-duplicate removal.
+
+    python -m benchmarks.bench_retrieval --top-k 5
+    python -m benchmarks.bench_retrieval --gemini   # real embeddings (needs GOOGLE_API_KEY)
+
+Reports recall@k and MRR against the labelled queries, retrieval latency
+percentiles (embeddings are computed up front, so this is local search time
+only), duplicate chunks returned per query and context tokens used.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+# Settings require a Gemini key at import time; only --gemini calls the API.
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.services.keyword_index import BM25Index
+from app.services.retrieval import Retriever, estimate_tokens
+from app.services.vector_store import LocalVectorStore
+from benchmarks.fakes import HashingEmbedder
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "retrieval_corpus.json")
+
+
+def evaluate(label, retriever, queries, vectors, canonical, top_k):
+    latencies, recalls, reciprocal_ranks, duplicates, tokens = [], [], [], [], []
+    for q, vector in zip(queries, vectors):
+        t0 = time.perf_counter()
+        chunks = retriever.retrieve(q["query"], vector=vector, top_k=top_k)
+        latencies.append(time.perf_counter() - t0)
+        found = [canonical[c["id"]] for c in chunks]
+        relevant = set(q["relevant"])
+        recalls.append(len(relevant & set(found)) / len(relevant))
+        first = next((rank for rank, cid in enumerate(found, start=1) if cid in relevant), None)
+        reciprocal_ranks.append(1 / first if first else 0.0)
+        duplicates.append(len(found) - len(set(found)))
+        tokens.append(sum(estimate_tokens(c["text"]) for c in chunks))
+    ms = np.array(latencies) * 1000
+    return {
+        "label": label,
+        f"recall_at_{top_k}": round(float(np.mean(recalls)), 4),
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "duplicates_per_query": round(float(np.mean(duplicates)), 3),
+        "context_tokens_avg": round(float(np.mean(tokens)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--token-budget", type=int, default=1500)
+    parser.add_argument("--gemini", action="store_true", help="embed with Gemini instead of the offline hashing embedder")
+    args = parser.parse_args()
+
+    with open(args.fixture) as f:
+        fixture = json.load(f)
+    chunks, queries = fixture["chunks"], fixture["queries"]
+    canonical = {c["id"]: c.get("duplicate_of", c["id"]) for c in chunks}
+
+    if args.gemini:
+        from app.services.pinecone_store import gemini_embed, gemini_embed_batch
+        embed_batch, embed = gemini_embed_batch, gemini_embed
+    else:
+        embedder = HashingEmbedder()
+        embed_batch, embed = embedder.embed_batch, embedder.embed
+
+    store, keywords, empty = LocalVectorStore(), BM25Index(), BM25Index()
+    values = embed_batch([c["text"] for c in chunks])
+    store.upsert([
+        {"id": c["id"], "values": v, "metadata": {"text": c["text"], "Source": c["source"], "Page": c["page"]}}
+        for c, v in zip(chunks, values)
+    ])
+    keywords.add((c["id"], {"text": c["text"], "Source": c["source"], "Page": c["page"]}) for c in chunks)
+    query_vectors = [embed(q["query"]) for q in queries]
+    no_vectors = [None] * len(queries)
+
+    def retriever(keyword_index, dedupe=0.85):
+        return Retriever(store, keyword_index, candidates=args.candidates,
+                         dedupe_similarity=dedupe, token_budget=args.token_budget)
+
+    results = [
+        evaluate("bm25", retriever(keywords), queries, no_vectors, canonical, args.top_k),
+        evaluate("vector", retriever(empty), queries, query_vectors, canonical, args.top_k),
+        evaluate("hybrid_no_dedupe", retriever(keywords, dedupe=1.01), queries, query_vectors, canonical, args.top_k),
+        evaluate("hybrid", retriever(keywords), queries, query_vectors, canonical, args.top_k),
+    ]
+    print(json.dumps({"chunks": len(chunks), "queries": len(queries),
+                      "embedder": "gemini" if args.gemini else "hashing", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Load test for the scheduler API with local stand-ins for Gemini and the
+vector store, so runs are repeatable and cost nothing.
+
+    python -m benchmarks.bench_service                                   # both scenarios
+    python -m benchmarks.bench_service --scenario schedule --requests 200 --concurrency 16 --stream
+    python -m benchmarks.bench_service --output results.jsonl --baseline baseline.json --max-regression 0.2
+
+The app runs in-process under uvicorn on a free local port and is driven
+over real HTTP by `--concurrency` client threads:
+
+  upload    POST /api/upload-pdf with synthetic PDFs, then poll /api/jobs/{id}
+            until the job finishes (job latency and chunks per second)
+  schedule  POST /api/schedule with a mix of greetings, knowledge questions and
+            scheduling requests; every query is unique so the answer cache
+            does not hide the pipeline. With --stream, time to first token is
+            measured on the SSE stream.
+
+Backend latencies (embedding, time to first generated token, per-chunk
+delay, vector store round-trip) are flags, so a run isolates the service's
+own overhead and concurrency behaviour. Reports p50/p95/p99 latency,
+throughput and process memory as JSON; --output appends it to a JSONL file
+with the git commit, and --baseline fails the run when p95 regresses by
+more than --max-regression.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fakes import install_fakes, make_pdf
+
+GREETINGS = ["hi", "hello there", "good morning", "thanks", "what can you do"]
+KNOWLEDGE = [
+    "What maintenance does machine {m} need after {n} hours?",
+    "Which safety gloves are required on the cutting line {n}?",
+    "What are the process steps for laminating batch {n}?",
+    "How do I reduce changeover time on press {m}?",
+]
+SCHEDULING = [
+    "Schedule {n} units of PO-{n} for Friday across the sewing machines",
+    "Plan production for orders PO-{n} and PO-{k} due tomorrow on two shifts",
+]
+WORDS = ("machine", "cutting", "sewing", "laminating", "printing", "safety", "maintenance", "operator", "shift",
+         "fabric", "inspection", "tension", "blade", "guard", "changeover", "quality", "batch", "handle")
+
+
+def _git(*args):
+    try:
+        return subprocess.check_output(["git", *args], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memory():
+    """Current and peak resident set size of this process (server and clients share it), in MB"""
+    current = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"rss_mb": current, "peak_rss_mb": round(peak, 1)}
+
+
+def _percentiles(seconds):
+    if not seconds:
+        return {}
+    ms = np.array(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def make_queries(count: int, seed: int = 0, mix=(0.2, 0.4, 0.4)):
+    """`count` unique queries: greetings / knowledge / scheduling in the `mix` proportions"""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        r = rng.random()
+        n, m, k = rng.randint(100, 999), f"M-{rng.randint(1, 40)}", rng.randint(100, 999)
+        if r < mix[0]:
+            queries.append(("greeting", GREETINGS[i % len(GREETINGS)]))
+        elif r < mix[0] + mix[1]:
+            queries.append(("knowledge", rng.choice(KNOWLEDGE).format(n=n, m=m) + f" (#{i})"))
+        else:
+            queries.append(("scheduling", rng.choice(SCHEDULING).format(n=n, k=k) + f" (#{i})"))
+    return queries
+
+
+def make_documents(count: int, pages: int, seed: int = 0):
+    rng = random.Random(seed)
+    docs = []
+    for d in range(count):
+        texts = []
+        for p in range(pages):
+            lines = [" ".join(rng.choice(WORDS) for _ in range(12)) + f" M-{rng.randint(1, 40)}" for _ in range(40)]
+            texts.append(f"Document {d} page {p}\n" + "\n".join(lines))
+        docs.append(make_pdf(texts))
+    return docs
+
+
+class Client:
+    """One keep-alive HTTP connection per client thread"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=300)
+        return conn
+
+    def request(self, method: str, path: str, body: bytes = None, headers=None, on_first_byte=None):
+        conn = self._conn()
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            if on_first_byte is None:
+                return response.status, response.read()
+            chunks, first = [], None
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                if first is None and line.startswith(b"event: token"):
+                    first = time.perf_counter()
+                    on_first_byte(first)
+                chunks.append(line)
+            return response.status, b"".join(chunks)
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def run_schedule(client: Client, queries, concurrency: int, stream: bool):
+    latencies, first_tokens, by_kind, errors = [], [], {}, 0
+    lock = threading.Lock()
+
+    def one(item):
+        nonlocal errors
+        kind, query = item
+        body = json.dumps({"query": query, "stream": stream}).encode()
+        first = []
+        t0 = time.perf_counter()
+        try:
+            status, payload = client.request("POST", "/api/schedule", body, {"Content-Type": "application/json"},
+                                             on_first_byte=first.append if stream else None)
+            ok = status == 200 and (b"event: error" not in payload if stream else True)
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        with lock:
+            if not ok:
+                errors += 1
+                return
+            latencies.append(elapsed)
+            by_kind.setdefault(kind, []).append(elapsed)
+            if first:
+                first_tokens.append(first[0] - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, queries))
+    wall = time.perf_counter() - t0
+
+    result = {"requests": len(queries), "errors": errors, "wall_seconds": round(wall, 3),
+              "throughput_rps": round(len(latencies) / wall, 2), **_percentiles(latencies)}
+    if stream:
+        result["first_token"] = _percentiles(first_tokens)
+    result["by_kind"] = {kind: {"count": len(v), **_percentiles(v)} for kind, v in sorted(by_kind.items())}
+    return result
+
+
+def run_upload(client: Client, documents, concurrency: int, poll_interval: float = 0.05):
+    latencies, accept, chunks, errors = [], [], 0, 0
+    lock = threading.Lock()
+    boundary = uuid.uuid4().hex
+
+    def one(indexed):
+        nonlocal chunks, errors
+        i, pdf = indexed
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"bench-{i}.pdf\"\r\n"
+                f"Content-Type: application/pdf\r\n\r\n").encode() + pdf + f"\r\n--{boundary}--\r\n".encode()
+        t0 = time.perf_counter()
+        try:
+            status, payload = client.request("POST", "/api/upload-pdf", body,
+                                             {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+            accepted = time.perf_counter() - t0
+            job_id = json.loads(payload)["details"]["job_id"]
+            while True:
+                status, payload = client.request("GET", f"/api/jobs/{job_id}")
+                job = json.loads(payload)
+                if job["status"] in ("succeeded", "failed"):
+                    break
+                time.sleep(poll_interval)
+            ok = job["status"] == "succeeded"
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        with lock:
+            if not ok:
+                errors += 1
+                return
+            accept.append(accepted)
+            latencies.append(elapsed)
+            chunks += job["chunks_embedded"]
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, enumerate(documents)))
+    wall = time.perf_counter() - t0
+    return {"documents": len(documents), "errors": errors, "wall_seconds": round(wall, 3),
+            "chunks_embedded": chunks, "chunks_per_second": round(chunks / wall, 1),
+            "accept": _percentiles(accept), **_percentiles(latencies)}
+
+
+def start_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def check_regression(report, baseline_path: str, max_regression: float):
+    """Scenario p95 latencies that are more than `max_regression` (a fraction) slower than the baseline"""
+    with open(baseline_path) as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    baseline = json.loads(lines[-1])   # a single report or the last line of a JSONL history
+    failures = []
+    for scenario, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario, {}).get("p95_ms")
+        after = result.get("p95_ms")
+        if before and after and after > before * (1 + max_regression):
+            failures.append(f"{scenario}: p95 {after} ms vs baseline {before} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["upload", "schedule", "all"], default="all")
+    parser.add_argument("--requests", type=int, default=100, help="schedule requests")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stream", action="store_true", help="use SSE and measure time to first token")
+    parser.add_argument("--documents", type=int, default=8, help="PDFs to upload")
+    parser.add_argument("--pages", type=int, default=5, help="pages per PDF")
+    parser.add_argument("--embed-ms", type=float, default=50.0, help="latency per embedding call")
+    parser.add_argument("--generate-ms", type=float, default=300.0, help="latency to the first generated chunk")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="latency per generated chunk")
+    parser.add_argument("--vector-ms", type=float, default=5.0, help="latency per vector store query/upsert")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="append the report to this JSONL file")
+    parser.add_argument("--baseline", help="report or JSONL history to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench-service-")
+    install_fakes(data_dir, embed_latency_ms=args.embed_ms, generate_latency_ms=args.generate_ms,
+                  token_ms=args.token_ms, vector_latency_ms=args.vector_ms)
+    port = _free_port()
+    server, thread = start_server(port)
+    client = Client(port)
+
+    scenarios = {}
+    try:
+        # Uploads first so schedule requests retrieve from a populated store.
+        if args.scenario in ("upload", "all"):
+            scenarios["upload"] = run_upload(client, make_documents(args.documents, args.pages, args.seed),
+                                             args.concurrency)
+        if args.scenario in ("schedule", "all"):
+            scenarios["schedule"] = run_schedule(client, make_queries(args.requests, args.seed),
+                                                 args.concurrency, args.stream)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    report = {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "max_regression")},
+        "scenarios": scenarios,
+        "memory": _memory(),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(report) + "\n")
+    if args.baseline:
+        failures = check_regression(report, args.baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
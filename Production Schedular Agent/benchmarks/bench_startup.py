@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark for the FastAPI app.
+
+    python -m benchmarks.bench_startup --runs 5 --budget-seconds 1.5
+
+Each run is a fresh interpreter that imports app.main and runs the lifespan
+startup (TestClient context), the same work uvicorn does before it accepts
+traffic. Exits non-zero if the median exceeds the budget or if a heavy client
+library was imported during startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ("langchain", "langchain_community", "ortools", "pinecone", "google.generativeai")
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app):
+    t2 = time.perf_counter()
+print(json.dumps({
+    "import_seconds": t1 - t0,
+    "lifespan_seconds": t2 - t1,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-seconds", type=float, default=1.5, help="max median import + lifespan time")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as data:
+        env = {
+            **os.environ,
+            "JOBS_DB_PATH": os.path.join(data, "jobs.db"),
+            "JOB_UPLOAD_DIR": os.path.join(data, "uploads"),
+            "WARM_CLIENTS_ON_STARTUP": "false",
+        }
+        env.setdefault("GOOGLE_API_KEY", "benchmark")
+        runs = []
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, "-c", CHILD], cwd=root, env=env,
+                                 capture_output=True, text=True, check=True)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    totals = [r["import_seconds"] + r["lifespan_seconds"] for r in runs]
+    heavy = sorted({m for r in runs for m in r["heavy_modules"]})
+    report = {
+        "runs": args.runs,
+        "import_seconds_median": round(statistics.median(r["import_seconds"] for r in runs), 4),
+        "lifespan_seconds_median": round(statistics.median(r["lifespan_seconds"] for r in runs), 4),
+        "total_seconds_median": round(statistics.median(totals), 4),
+        "total_seconds_max": round(max(totals), 4),
+        "budget_seconds": args.budget_seconds,
+        "heavy_modules_at_startup": heavy,
+    }
+    print(json.dumps(report, indent=2))
+
+    if heavy:
+        sys.exit(f"Heavy modules imported at startup: {', '.join(heavy)}")
+    if report["total_seconds_median"] > args.budget_seconds:
+        sys.exit(f"Cold start {report['total_seconds_median']}s exceeds budget {args.budget_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark the local vector store: exact (flat) vs approximate (IVF) search.
+
+    python -m benchmarks.bench_vector_store --vectors 50000 --queries 200
+
+Vectors are drawn around random topic centres, like real document embeddings.
+Reports upsert / persist / reload time, query latency percentiles and the
+recall@k of IVF against the exact flat results.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Settings require a Gemini key at import time; the benchmark itself runs offline.
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.services.vector_store import LocalVectorStore
+
+
+def clustered(n: int, dimension: int, topics: int, rng):
+    centres = rng.standard_normal((topics, dimension)).astype(np.float32)
+    labels = rng.integers(0, topics, n)
+    return centres[labels] + 0.6 * rng.standard_normal((n, dimension)).astype(np.float32)
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {f"p{p}_ms": round(float(np.percentile(ms, p)), 3) for p in (50, 95, 99)}
+
+
+def timed_queries(store, queries, top_k):
+    latencies, results = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        matches = store.query(q, top_k=top_k)["matches"]
+        latencies.append(time.perf_counter() - t0)
+        results.append({m["id"] for m in matches})
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--upsert-batch-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = clustered(args.vectors, args.dimension, args.topics, rng)
+    queries = clustered(args.queries, args.dimension, args.topics, rng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = LocalVectorStore(directory)
+        t0 = time.perf_counter()
+        for start in range(0, args.vectors, args.upsert_batch_size):
+            store.upsert([
+                {"id": f"vec_{i}", "values": data[i], "metadata": {"text": f"chunk {i}"}}
+                for i in range(start, min(start + args.upsert_batch_size, args.vectors))
+            ])
+        upsert_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        store.flush()
+        flush_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        flat = LocalVectorStore(directory, search="flat")
+        load_seconds = time.perf_counter() - t0
+        flat_latency, exact = timed_queries(flat, queries, args.top_k)
+
+        ivf = LocalVectorStore(directory, search="ivf", nprobe=args.nprobe, ivf_min_vectors=0)
+        t0 = time.perf_counter()
+        ivf.query(queries[0], top_k=args.top_k)   # first query trains the IVF lists
+        train_seconds = time.perf_counter() - t0
+        ivf_latency, approx = timed_queries(ivf, queries, args.top_k)
+
+    recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+    print(json.dumps({
+        "vectors": args.vectors,
+        "dimension": args.dimension,
+        "upsert_seconds": round(upsert_seconds, 3),
+        "flush_seconds": round(flush_seconds, 3),
+        "load_seconds": round(load_seconds, 4),
+        "flat": percentiles(flat_latency),
+        "ivf": {**percentiles(ivf_latency), "train_seconds": round(train_seconds, 3),
+                "nprobe": args.nprobe, f"recall_at_{args.top_k}": round(float(recall), 4)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
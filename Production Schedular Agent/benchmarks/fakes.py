@@ -0,0 +1,217 @@
+"""Deterministic local stand-ins for Gemini and Pinecone, used by the benchmarks."""
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+
+class FakeEmbedder:
+    """Returns stable pseudo-random unit vectors after a simulated network delay."""
+
+    def __init__(self, dimension: int = 768, latency_ms: float = 50.0, per_item_ms: float = 0.5):
+        self.dimension = dimension
+        self.latency_ms = latency_ms
+        self.per_item_ms = per_item_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str):
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        values = [(seed[i % len(seed)] + i) % 251 - 125 for i in range(self.dimension)]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def embed_batch(self, texts):
+        with self._lock:
+            self.calls += 1
+        time.sleep((self.latency_ms + self.per_item_ms * len(texts)) / 1000)
+        return [self._vector(t) for t in texts]
+
+    def embed(self, text: str):
+        return self.embed_batch([text])[0]
+
+
+class FakeIndex:
+    """Collects upserted vectors in memory after a simulated network delay."""
+
+    def __init__(self, latency_ms: float = 20.0):
+        self.latency_ms = latency_ms
+        self.vectors = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors):
+        time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self.calls += 1
+            for v in vectors:
+                self.vectors[v["id"]] = v
+
+
+class HashingEmbedder:
+    """
+    Offline embedding with some lexical semantics: hashed word and character
+    trigram features, unit-normalised. Good enough to exercise vector search
+    and fusion without a model.
+    """
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+
+    def embed(self, text: str):
+        values = [0.0] * self.dimension
+        words = text.lower().split()
+        grams = [w.strip(".,:;?!()") for w in words]
+        grams += [f"#{g[i:i + 3]}" for g in grams for i in range(max(1, len(g) - 2))]
+        for gram in grams:
+            digest = hashlib.md5(gram.encode("utf-8")).digest()
+            values[int.from_bytes(digest[:4], "little") % self.dimension] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def embed_batch(self, texts):
+        return [self.embed(t) for t in texts]
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerationModel:
+    """
+    Stands in for genai.GenerativeModel. Replies are chosen from the prompt:
+    JSON classification / problem extraction, a schedule explanation, or a
+    plain answer. `latency_ms` is the time to the first chunk and
+    `token_ms` the delay per streamed chunk (~4 words each).
+    """
+
+    def __init__(self, name: str = "fake", latency_ms: float = 300.0, token_ms: float = 20.0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+
+    @staticmethod
+    def _problem(seed: str):
+        rng = random.Random(seed)
+        machines = [{"id": f"M-{i + 1}", "capacity": rng.choice([1, 1, 2])} for i in range(4)]
+        orders = []
+        for o in range(rng.randint(3, 6)):
+            ops = [{"id": step, "duration": rng.randint(30, 120), "machines": rng.sample([m["id"] for m in machines], 2)}
+                   for step in ("cutting", "printing", "sewing")]
+            orders.append({"id": f"PO-{o + 1}", "due": rng.randint(300, 1200), "operations": ops})
+        shifts = [{"name": "Morning", "start": 0, "end": 480}, {"name": "Evening", "start": 480, "end": 960}]
+        return {"machines": machines, "shifts": shifts, "orders": orders}
+
+    def _reply(self, prompt: str) -> str:
+        query = prompt.split("User Query:")[-1].strip().splitlines()[0] if "User Query:" in prompt else prompt
+        if "Reply with ONE JSON" in prompt:
+            if re.search(r"schedul|plan", query, re.I):
+                return json.dumps({"intent": "scheduling", "answer": "", "problem": self._problem(query)})
+            return json.dumps({"intent": "general", "answer": f"Here is what the documents say about {query} " * 8})
+        if "constraint solver produced" in prompt:
+            return "- Orders are sequenced by due date on the least loaded machines.\n" * 6
+        return f"Answer about {query}: check the machine handbook and the maintenance plan. " * 6
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        text = self._reply(str(prompt))
+        words = text.split(" ")
+        chunks = [" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "") for i in range(0, len(words), 4)]
+        if not stream:
+            time.sleep((self.latency_ms + self.token_ms * len(chunks)) / 1000)
+            return _Chunk(text)
+
+        def iterate():
+            time.sleep(self.latency_ms / 1000)
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(self.token_ms / 1000)
+                yield _Chunk(chunk)
+        return iterate()
+
+
+class FakeGenAI:
+    """Stands in for the configured google.generativeai module (embed_content + GenerativeModel)."""
+
+    def __init__(self, embedder: FakeEmbedder, latency_ms: float = 300.0, token_ms: float = 20.0):
+        self.embedder = embedder
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+
+    def embed_content(self, model: str, content, **kwargs):
+        if isinstance(content, str):
+            return {"embedding": self.embedder.embed(content)}
+        return {"embedding": self.embedder.embed_batch(list(content))}
+
+    def GenerativeModel(self, model_name: str):
+        return FakeGenerationModel(model_name, self.latency_ms, self.token_ms)
+
+
+def make_pdf(pages) -> bytes:
+    """Minimal text-only PDF (one string per page, lines split on newlines) readable by pypdf."""
+    def escape(line):
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = " T* ".join(f"({escape(line)}) Tj" for line in text.splitlines())
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {lines} ET".encode("latin-1", "replace")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objects)} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + (body if isinstance(body, bytes) else body.encode()) + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def install_fakes(data_dir: str, embed_latency_ms: float = 50.0, generate_latency_ms: float = 300.0,
+                  token_ms: float = 20.0, vector_latency_ms: float = 5.0, embedding_cache: bool = False):
+    """
+    Point the scheduler app at local fakes: Gemini (embeddings + generation)
+    with the given latencies, and the local vector store with an added
+    per-call delay standing in for a network round-trip. Settings come from
+    the environment, so this must run before `app` is imported.
+    """
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ.update({
+        "VECTOR_STORE": "local",
+        "LOCAL_VECTOR_STORE_DIR": os.path.join(data_dir, "vectors"),
+        "KEYWORD_INDEX_PATH": os.path.join(data_dir, "keyword_index.json"),
+        "INDEX_MANIFEST_PATH": os.path.join(data_dir, "index_manifest.json"),
+        "JOBS_DB_PATH": os.path.join(data_dir, "jobs.db"),
+        "JOB_UPLOAD_DIR": os.path.join(data_dir, "uploads"),
+        "SCHEDULE_STORE_DIR": os.path.join(data_dir, "schedules"),
+        "EMBEDDING_CACHE_PATH": os.path.join(data_dir, "embedding_cache.sqlite3") if embedding_cache else "",
+        "EMBED_REQUESTS_PER_MINUTE": "1000000",
+        "EMBED_TOKENS_PER_MINUTE": "1000000000",
+    })
+    from app.services import clients, vector_store
+
+    genai = FakeGenAI(FakeEmbedder(latency_ms=embed_latency_ms), generate_latency_ms, token_ms)
+    clients.get_genai = lambda: genai
+
+    class RemoteLikeVectorStore(vector_store.LocalVectorStore):
+        def query(self, vector, top_k: int = 5):
+            time.sleep(vector_latency_ms / 1000)
+            return super().query(vector, top_k)
+
+        def upsert(self, vectors):
+            time.sleep(vector_latency_ms / 1000)
+            super().upsert(vectors)
+
+    vector_store.LocalVectorStore = RemoteLikeVectorStore
+    return genai
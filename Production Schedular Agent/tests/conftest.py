@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Settings requires the API key at import time; the tests never call Gemini.
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("SCHEDULE_STORE_DIR", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
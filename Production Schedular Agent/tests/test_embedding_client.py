@@ -0,0 +1,37 @@
+import types
+
+import pytest
+
+from app.core.config import settings
+from app.services import clients, embedding_client
+from shared.embedding_client import EmbeddingClient
+
+
+@pytest.fixture
+def calls(monkeypatch, tmp_path):
+    made = []
+
+    def embed_content(model, content):
+        made.append(list(content))
+        return {"embedding": [[float(len(text))] for text in content]}
+
+    monkeypatch.setattr(clients, "get_genai", lambda: types.SimpleNamespace(embed_content=embed_content))
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    embedding_client.get_embedding_client.cache_clear()
+    yield made
+    embedding_client.get_embedding_client.cache_clear()
+
+
+def test_app_client_is_the_shared_client(calls):
+    client = embedding_client.get_embedding_client()
+    assert isinstance(client, EmbeddingClient)
+    assert client.model == embedding_client.EMBEDDING_MODEL
+    assert client.batch_size == settings.EMBED_BATCH_SIZE
+
+
+def test_duplicates_and_cached_texts_are_embedded_once(calls):
+    client = embedding_client.get_embedding_client()
+    assert client.embed_documents(["ab", "abc", "ab"]) == [[2.0], [3.0], [2.0]]
+    assert client.embed_query("abc") == [3.0]
+    assert calls == [["ab", "abc"]]
+    assert client.stats["cache_hits"] == 1
@@ -0,0 +1,28 @@
+import pytest
+
+from app.services.intent import classify_intent
+
+
+@pytest.mark.parametrize("query", [
+    "hi", "Hello!", "how are you", "hello, how are you?", "Hey, how's it going?", "good morning",
+    "thanks!", "bye", "what can you do?",
+])
+def test_small_talk_takes_the_template_route(query):
+    intent = classify_intent(query)
+    assert intent.name == "greeting"
+    assert intent.route == "template"
+
+
+@pytest.mark.parametrize("query, name, route", [
+    ("hi, schedule 500 units of PO-12 by friday", "scheduling", "full"),
+    ("how do I set up the laminator machine for a changeover?", "machines", "fast"),
+    ("what PPE is needed near the press? any safety hazards?", "safety", "fast"),
+    ("what is the inspection procedure for stitching quality?", "processes", "fast"),
+])
+def test_domain_questions_are_not_small_talk(query, name, route):
+    intent = classify_intent(query)
+    assert (intent.name, intent.route) == (name, route)
+
+
+def test_unclear_query_goes_to_the_full_path():
+    assert classify_intent("tell me something interesting").route == "full"
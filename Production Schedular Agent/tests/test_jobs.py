@@ -0,0 +1,69 @@
+import threading
+import time
+
+from app.services.jobs import JobQueue
+
+
+def _wait(queue, job_id, status="succeeded", timeout=5):
+    deadline = time.monotonic() + timeout
+    while queue.get(job_id)["status"] != status:
+        assert time.monotonic() < deadline, queue.get(job_id)
+        time.sleep(0.01)
+
+
+def _upload(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF")
+    return str(path)
+
+
+def test_jobs_for_one_source_run_one_at_a_time_in_order(tmp_path):
+    release = threading.Event()
+    lock = threading.Lock()
+    running, events = set(), []
+
+    def handler(file_path, source, on_progress):
+        with lock:
+            assert source not in running, f"two jobs for {source} at once"
+            running.add(source)
+            events.append((source, file_path))
+        if file_path.endswith("first.pdf"):
+            release.wait(5)
+        with lock:
+            running.discard(source)
+        return {}
+
+    queue = JobQueue(str(tmp_path / "jobs.db"), handler, max_workers=2)
+    try:
+        first = queue.submit(_upload(tmp_path, "first.pdf"), "plan.pdf")["id"]
+        second = queue.submit(_upload(tmp_path, "second.pdf"), "plan.pdf")["id"]
+        other = queue.submit(_upload(tmp_path, "other.pdf"), "other.pdf")["id"]
+
+        _wait(queue, other)          # a different source is not held up
+        assert queue.get(second)["status"] == "queued"
+
+        release.set()
+        _wait(queue, first)
+        _wait(queue, second)
+        assert [name.rsplit("/", 1)[-1] for source, name in events if source == "plan.pdf"] == [
+            "first.pdf", "second.pdf"]
+    finally:
+        release.set()
+        queue.shutdown(wait=True)
+
+
+def test_failed_job_releases_its_source(tmp_path):
+    def handler(file_path, source, on_progress):
+        if file_path.endswith("bad.pdf"):
+            raise ValueError("unreadable")
+        return {"vectors_upserted": 3}
+
+    queue = JobQueue(str(tmp_path / "jobs.db"), handler, max_workers=2)
+    try:
+        bad = queue.submit(_upload(tmp_path, "bad.pdf"), "plan.pdf")["id"]
+        good = queue.submit(_upload(tmp_path, "good.pdf"), "plan.pdf")["id"]
+        _wait(queue, bad, "failed")
+        _wait(queue, good)
+        assert queue.get(good)["vectors_upserted"] == 3
+    finally:
+        queue.shutdown(wait=True)
@@ -0,0 +1,90 @@
+import types
+
+from app.services import pinecone_store
+from app.services.manifest import IndexManifest
+
+
+def test_retire_keeps_ids_claimed_by_a_running_job(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "manifest.json"))
+    manifest.replace("Y.pdf", {"c", "d"})
+    assert manifest.claim("X.pdf", "c")            # X skips c: Y already indexed it
+    assert not manifest.claim("X.pdf", "e")
+
+    deleted = []
+    assert manifest.retire("Y.pdf", set(), deleted.extend) == ["d"]
+    assert deleted == ["d"]                        # c is still needed by X
+
+    manifest.retire("X.pdf", {"c", "e"}, deleted.extend)
+    assert IndexManifest(manifest.path).source_ids("X.pdf") == {"c", "e"}
+    assert IndexManifest(manifest.path).source_ids("Y.pdf") == set()
+
+
+def test_released_claims_no_longer_protect_ids(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "manifest.json"))
+    manifest.replace("Y.pdf", {"c"})
+    manifest.claim("X.pdf", "c")
+    manifest.release("X.pdf")
+    assert manifest.stale_ids("Y.pdf", set()) == {"c"}
+
+
+class _Store:
+    def __init__(self):
+        self.vectors = {}
+
+    def upsert(self, vectors):
+        self.vectors.update((v["id"], v) for v in vectors)
+
+    def delete(self, ids):
+        for vec_id in ids:
+            self.vectors.pop(vec_id, None)
+
+    def flush(self):
+        pass
+
+
+class _Keywords:
+    def __init__(self):
+        self.docs = {}
+
+    def get(self, vec_id):
+        return self.docs.get(vec_id)
+
+    def add(self, docs):
+        self.docs.update(docs)
+
+    def remove(self, ids):
+        for vec_id in ids:
+            self.docs.pop(vec_id, None)
+
+    def flush(self):
+        pass
+
+
+def test_reupload_of_another_source_does_not_delete_a_skipped_chunk(tmp_path, monkeypatch):
+    manifest = IndexManifest(str(tmp_path / "manifest.json"))
+    store, keywords = _Store(), _Keywords()
+    monkeypatch.setattr(pinecone_store, "get_index_manifest", lambda: manifest)
+    monkeypatch.setattr(pinecone_store, "get_vector_store", lambda: store)
+    monkeypatch.setattr(pinecone_store, "get_keyword_index", lambda: keywords)
+    monkeypatch.setattr(pinecone_store, "get_query_cache", lambda: types.SimpleNamespace(invalidate=lambda: None))
+    monkeypatch.setattr(pinecone_store, "gemini_embed_batch", lambda texts: [[1.0, 0.0] for _ in texts])
+
+    documents = {"Y.pdf": ["shared chunk", "only in Y"]}
+
+    def chunks(file_path):
+        for text in documents[file_path]:
+            yield 1, text
+            if file_path == "X.pdf" and text == "shared chunk":
+                # Y is re-uploaded without the shared chunk while X is still running
+                documents["Y.pdf"] = ["only in Y"]
+                pinecone_store.store_pdf_to_pinecone("Y.pdf")
+
+    monkeypatch.setattr(pinecone_store, "iter_pdf_chunks", chunks)
+    pinecone_store.store_pdf_to_pinecone("Y.pdf")
+    documents["X.pdf"] = ["shared chunk", "only in X"]
+    result = pinecone_store.store_pdf_to_pinecone("X.pdf")
+
+    assert result["chunks_skipped"] == 1
+    shared = pinecone_store.chunk_id("AI Production Scheduler", "shared chunk")
+    assert shared in manifest.source_ids("X.pdf")
+    assert shared in store.vectors and keywords.get(shared) is not None
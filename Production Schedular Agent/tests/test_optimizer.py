@@ -0,0 +1,100 @@
+import pytest
+
+from app.services.optimizer import problem_from_dict, solve
+
+SHOP = {
+    "machines": [{"id": "CUT"}, {"id": "WELD"}, {"id": "PAINT", "capacity": 2}],
+    "orders": [
+        {"id": "O1", "due": 200, "operations": [
+            {"id": "cut", "duration": 60, "machines": ["CUT"]},
+            {"id": "weld", "duration": 90, "machines": ["WELD"]},
+            {"id": "paint", "duration": 30, "machines": ["PAINT"]},
+        ]},
+        {"id": "O2", "due": 150, "priority": 3, "operations": [
+            {"id": "cut", "duration": 40, "machines": ["CUT"]},
+            {"id": "paint", "duration": 50, "machines": ["PAINT"]},
+        ]},
+        {"id": "O3", "release": 30, "operations": [
+            {"id": "weld", "duration": 30, "machines": ["WELD", "CUT"]},
+            {"id": "paint", "duration": 50, "machines": ["PAINT"]},
+        ]},
+    ],
+}
+
+
+def check_schedule(problem, solution):
+    """Every operation once, on an eligible machine, in order, after release, within machine capacity."""
+    ops = {(op.order_id, op.operation_id): op for op in solution.operations}
+    capacity = {m.id: m.capacity for m in problem.machines}
+    for order in problem.orders:
+        previous_end = order.release
+        for spec in order.operations:
+            op = ops[(order.id, spec.id)]
+            assert op.machine_id in spec.machines
+            assert op.end - op.start == spec.duration
+            assert op.start >= previous_end
+            previous_end = op.end
+    for machine, slots in capacity.items():
+        runs = [op for op in solution.operations if op.machine_id == machine]
+        for t in {op.start for op in runs}:
+            assert sum(op.start <= t < op.end for op in runs) <= slots
+    assert solution.makespan == max(op.end for op in solution.operations)
+
+
+def test_solution_respects_precedence_eligibility_and_capacity():
+    problem = problem_from_dict(SHOP)
+    solution = solve(problem, time_limit=5, num_workers=1)
+    assert solution.status == "OPTIMAL"
+    check_schedule(problem, solution)
+    assert solution.late_orders == []
+
+
+def test_operations_stay_inside_shift_windows_and_avoid_downtime():
+    problem = problem_from_dict({
+        **SHOP,
+        "shifts": [{"name": "day", "start": 0, "end": 120}, {"name": "late", "start": 180, "end": 600}],
+        "downtimes": [{"machine": "WELD", "start": 0, "end": 200, "reason": "maintenance"}],
+    })
+    solution = solve(problem, time_limit=5, num_workers=1)
+    assert solution.feasible
+    check_schedule(problem, solution)
+    windows = {"day": (0, 120), "late": (180, 600)}
+    for op in solution.operations:
+        start, end = windows[op.shift]
+        assert start <= op.start and op.end <= end
+        if op.machine_id == "WELD":
+            assert op.start >= 200
+
+
+def test_late_orders_are_reported():
+    problem = problem_from_dict({**SHOP, "orders": [{**o, "due": 50} for o in SHOP["orders"]]})
+    solution = solve(problem, time_limit=5, num_workers=1)
+    assert solution.feasible
+    assert set(solution.late_orders) == {"O1", "O2", "O3"}
+    assert solution.total_tardiness > 0
+
+
+def test_time_limit_without_solution_falls_back_to_greedy_plan(monkeypatch):
+    from ortools.sat.python import cp_model
+
+    monkeypatch.setattr(cp_model.CpSolver, "Solve", lambda self, model, *args, **kwargs: cp_model.UNKNOWN)
+    problem = problem_from_dict(SHOP)
+    solution = solve(problem, time_limit=0.01, num_workers=1)
+    assert solution.status == "HEURISTIC"
+    check_schedule(problem, solution)
+
+
+def test_infeasible_problem_has_no_operations():
+    problem = problem_from_dict({**SHOP, "horizon": 100})
+    solution = solve(problem, time_limit=5, num_workers=1)
+    assert not solution.feasible and solution.operations == []
+
+
+@pytest.mark.parametrize("data", [
+    {"machines": [], "orders": SHOP["orders"]},
+    {"machines": SHOP["machines"], "orders": [{"id": "O1", "operations": [{"id": "x"}]}]},
+    {"machines": SHOP["machines"], "orders": [{"id": "O1", "operations": [{"duration": 5, "machines": ["MILL"]}]}]},
+])
+def test_malformed_problems_are_rejected(data):
+    with pytest.raises(ValueError):
+        problem_from_dict(data)
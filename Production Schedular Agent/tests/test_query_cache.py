@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from app.services import scheduler
+from app.services.query_cache import QueryCache
+
+
+class FakeRetriever:
+    def retrieve(self, query, vector=None, top_k=5):
+        return []
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """scheduler with a fresh cache and canned model replies (set `replies` per test)."""
+    cache = QueryCache(threshold=0.9)
+    replies = []
+    monkeypatch.setattr(scheduler, "get_query_cache", lambda: cache)
+    monkeypatch.setattr(scheduler, "gemini_embed", lambda text: [1.0, 0.0, 0.0])
+    monkeypatch.setattr(scheduler, "get_retriever", lambda: FakeRetriever())
+    monkeypatch.setattr(scheduler, "_generate", lambda prompt, stream, **kwargs: iter([replies.pop(0)]))
+    monkeypatch.setattr(scheduler.settings, "INTENT_ROUTER_ENABLED", False)
+    return cache, replies
+
+
+def test_exact_and_semantic_tiers():
+    cache = QueryCache(threshold=0.9)
+    assert cache.get("What is the SOP?") is None
+    cache.put("What is the SOP?", {"answer": 1}, embedding=[1.0, 0.0])
+    assert cache.get("what is the sop") == {"answer": 1}
+    assert cache.get_similar([0.99, 0.05]) == {"answer": 1}
+    assert cache.get_similar([0.0, 1.0]) is None
+    assert cache.stats() == {"entries": 1, "hits_exact": 1, "hits_semantic": 1, "misses_exact": 1, "misses": 1}
+
+
+def test_extraction_failure_is_not_cached(pipeline):
+    cache, replies = pipeline
+    broken = json.dumps({"intent": "scheduling", "answer": "", "problem": {"orders": []}})
+    replies.extend([broken, broken])
+    first = scheduler.schedule_production("schedule 500 totes by friday")
+    assert first["schedule"] is None and "could not extract" in first["optimized_plan"]
+    assert cache.stats()["entries"] == 0
+    second = scheduler.schedule_production("schedule 500 totes by friday")
+    assert second["route"] != "cache" and not replies
+
+
+def test_unparsable_reply_is_not_cached(pipeline):
+    cache, replies = pipeline
+    replies.append("not json at all")
+    scheduler.schedule_production("what does the laminator do")
+    assert cache.stats()["entries"] == 0
+
+
+def test_knowledge_answer_is_reused_for_similar_queries(pipeline):
+    cache, replies = pipeline
+    replies.append(json.dumps({"intent": "machines", "answer": "It laminates.", "problem": None}))
+    scheduler.schedule_production("what does the laminator do")
+    again = scheduler.schedule_production("what does the laminator do exactly")
+    assert again["route"] == "cache" and again["optimized_plan"] == "It laminates."
+    assert cache.stats()["hits_semantic"] == 1
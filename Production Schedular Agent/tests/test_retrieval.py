@@ -0,0 +1,77 @@
+from app.services.keyword_index import BM25Index, tokenize
+from app.services.retrieval import Retriever, build_context, reciprocal_rank_fusion
+from app.services.vector_store import LocalVectorStore
+
+CHUNKS = {
+    "c1": "Machine M-012 needs a 30 minute changeover between part PN-4471/B and PN-4472.",
+    "c2": "Night shift runs from 22:00 to 06:00 with two operators per line.",
+    "c3": "Preventive maintenance on the paint line is scheduled every Friday.",
+    "c4": "Changeover on the cutting machine takes 15 minutes for most parts.",
+}
+
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    assert tokenize("Machine M-012 runs PN-4471/B.") == [
+        "machine", "m-012", "m", "012", "runs", "pn-4471/b", "pn", "4471", "b"]
+
+
+def index(chunks=CHUNKS, path=None):
+    keywords = BM25Index(path)
+    keywords.add((chunk_id, {"text": text, "Source": "plant.pdf", "Page": 0}) for chunk_id, text in chunks.items())
+    return keywords
+
+
+def test_bm25_ranks_exact_identifier_first():
+    keywords = index()
+    assert keywords.search("PN-4471/B changeover", top_k=2)[0][0] == "c1"
+    assert keywords.search("changeover", top_k=5)[0][0] in ("c1", "c4")
+    assert keywords.search("unrelated words") == []
+
+
+def test_bm25_remove_update_and_persist(tmp_path):
+    path = str(tmp_path / "keywords.json")
+    keywords = index(path=path)
+    keywords.remove(["c1"])
+    keywords.add([("c4", {"text": "Night maintenance window for the cutting machine"})])
+    assert [chunk_id for chunk_id, _ in keywords.search("m-012 changeover")] == []
+    keywords.flush()
+    reloaded = BM25Index(path)
+    assert len(reloaded) == 3
+    assert {chunk_id for chunk_id, _ in reloaded.search("night")} == {"c2", "c4"}
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert list(fused)[0] == "b"
+    assert fused["b"] == 1 / 62 + 1 / 61
+    assert set(fused) == {"a", "b", "c", "d"}
+
+
+def retriever(chunks=CHUNKS, **options):
+    vectors = LocalVectorStore()
+    vectors.upsert([{"id": chunk_id, "values": [1.0, float(i)], "metadata": {"text": text, "Source": "plant.pdf", "Page": 0}}
+                    for i, (chunk_id, text) in enumerate(chunks.items())])
+    return Retriever(vectors, index(chunks), **options)
+
+
+def test_hybrid_retrieval_fuses_keyword_and_vector_hits():
+    chunks = retriever().retrieve("PN-4471/B changeover", vector=[1.0, 0.0], top_k=3)
+    assert chunks[0]["id"] == "c1" and chunks[0]["keyword_rank"] == 1
+    assert all(c["vector_rank"] is not None for c in chunks)
+    assert "[plant.pdf, page 1]\nMachine M-012" in build_context(chunks)
+
+
+def test_near_duplicates_are_dropped():
+    # the same paragraph from two revisions of a document
+    paragraph = f"{CHUNKS['c1']} {CHUNKS['c4']}"
+    revised = {"old": paragraph, "new": f"{paragraph} Confirmed.", "other": CHUNKS["c2"]}
+    ids = [c["id"] for c in retriever(revised).retrieve("PN-4471/B changeover night", top_k=3)]
+    assert sorted(ids) in (["new", "other"], ["old", "other"])
+
+
+def test_token_budget_skips_chunks_that_do_not_fit():
+    long_text = "changeover " * 200
+    chunks = {"long": long_text, **CHUNKS}
+    selected = retriever(chunks, token_budget=60).retrieve("changeover", top_k=5)
+    assert "long" not in [c["id"] for c in selected]
+    assert selected and sum(len(c["text"]) // 4 for c in selected) <= 60
@@ -0,0 +1,63 @@
+from app.services.optimizer import problem_from_dict
+from app.services.schedule_store import ScheduleStore
+
+TWO_MACHINES = {
+    "machines": [{"id": "A"}, {"id": "B"}],
+    "orders": [{"id": "O1", "operations": [
+        {"id": "x", "duration": 100, "machines": ["A"]},
+        {"id": "y", "duration": 100, "machines": ["B"]},
+    ]}],
+}
+
+
+def placements(result):
+    return {(op["order_id"], op["operation_id"]): (op["machine_id"], op["start"]) for op in result["operations"]}
+
+
+def test_added_order_starts_no_earlier_than_now():
+    store = ScheduleStore()
+    store.solve("p", TWO_MACHINES)
+    result = store.apply_event("p", {
+        "type": "add_order", "now": 300,
+        "order": {"id": "RUSH", "operations": [{"id": "r", "duration": 50, "machines": ["B"]}]},
+    })
+    ops = placements(result)
+    assert result["replan"]["mode"] == "incremental"
+    assert ops[("RUSH", "r")][1] >= 300
+    assert ops[("O1", "x")] == ("A", 0)
+    assert ops[("O1", "y")] == ("B", 100)
+
+
+def test_outage_over_running_operation_keeps_plan():
+    store = ScheduleStore()
+    store.solve("p", TWO_MACHINES)
+    result = store.apply_event("p", {"type": "machine_outage", "machine": "A", "start": 50, "end": 400, "now": 60})
+    assert result["replan"]["mode"] == "incremental"
+    assert placements(result) == {("O1", "x"): ("A", 0), ("O1", "y"): ("B", 100)}
+
+
+def test_infeasible_incremental_replans_only_unstarted_operations():
+    problem = problem_from_dict({
+        "machines": [{"id": "A"}, {"id": "B"}],
+        "horizon": 300,
+        "orders": [
+            {"id": "O1", "operations": [{"id": "a", "duration": 100, "machines": ["A"]}]},
+            {"id": "O2", "operations": [{"id": "b", "duration": 100, "machines": ["A", "B"]}]},
+            {"id": "O3", "operations": [{"id": "c", "duration": 100, "machines": ["A"]}]},
+        ],
+    })
+    plan = {"operations": [
+        {"order_id": "O1", "operation_id": "a", "machine_id": "A", "start": 0},
+        {"order_id": "O2", "operation_id": "b", "machine_id": "A", "start": 100},
+        {"order_id": "O3", "operation_id": "c", "machine_id": "A", "start": 200},
+    ]}
+    store = ScheduleStore()
+    store._save("p", problem, plan)
+    # c has to leave A, but b (unaffected) holds the only free slot: the incremental model is infeasible.
+    result = store.apply_event("p", {"type": "machine_outage", "machine": "A", "start": 200, "end": 300, "now": 50})
+    ops = placements(result)
+    assert result["replan"]["mode"] == "unstarted"
+    assert result["replan"]["fixed_operations"] == 1
+    assert ops[("O1", "a")] == ("A", 0)
+    assert ops[("O2", "b")][0] == "B" and ops[("O2", "b")][1] >= 50
+    assert ops[("O3", "c")] == ("A", 100)
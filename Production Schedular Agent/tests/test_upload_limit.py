@@ -0,0 +1,51 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.upload_limit import UploadSizeLimitMiddleware
+
+
+def make_client(max_bytes=1024):
+    app = FastAPI()
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"size": received[-1]}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=max_bytes, paths={"/upload"})
+    return TestClient(app), received
+
+
+def test_small_upload_passes():
+    client, received = make_client()
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 100)})
+    assert response.status_code == 200 and received == [100]
+
+
+def test_large_content_length_is_rejected_before_the_endpoint_runs():
+    client, received = make_client()
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 5000)})
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_chunked_body_is_cut_off_at_the_limit():
+    client, received = make_client()
+
+    def body():
+        for _ in range(10):
+            yield b"x" * 512
+
+    response = client.post("/upload", content=body(), headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_other_paths_are_not_limited():
+    client, _ = make_client()
+    assert client.post("/other", files={"file": ("a.pdf", b"x" * 5000)}).status_code == 200
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.services.vector_store import LocalVectorStore
+
+
+def random_vectors(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"id": f"v{i}", "values": rng.normal(size=dim).tolist(), "metadata": {"text": f"chunk {i}"}}
+            for i in range(n)]
+
+
+def ids(result):
+    return [m["id"] for m in result["matches"]]
+
+
+def test_flat_query_returns_best_matches_first():
+    store = LocalVectorStore()
+    vectors = random_vectors(50)
+    store.upsert(vectors)
+    result = store.query(vectors[7]["values"], top_k=3)
+    assert ids(result)[0] == "v7"
+    assert result["matches"][0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert result["matches"][0]["metadata"] == {"text": "chunk 7"}
+    scores = [m["score"] for m in result["matches"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_ivf_finds_what_flat_finds():
+    vectors = random_vectors(400, seed=1)
+    flat, ivf = LocalVectorStore(), LocalVectorStore(search="ivf", nprobe=20, ivf_min_vectors=100)
+    flat.upsert(vectors)
+    ivf.upsert(vectors)
+    for v in vectors[:20]:
+        assert ids(ivf.query(v["values"], top_k=1)) == [v["id"]]
+    query = np.random.default_rng(2).normal(size=16).tolist()
+    assert len(set(ids(ivf.query(query, top_k=10))) & set(ids(flat.query(query, top_k=10)))) >= 7
+
+
+def test_upsert_replaces_and_delete_removes():
+    store = LocalVectorStore()
+    vectors = random_vectors(10)
+    store.upsert(vectors)
+    store.upsert([{**vectors[3], "values": vectors[5]["values"], "metadata": {"text": "moved"}}])
+    assert store.count() == 10
+    assert set(ids(store.query(vectors[5]["values"], top_k=2))) == {"v3", "v5"}
+
+    store.delete(["v5", "missing"])
+    assert store.count() == 9
+    match = store.query(vectors[5]["values"], top_k=1)["matches"][0]
+    assert (match["id"], match["metadata"]) == ("v3", {"text": "moved"})
+
+
+def test_flush_persists_and_reload_is_memory_mapped(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    vectors = random_vectors(20)
+    store.upsert(vectors)
+    store.flush()
+
+    reloaded = LocalVectorStore(str(tmp_path))
+    assert isinstance(reloaded._vectors, np.memmap)
+    assert reloaded.count() == 20 and ids(reloaded.query(vectors[4]["values"], top_k=1)) == ["v4"]
+
+    # writes to a mapped index copy it first, and only reach disk on flush()
+    reloaded.upsert([{**vectors[0], "values": vectors[1]["values"]}])
+    reloaded.delete(["v2"])
+    assert LocalVectorStore(str(tmp_path)).count() == 20
+    reloaded.flush()
+    again = LocalVectorStore(str(tmp_path))
+    assert again.count() == 19 and set(ids(again.query(vectors[1]["values"], top_k=2))) == {"v0", "v1"}
+
+
+def test_dimension_mismatch_is_rejected():
+    store = LocalVectorStore()
+    store.upsert(random_vectors(2, dim=8))
+    with pytest.raises(ValueError, match="dimension"):
+        store.upsert(random_vectors(1, dim=4))
+    with pytest.raises(ValueError):
+        LocalVectorStore(search="hnsw")
@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = ("RateLimit", "Timeout", "Connection", "ServiceUnavailable", "InternalServer", "ResourceExhausted")
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` units per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EmbeddingCache:
+    """Persistent SQLite cache of vectors keyed by (model, sha256(text))"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (model TEXT, hash TEXT, vector BLOB, PRIMARY KEY (model, hash))"
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, hashes: List[str]):
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                part = hashes[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, h, array("f", vector).tobytes()) for h, vector in items],
+            )
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Rate limits, timeouts, connection errors and 5xx responses are worth retrying"""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return any(name in type(exc).__name__ for name in RETRYABLE_NAMES)
+
+
+class EmbeddingClient:
+    """
+    Provider-agnostic embedding client shared by the agents' ingestion paths and
+    the production scheduler.
+
+    - embed_documents(texts): cache lookup, then the misses in batch calls of
+      up to `batch_size` texts
+    - embed_query(text): concurrent callers are coalesced into one batch call
+      (waits at most `max_wait_ms` for company)
+    - every provider call goes through request- and token-per-minute buckets
+      and is retried with exponential backoff and full jitter
+    - vectors are cached on disk keyed by (model, text hash)
+
+    `embed_fn(texts) -> vectors` is the raw provider call.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        model: str,
+        batch_size: int = 64,
+        max_wait_ms: float = 10.0,
+        requests_per_minute: float = 3000,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        cache_path: Optional[str] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60))
+        self._tokens = TokenBucket(tokens_per_minute / 60, max(1.0, tokens_per_minute / 60))
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+        self._pending = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"texts": 0, "cache_hits": 0, "provider_calls": 0, "retries": 0}
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+
+    def _call(self, texts: List[str]):
+        """One rate-limited provider call with retries"""
+        self._requests.acquire()
+        self._tokens.acquire(sum(max(1, len(t) // 4) for t in texts))
+        attempt = 0
+        while True:
+            try:
+                self._count(provider_calls=1)
+                vectors = self.embed_fn(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"Provider returned {len(vectors)} vectors for {len(texts)} texts")
+                return vectors
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                logger.warning("Embedding call failed (%s: %s); retry %d in %.2fs", type(e).__name__, e, attempt + 1, delay)
+                self._count(retries=1)
+                attempt += 1
+                time.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        self._count(texts=len(texts))
+        hashes = [EmbeddingCache.key(t) for t in texts]
+        found = self.cache.get_many(self.model, list(set(hashes))) if self.cache else {}
+        self._count(cache_hits=sum(h in found for h in hashes))
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in found:
+                missing.setdefault(h, t)   # identical texts are embedded once
+        items = list(missing.items())
+        for i in range(0, len(items), self.batch_size):
+            batch = items[i:i + self.batch_size]
+            vectors = self._call([t for _, t in batch])
+            fresh = [(h, v) for (h, _), v in zip(batch, vectors)]
+            found.update(fresh)
+            if self.cache:
+                self.cache.put_many(self.model, fresh)
+        return [found[h] for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        future = Future()
+        self._pending.put((text, future))
+        self._ensure_worker()
+        return future.result()
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._coalesce, name="embedding-coalescer", daemon=True)
+                self._worker.start()
+
+    def _coalesce(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                vectors = self.embed_documents([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+
+
+@lru_cache(maxsize=None)
+def openai_embedding_client(api_key: str, model: str = "text-embedding-3-small") -> EmbeddingClient:
+    """Shared OpenAI-backed client; limits and cache location come from the environment"""
+    from openai import OpenAI
+
+    client = OpenAI(api_key=api_key, max_retries=0)   # retries are handled by EmbeddingClient
+
+    def embed(texts):
+        response = client.embeddings.create(model=model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    return EmbeddingClient(
+        embed,
+        model=model,
+        batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "256")),
+        requests_per_minute=float(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "3000")),
+        tokens_per_minute=float(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000")),
+        max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", "5")),
+        cache_path=os.getenv("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embeddings.sqlite3")),
+    )
+
+
+def gemini_embedding_client(genai, model: str = "models/embedding-001", **options) -> EmbeddingClient:
+    """Gemini-backed client; `genai` is the configured google.generativeai module, options go to EmbeddingClient"""
+
+    def embed(texts):
+        return genai.embed_content(model=model, content=list(texts))["embedding"]
+
+    return EmbeddingClient(embed, model=model, **options)